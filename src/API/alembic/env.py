@@ -26,6 +26,9 @@ config.set_main_option('sqlalchemy.url', DATABASE_URL)
 # This line sets up loggers basically.
 fileConfig(config.config_file_name)
 
+# The metadata computed by the migrations imports the emulator's pure python modules from the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
 import backend.models as models
 
 # add your model's MetaData object here
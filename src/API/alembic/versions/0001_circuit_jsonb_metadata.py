@@ -0,0 +1,99 @@
+"""JSONB circuits with indexed metadata
+
+Creates the tables on an empty database. On a database created by the previous autogenerated revisions, converts
+`circuits.circuit` to JSONB and adds the indexed metadata columns (nb_qubit, column_count, depth, content_hash, user_id),
+filled from the stored circuits.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from backend.metadata import get_circuit_metadata
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+metadata_indexes = ["nb_qubit", "column_count", "depth", "content_hash", "user_id"]
+
+
+def create_users():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("username", sa.String()),
+        sa.Column("time_created", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("time_updated", sa.DateTime(timezone=True)),
+    )
+
+
+def create_circuits():
+    op.create_table(
+        "circuits",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("circuit", postgresql.JSONB()),
+        sa.Column("circuit_binary", sa.LargeBinary(), nullable=True),
+        sa.Column("nb_qubit", sa.Integer()),
+        sa.Column("column_count", sa.Integer()),
+        sa.Column("depth", sa.Integer()),
+        sa.Column("content_hash", sa.String(64)),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+    )
+    op.create_index("ix_circuits_id", "circuits", ["id"])
+
+
+def upgrade_circuits(inspector):
+    """
+    Converts an existing circuits table: JSON -> JSONB, new columns, then metadata computed from every stored circuit.
+    """
+    existing = [column["name"] for column in inspector.get_columns("circuits")]
+    op.alter_column("circuits", "circuit", type_=postgresql.JSONB(), postgresql_using="circuit::jsonb")
+    if "circuit_binary" not in existing:
+        op.add_column("circuits", sa.Column("circuit_binary", sa.LargeBinary(), nullable=True))
+    for name, column_type in [("nb_qubit", sa.Integer()), ("column_count", sa.Integer()), ("depth", sa.Integer()), ("content_hash", sa.String(64))]:
+        if name not in existing:
+            op.add_column("circuits", sa.Column(name, column_type))
+    if "user_id" not in existing:
+        op.add_column("circuits", sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True))
+
+    connection = op.get_bind()
+    circuits = sa.table("circuits", sa.column("id", sa.Integer()), sa.column("circuit", postgresql.JSONB()),
+                        sa.column("nb_qubit", sa.Integer()), sa.column("column_count", sa.Integer()),
+                        sa.column("depth", sa.Integer()), sa.column("content_hash", sa.String(64)))
+    for circuit_id, circuit_json in connection.execute(sa.select(circuits.c.id, circuits.c.circuit)).fetchall():
+        if circuit_json is None:
+            continue
+        connection.execute(circuits.update().where(circuits.c.id == circuit_id).values(**get_circuit_metadata(circuit_json)))
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    if "users" not in tables:
+        create_users()
+    if "circuits" not in tables:
+        create_circuits()
+    else:
+        upgrade_circuits(inspector)
+    for name in metadata_indexes:
+        op.create_index(f"ix_circuits_{name}", "circuits", [name])
+    op.create_index("ix_circuits_user_id_content_hash", "circuits", ["user_id", "content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_circuits_user_id_content_hash", table_name="circuits")
+    for name in metadata_indexes:
+        op.drop_index(f"ix_circuits_{name}", table_name="circuits")
+    op.drop_constraint("circuits_user_id_fkey", "circuits", type_="foreignkey")
+    for name in ["user_id", "content_hash", "depth", "column_count", "nb_qubit"]:
+        op.drop_column("circuits", name)
+    op.alter_column("circuits", "circuit", type_=sa.JSON(), postgresql_using="circuit::json")
@@ -0,0 +1,61 @@
+import os
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from src.API.backend.models import Base
+
+
+def get_database_url():
+    """
+    DATABASE_URL if set (e.g. sqlite+aiosqlite:///./simpleq.db for local runs and tests), else the postgres container.
+    """
+    database_url = os.getenv('DATABASE_URL')
+    if database_url is not None:
+        return database_url
+    DB_PSWD = os.getenv('POSTGRES_PASSWORD')
+    DB_NAME = os.getenv('POSTGRES_DB')
+    return "postgresql+asyncpg://postgres:" + str(DB_PSWD) + "@postgres-container/" + str(DB_NAME)
+
+
+def create_engine(database_url: str):
+    """
+    Creates the async engine. Postgres connections are pooled:
+    DB_POOL_SIZE connections are kept open, DB_MAX_OVERFLOW more can be opened under load, connections are checked
+    before being reused (pre-ping) and recycled after DB_POOL_RECYCLE seconds, and each connection caches up to
+    DB_STATEMENT_CACHE_SIZE prepared statements.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return create_async_engine(url)
+    url = url.update_query_dict({"prepared_statement_cache_size": os.getenv('DB_STATEMENT_CACHE_SIZE', '500')})
+    return create_async_engine(
+        url,
+        pool_size=int(os.getenv('DB_POOL_SIZE', 10)),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        pool_timeout=float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        pool_pre_ping=True
+    )
+
+
+engine = create_engine(get_database_url())
+
+SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def get_session():
+    """
+    Request dependency: one async session per request, closed when the response is sent.
+    """
+    async with SessionLocal() as session:
+        yield session
+
+
+async def init_models(engine=engine):
+    """
+    Creates the tables directly (SQLite stand-in and tests, the postgres schema is managed by alembic).
+    """
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
@@ -0,0 +1,55 @@
+import hashlib
+import json
+
+# Pure python on purpose: also used by the alembic migrations, which run without the emulator's dependencies.
+# SimpleQ.moments, which holds the scheduler's layering, has no dependency either.
+from src.QLibrary.SimpleQ.moments import get_moment_positions
+
+
+def get_canonical_columns(circuit_json: dict):
+    """
+    Returns the columns of a circuit JSON as [gate name, target, sorted controls, condition] lists with integer indexes,
+    so that equivalent encodings (stringified indexes, control order) give the same result.
+    """
+    columns = []
+    for column in circuit_json.get("circuit", []):
+        if isinstance(column, str):
+            column = json.loads(column)
+        gate = column["qubit_information"]
+        if isinstance(gate, str):
+            gate = json.loads(gate)
+        condition = column.get("condition")
+        columns.append([
+            gate["gate_name"],
+            int(column["qubit_index"]),
+            sorted(int(control) for control in gate.get("ctrl_qubits_indexes") or []),
+            [int(value) for value in condition] if condition is not None else None
+        ])
+    return columns
+
+
+def get_depth(columns: list):
+    """
+    Number of moments of canonical columns, scheduled like SimpleQ.scheduler (the condition qubit counts as used).
+    """
+    positions = get_moment_positions([
+        [target] + controls + ([condition[0]] if condition is not None else [])
+        for _, target, controls, condition in columns
+    ])
+    return max(positions) + 1 if positions else 0
+
+
+def get_circuit_metadata(circuit_json: dict):
+    """
+    Returns the denormalised columns stored next to a circuit: nb_qubit, column_count, depth and content_hash
+    (sha256 of the canonical circuit).
+    """
+    columns = get_canonical_columns(circuit_json)
+    nb_qubit = int(circuit_json["nb_qubit"])
+    canonical = json.dumps({"nb_qubit": nb_qubit, "circuit": columns}, separators=(",", ":"))
+    return {
+        "nb_qubit": nb_qubit,
+        "column_count": len(columns),
+        "depth": get_depth(columns),
+        "content_hash": hashlib.sha256(canonical.encode()).hexdigest()
+    }
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer,JSON, String, DateTime, func, ForeignKey
+from sqlalchemy import Column, Integer,JSON, String, DateTime, func, ForeignKey, LargeBinary, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -7,14 +8,24 @@ Base = declarative_base()
 
 class Circuit(Base):
     __tablename__ = "circuits"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Deduplication looks up a content hash within the circuits of one user
+        Index("ix_circuits_user_id_content_hash", "user_id", "content_hash"),
+        {"extend_existing": True}
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    circuit = Column(JSON)
-    # username = Column(String, unique=True, index=True)
-    # email = Column(String, unique=True, index=True)
-    # user_id = Column(Integer, ForeignKey('users.id'))
-    # user = relationship('User')
+    # JSONB on postgres, plain JSON on the SQLite stand-in
+    circuit = Column(JSON().with_variant(JSONB(), "postgresql"))
+    # Same circuit in the compact binary format (SimpleQ.binary)
+    circuit_binary = Column(LargeBinary, nullable=True)
+    # Metadata denormalised from `circuit` (see backend/metadata.py), so that listings never decode the JSON
+    nb_qubit = Column(Integer, index=True)
+    column_count = Column(Integer, index=True)
+    depth = Column(Integer, index=True)
+    content_hash = Column(String(64), index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
+    user = relationship('User')
 
 
 class User(Base):
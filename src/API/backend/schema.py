@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
 
 
 class Index(BaseModel):
@@ -6,39 +8,66 @@ class Index(BaseModel):
 
 
 class Gate(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     gate_name: str
     ctrl_qubits_indexes: list[int]
 
-    class Config:
-        orm_mode = True
-
 
 class Column(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     qubit_index: int
     qubit_information: Gate
-
-    class Config:
-        orm_mode = True
+    condition: Optional[list[int]] = None
 
 
 class Circuit(BaseModel):
-    id: int = None
+    model_config = ConfigDict(from_attributes=True)
+
+    id: Optional[int] = None
     nb_qubit: int
     circuit: list[Column]
+    user_id: Optional[int] = None
+
+
+class LiveRequest(BaseModel):
+    circuit: Circuit
+    mode: str = "probabilities"
+    top_k: int = 8
+    max_rate: Optional[float] = None
+
 
-    class Config:
-        orm_mode = True
+class ExpectationRequest(BaseModel):
+    circuit: Circuit
+    hamiltonian: dict[str, float]
+
+
+class AmplitudeRequest(BaseModel):
+    circuit: Circuit
+    bitstrings: list[str]
+    method: str = "auto"
+
+
+class CircuitSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    nb_qubit: Optional[int] = None
+    column_count: Optional[int] = None
+    depth: Optional[int] = None
+    content_hash: Optional[str] = None
+    user_id: Optional[int] = None
 
 
 class User(BaseModel):
-    username: str
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+    username: str
 
 
 class Qbits_nb(BaseModel):
-    nb: int
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+    nb: int
+    user_id: Optional[int] = None
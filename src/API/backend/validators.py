@@ -4,19 +4,48 @@ from fastapi import HTTPException, Body, FastAPI
 from src.API.backend.schema import Circuit, Gate
 from src.API.backend.models import Circuit as CircuirModel
 from SimpleQ import circuit as circuit_object
-from fastapi_sqlalchemy import DBSessionMiddleware, db
+from SimpleQ.estimator import admit_circuit, admit_records, AdmissionError
+from SimpleQ.binary import decode_records
+from sqlalchemy.ext.asyncio import AsyncSession
 
-def circuit_validator(circuit: Circuit = Body(...)):
-    c = None
-    with db():
-        c = db.session.query(CircuirModel).filter(CircuirModel.id == circuit.id).first()
-    if c is None:
-        raise HTTPException(status_code=404, detail="Circuit not found")
+# Admission limits of a single request: the estimated peak memory (bytes) and runtime (seconds) of its simulation
+SIMULATION_MEMORY_LIMIT = int(os.getenv('SIMULATION_MEMORY_LIMIT', 2 ** 31))
+SIMULATION_TIME_LIMIT = float(os.getenv('SIMULATION_TIME_LIMIT', 60))
+
+
+def admission_validator(circuit_data: dict, simulated: bool = False):
+    """
+    Builds a circuit on the cheapest backend fitting the limits, before anything is allocated.
+    Circuits that are only edited are checked against the memory limit, simulated ones against both limits.
+    """
     try:
-        circuit = circuit_object.json_to_circuit(circuit)
+        circuit, _ = admit_circuit(circuit_data, dense_output=simulated, memory_limit=SIMULATION_MEMORY_LIMIT,
+                                   time_limit=SIMULATION_TIME_LIMIT if simulated else None)
         return circuit
-    except:
-        raise HTTPException(status_code=400, detail="Invalid JSON Circuit format")
+    except AdmissionError as error:
+        raise HTTPException(status_code=413, detail=str(error))
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+
+def binary_admission_validator(data: bytes):
+    """
+    Same as `admission_validator` for a circuit in the binary format (stored, not simulated).
+    """
+    try:
+        circuit, _ = admit_records(*decode_records(data), memory_limit=SIMULATION_MEMORY_LIMIT)
+        return circuit
+    except AdmissionError as error:
+        raise HTTPException(status_code=413, detail=str(error))
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+
+async def circuit_validator(circuit: Circuit, session: AsyncSession, simulated: bool = False):
+    c = await session.get(CircuirModel, circuit.id) if circuit.id is not None else None
+    if c is None:
+        raise HTTPException(status_code=404, detail="Circuit not found")
+    return admission_validator(circuit.model_dump(), simulated)
 
 
 def gate_validator(gate: Gate = Body(...)):
@@ -8,12 +8,18 @@ cd src/API
 
 ls -a alembic/versions
 
-if [ "${ALEMBIC_MODE}" = "upgrade" ]
+# Migrations are versioned in alembic/versions
+if [ "${ALEMBIC_MODE}" = "upgrade" ] || [ "${ALEMBIC_MODE}" = "init" ]
 then
   alembic upgrade head
-elif [ "${ALEMBIC_MODE}" = "init" ]
+elif [ "${ALEMBIC_MODE}" = "adopt" ]
 then
-  alembic revision --autogenerate -m "API Migration"
+  # Database created by the former autogenerated revisions: forget them, 0001 converts the existing tables
+  alembic stamp --purge base
+  alembic upgrade head
+elif [ "${ALEMBIC_MODE}" = "revision" ]
+then
+  alembic revision --autogenerate -m "${ALEMBIC_MESSAGE:-API Migration}"
   alembic upgrade head
 elif [ "${ALEMBIC_MODE}" = "reset" ]
 then
@@ -1,37 +1,78 @@
-from fastapi import FastAPI, Depends, HTTPException, Body
+from fastapi import FastAPI, Depends, HTTPException, Body, WebSocket, WebSocketDisconnect, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from starlette.routing import Match
 
-from fastapi_sqlalchemy import DBSessionMiddleware, db
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import os
+import time
+import asyncio
 
 ############ EMULATOR LIBRARY ############
 
 from SimpleQ import circuit as circuit_object
+from SimpleQ.checkpoint import CheckpointCache
+from SimpleQ.tools import get_probabilities
+from SimpleQ.stream import stream_updates, implemented_update_modes
+from SimpleQ.binary import binary_content_type, max_binary_qubits
+from SimpleQ.amplitudes import plan_amplitudes, operations_per_second
+# Same module path as the emulator's own import, so that the API and the emulator share the metrics registry
+from src.QLibrary.SimpleQ.metrics import registry, latency_buckets
 
 ############ SCHEMAS & MODELS #############
 
 # import all Types here
-from src.API.backend.schema import Circuit, User, Qbits_nb, Gate
+from src.API.backend.schema import Circuit, User, Qbits_nb, Gate, LiveRequest, CircuitSummary, ExpectationRequest, AmplitudeRequest
 from src.API.backend.models import Circuit as CircuitModel
 from src.API.backend.models import User as UserModel
+from src.API.backend.database import get_session, engine
+from src.API.backend.metadata import get_circuit_metadata
 
 
 ############# VALIDATORS ####################
 
-from src.API.backend.validators import circuit_validator, gate_validator
+from src.API.backend.validators import circuit_validator, gate_validator, admission_validator, binary_admission_validator, SIMULATION_TIME_LIMIT
 
 
 ############ INIT THE API #################
 
 
-DB_PSWD = os.getenv('POSTGRES_PASSWORD')
-DB_NAME = os.getenv('POSTGRES_DB')
-
-DATABASE_URL = "postgresql://postgres:" + str(DB_PSWD) + "@postgres-container/" + str(DB_NAME)
+# The async engine and its connection pool are configured in backend/database.py
 
 app = FastAPI()
 
-app.add_middleware(DBSessionMiddleware, db_url=DATABASE_URL)
+# Statevector checkpoints of the most recently previewed circuits
+checkpoint_cache = CheckpointCache(int(os.getenv('CHECKPOINT_INTERVAL', 16)), int(os.getenv('CHECKPOINT_CIRCUITS', 32)))
+
+# API metrics, exposed with the emulator's ones on /metrics
+request_seconds = registry.histogram("simpleq_http_request_duration_seconds", "HTTP request latency", ("route", "method", "status"), latency_buckets)
+pool_checked_out = registry.gauge("simpleq_db_pool_checked_out", "Database connections currently in use")
+pool_overflow = registry.gauge("simpleq_db_pool_overflow", "Connections opened beyond the pool size (requests waiting for the pool when at DB_MAX_OVERFLOW)")
+checkpoint_circuits = registry.gauge("simpleq_checkpoint_circuits", "Circuits with statevector checkpoints")
+
+
+def get_route_path(request: Request):
+    """
+    Route template of a request (e.g. /circuit/{circuit_id}), so that latencies are not split per id.
+    """
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        request_seconds.observe(time.perf_counter() - start, (get_route_path(request), request.method, str(status)))
 
 
 #################### GET REQUESTS ################
@@ -40,50 +81,131 @@ async def root():
     return {"message": "Hello lrd"}
 
 
-@app.get("/circuit/")
-async def get_circuits():
-    circuits = db.session.query(CircuitModel).all()
-    return circuits
+# LIST circuits (filters on the indexed metadata) => circuit summaries, the circuits themselves are not loaded
+
+@app.get("/circuit/", response_model=list[CircuitSummary])
+async def get_circuits(nb_qubit: int = None, min_columns: int = None, max_columns: int = None, max_depth: int = None,
+                       user_id: int = None, content_hash: str = None, limit: int = 100, offset: int = 0,
+                       session: AsyncSession = Depends(get_session)):
+    query = select(CircuitModel.id, CircuitModel.nb_qubit, CircuitModel.column_count, CircuitModel.depth,
+                   CircuitModel.content_hash, CircuitModel.user_id)
+    if nb_qubit is not None:
+        query = query.where(CircuitModel.nb_qubit == nb_qubit)
+    if min_columns is not None:
+        query = query.where(CircuitModel.column_count >= min_columns)
+    if max_columns is not None:
+        query = query.where(CircuitModel.column_count <= max_columns)
+    if max_depth is not None:
+        query = query.where(CircuitModel.depth <= max_depth)
+    if user_id is not None:
+        query = query.where(CircuitModel.user_id == user_id)
+    if content_hash is not None:
+        query = query.where(CircuitModel.content_hash == content_hash)
+    rows = await session.execute(query.order_by(CircuitModel.id).limit(limit).offset(offset))
+    return [dict(row._mapping) for row in rows]
+
+
+# GET circuit (id) => JSON circuit, or the binary format if the client accepts it
+
+@app.get("/circuit/{circuit_id}")
+async def get_circuit(circuit_id: int, request: Request, session: AsyncSession = Depends(get_session)):
+    circuit = await session.get(CircuitModel, circuit_id)
+    if circuit is None:
+        raise HTTPException(status_code=404, detail="Circuit not found")
+    if binary_content_type in request.headers.get("accept", "") and circuit.circuit_binary is not None:
+        return Response(content=circuit.circuit_binary, media_type=binary_content_type)
+    return circuit.circuit
+
+
+# METRICS () => every metric in the Prometheus text format
+
+@app.get("/metrics")
+async def get_metrics():
+    pool = engine.sync_engine.pool
+    # Only the postgres queue pool has counters (the SQLite stand-in does not pool connections)
+    if hasattr(pool, "checkedout"):
+        pool_checked_out.set(pool.checkedout())
+        pool_overflow.set(max(pool.overflow(), 0))
+    checkpoint_circuits.set(len(checkpoint_cache))
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/users/")
-async def get_users():
-    users = db.session.query(UserModel).all()
+async def get_users(session: AsyncSession = Depends(get_session)):
+    users = (await session.execute(select(UserModel))).scalars().all()
     return users
 
 
 ################### POST REQUESTS ##################
 
 @app.post("/user/", response_model=User)
-async def register_user(user: User):
-    db_circuit = UserModel(username=user.username)
-    db.session.add(db_circuit)
-    db.session.commit()
-    return db_circuit
+async def register_user(user: User, session: AsyncSession = Depends(get_session)):
+    db_user = UserModel(username=user.username)
+    session.add(db_user)
+    await session.commit()
+    return db_user
 
 
 # INIT Circuit    (qbit_amount : int) => new Circuit JSON
 
 @app.post("/circuit/create/", response_model=Circuit)
-async def create_circuit(qubits_nb: Qbits_nb):
-    # create circuit object
-    new_circuit = circuit_object.Circuit(qubits_nb.nb)
+async def create_circuit(qubits_nb: Qbits_nb, session: AsyncSession = Depends(get_session)):
+    # create circuit object, on a backend that can hold that many qubits
+    new_circuit = admission_validator({"nb_qubit": qubits_nb.nb, "circuit": []})
     # add circuit to database
-    res = push_circuit_to_db(new_circuit)
+    res = await push_circuit_to_db(new_circuit, session, qubits_nb.user_id)
     new_circuit = new_circuit.circuit_to_json()
     new_circuit['id'] = res.id
     # the id of the object is stored here, we have to discuss how we plan to store it in the workflow of the user
     return new_circuit
 
 
+# UPLOAD circuit (binary circuit body) => new circuit id
+
+@app.post("/circuit/upload/")
+async def upload_circuit(request: Request, user_id: int = None, session: AsyncSession = Depends(get_session)):
+    if request.headers.get("content-type") != binary_content_type:
+        raise HTTPException(status_code=415, detail=f"Expected {binary_content_type} content")
+    new_circuit = binary_admission_validator(await request.body())
+    # An identical circuit already uploaded by the same user is reused instead of stored twice
+    res = await find_duplicate(new_circuit.circuit_to_json(), user_id, session)
+    if res is None:
+        res = await push_circuit_to_db(new_circuit, session, user_id)
+    return {"id": res.id}
+
+
+# DEDUPLICATE circuits () => number of removed copies
+# Circuits of a same user with the same content hash are merged into the oldest one
+
+@app.post("/circuit/dedup/")
+async def deduplicate_circuits(session: AsyncSession = Depends(get_session)):
+    duplicates = await session.execute(
+        select(CircuitModel.user_id, CircuitModel.content_hash, func.min(CircuitModel.id))
+        .group_by(CircuitModel.user_id, CircuitModel.content_hash)
+        .having(func.count(CircuitModel.id) > 1)
+    )
+    removed = 0
+    for user_id, content_hash, kept_id in duplicates.all():
+        result = await session.execute(
+            delete(CircuitModel)
+            .where(CircuitModel.user_id == user_id, CircuitModel.content_hash == content_hash, CircuitModel.id != kept_id)
+        )
+        removed += result.rowcount
+    await session.commit()
+    return {"removed": removed}
+
+
 # ADD/DELETE qubit     (index : int, circuit) => Modified Circuit JSON
 
 
 @app.post("/circuit/add/{index}", response_model=Circuit)
-async def add_qubit(index: int, circuit: Circuit):
+async def add_qubit(index: int, circuit: Circuit, session: AsyncSession = Depends(get_session)):
     # we verify if the circuit is the right format and if it exists in the database and convert it to a Circuit object
-    circuit = circuit_validator(circuit)
-    circuit.add_qubit(index)
+    circuit = await circuit_validator(circuit, session)
+    try:
+        circuit.add_qubit(index)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
     # ADD TO DATABASE
     # await push_circuit_to_db(circuit)   // TODO > find a way to store the id
 
@@ -91,10 +213,13 @@ async def add_qubit(index: int, circuit: Circuit):
 
 
 @app.post("/circuit/delete/{index}", response_model=Circuit)
-async def delete_qubit(index: int, circuit: Circuit):
+async def delete_qubit(index: int, circuit: Circuit, session: AsyncSession = Depends(get_session)):
     # we verify if the circuit is the right format and if it exists in the database and convert it to a Circuit object
-    circuit = circuit_validator(circuit)
-    circuit.delete_qubit(index)
+    circuit = await circuit_validator(circuit, session)
+    try:
+        circuit.delete_qubit(index)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
     # ADD TO DATABASE
     # await push_circuit_to_db(circuit)
     # TODO
@@ -104,9 +229,9 @@ async def delete_qubit(index: int, circuit: Circuit):
 # SET gate     (gate_name : str, index : int, ctrl : list/None) => None/ ?
 
 @app.post("/circuit/set_gate/{index}", response_model=Circuit)
-async def set_gate(index: int, circuit: Circuit, gate: Gate):
+async def set_gate(index: int, circuit: Circuit, gate: Gate, session: AsyncSession = Depends(get_session)):
     # we verify if the circuit is the right format and if it exists in the database and convert it to a Circuit object
-    circuit = circuit_validator(circuit)
+    circuit = await circuit_validator(circuit, session)
     gate = gate_validator(gate)
     circuit.set_gate(gate.gate_name, index, gate.ctrl_qubits_indexes)
     # ADD TO DATABASE
@@ -119,14 +244,153 @@ async def set_gate(index: int, circuit: Circuit, gate: Gate):
 # This will the fruit of a future update ! TODO
 
 
-# LAUNCH circuit () => ? To define TODO
+# PREVIEW circuit (circuit) => probabilities of every basis state
+# The simulation resumes from the last checkpoint before the first edited column
+
+@app.post("/circuit/preview/")
+async def preview_circuit(circuit: Circuit, session: AsyncSession = Depends(get_session)):
+    circuit_id = circuit.id
+    circuit = await circuit_validator(circuit, session, simulated=True)
+
+    def simulate():
+        checkpoint = checkpoint_cache.simulate(circuit_id, circuit)
+        return get_probabilities(circuit.get_system_matrix()).tolist(), checkpoint
+
+    try:
+        # The simulation runs in a worker thread, so that it does not block the other requests
+        probabilities, checkpoint = await run_in_threadpool(simulate)
+    except MemoryError:
+        # The estimate was wrong: fail this request only
+        checkpoint_cache.invalidate(circuit_id)
+        raise HTTPException(status_code=503, detail="Not enough memory to simulate the circuit")
+    return {
+        "probabilities": probabilities,
+        "checkpoint": checkpoint
+    }
+
+
+# EXPECTATION values (circuit, hamiltonian {pauli string: coefficient}) => exact <H> and the value of each term
+# Computed from the final state (no sampling), which reuses the preview checkpoints
+
+@app.post("/circuit/expectation/")
+async def expectation_values(request: ExpectationRequest, session: AsyncSession = Depends(get_session)):
+    circuit_id = request.circuit.id
+    circuit = await circuit_validator(request.circuit, session, simulated=True)
+    pauli_strings = list(request.hamiltonian)
+
+    def simulate():
+        checkpoint_cache.simulate(circuit_id, circuit)
+        return circuit.get_pauli_expectations(pauli_strings)
+
+    try:
+        values = await run_in_threadpool(simulate)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    except MemoryError:
+        checkpoint_cache.invalidate(circuit_id)
+        raise HTTPException(status_code=503, detail="Not enough memory to simulate the circuit")
+    return {
+        "expectation": float(sum(request.hamiltonian[pauli_string] * value for pauli_string, value in zip(pauli_strings, values))),
+        "terms": {pauli_string: float(value) for pauli_string, value in zip(pauli_strings, values)}
+    }
+
+
+# AMPLITUDES (circuit, bitstrings, method) => <x|C|0...0> of each bitstring, as [real, imaginary]
+# The statevector is never built, so circuits too wide to simulate can be queried (Feynman paths or MPS contraction)
+
+@app.post("/circuit/amplitudes/")
+async def amplitude_query(request: AmplitudeRequest, session: AsyncSession = Depends(get_session)):
+    circuit = await circuit_validator(request.circuit, session)
+
+    def compute():
+        plan = plan_amplitudes(circuit.get_qubit_amount(), circuit.circuit, len(request.bitstrings))
+        method = plan["method"] if request.method == "auto" else request.method
+        seconds = plan["operations"].get(method, 0) / operations_per_second
+        if seconds > SIMULATION_TIME_LIMIT:
+            raise HTTPException(status_code=413, detail=f"Amplitude query rejected: about {seconds:.3g} s with the {method} method, limit is {SIMULATION_TIME_LIMIT:.3g} s")
+        return circuit.get_amplitudes(request.bitstrings, method), method
+
+    try:
+        values, method = await run_in_threadpool(compute)
+    except (ValueError, NameError) as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    except MemoryError:
+        raise HTTPException(status_code=503, detail="Not enough memory to compute the amplitudes")
+    return {
+        "amplitudes": {bitstring: [value.real, value.imag] for bitstring, value in values.items()},
+        "method": method
+    }
+
+
+# LIVE simulation (websocket) => one update per column
+# The client sends a LiveRequest, then receives {"column", "probabilities" | "amplitudes", "measurement"?} messages
+# and a final {"status": "done" | "cancelled"}. Sending {"action": "cancel"} stops the run after the current column.
+
+@app.websocket("/circuit/live/")
+async def live_simulation(websocket: WebSocket, session: AsyncSession = Depends(get_session)):
+    await websocket.accept()
+    try:
+        request = LiveRequest(**await websocket.receive_json())
+        if request.mode not in implemented_update_modes:
+            raise ValueError(f"{request.mode} update mode not found")
+        circuit = await circuit_validator(request.circuit, session, simulated=True)
+        # Give the connection back to the pool for the rest of the run
+        await session.close()
+        updates = stream_updates(circuit, request.mode, request.top_k, request.max_rate)
+    except (HTTPException, ValueError) as error:
+        await websocket.send_json({"status": "error", "detail": str(getattr(error, "detail", error))})
+        await websocket.close()
+        return
+
+    cancelled = asyncio.Event()
+
+    async def listen_for_cancel():
+        try:
+            while True:
+                message = await websocket.receive_json()
+                if message.get("action") == "cancel":
+                    break
+        except WebSocketDisconnect:
+            pass
+        cancelled.set()
+
+    listener = asyncio.create_task(listen_for_cancel())
+    status = "done"
+    try:
+        for update in updates:
+            if update is not None:
+                await websocket.send_json(update)
+            # Give the listener a chance to run between two columns
+            await asyncio.sleep(0)
+            if cancelled.is_set():
+                status = "cancelled"
+                break
+        await websocket.send_json({"status": status})
+        await websocket.close()
+    except MemoryError:
+        await websocket.send_json({"status": "error", "detail": "Not enough memory to simulate the circuit"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        listener.cancel()
 
 
 # Function for the Database
 
 
-def push_circuit_to_db(circuits: Circuit) -> CircuitModel:
-    db_circuit = CircuitModel(circuit=circuits.circuit_to_json())
-    db.session.add(db_circuit)
-    db.session.commit()
+async def find_duplicate(circuit_json: dict, user_id: int, session: AsyncSession) -> CircuitModel:
+    content_hash = get_circuit_metadata(circuit_json)["content_hash"]
+    query = select(CircuitModel).where(CircuitModel.content_hash == content_hash, CircuitModel.user_id == user_id).limit(1)
+    return (await session.execute(query)).scalars().first()
+
+
+async def push_circuit_to_db(circuits: Circuit, session: AsyncSession, user_id: int = None) -> CircuitModel:
+    circuit_json = circuits.circuit_to_json()
+    # Registers wider than the binary format are only stored as JSON
+    circuit_binary = circuits.circuit_to_binary() if circuits.get_qubit_amount() <= max_binary_qubits else None
+    db_circuit = CircuitModel(circuit=circuit_json, circuit_binary=circuit_binary, user_id=user_id,
+                              **get_circuit_metadata(circuit_json))
+    session.add(db_circuit)
+    await session.commit()
     return db_circuit
@@ -2,9 +2,6 @@ import os
 import shutil
 from enum import Enum
 from datetime import datetime
-from contextlib import redirect_stdout
-from window_renderer import Window_Render
-from multiprocessing import Process
 
 log_directory = "./bin/"
 
@@ -23,35 +20,75 @@ def get_formated_datetime():
     return formated_str_datetime
 
 
+def get_log_level(level=None):
+    """
+    Returns the minimum logged level: `level`, else the SIMPLEQ_LOG_LEVEL environment variable (a LogLevel name,
+    DEBUG by default). OFF disables logging and returns None.
+    """
+    if level is None:
+        level = os.getenv("SIMPLEQ_LOG_LEVEL", "DEBUG")
+    if isinstance(level, LogLevel):
+        return level.value
+    if isinstance(level, str):
+        if level.upper() == "OFF":
+            return None
+        return LogLevel[level.upper()].value
+    return level
+
+
 class Logger:
-    def __init__(self, isWindowed=False, auto_destroy=False):
+    """
+    Nothing is created when the logger is built: the log directory and file are created by the first logged message,
+    and the log window (with its GUI dependencies) is only imported when windowed mode is requested.
+    """
+
+    def __init__(self, isWindowed=False, auto_destroy=False, level=None):
+        self.auto_destroy=auto_destroy
+        self.isWindowed = isWindowed
+        self.level = get_log_level(level)
+        self.filename = None
+        self.file = None
+
+    def open(self):
         # Create the directory if non existant
         if not os.path.exists(log_directory):
             os.makedirs(log_directory)
-        self.auto_destroy=auto_destroy
-        self.isWindowed = isWindowed
         self.filename = log_directory + str(datetime.now().timestamp()) + "logs.txt"
-        with open(self.filename, 'w') as f:
-            f.write("[logs started on :" + get_formated_datetime() + "]\n\n")
+        self.file = open(self.filename, 'w')
+        self.file.write("[logs started on :" + get_formated_datetime() + "]\n\n")
         # Currently, this feature is not functionnal and will be the fruit of a future update
         if self.isWindowed == "bugged":
-            self.winddowThread = Process(target=self.run_window())
+            from multiprocessing import Process
+            self.winddowThread = Process(target=self.run_window)
             self.winddowThread.start()
 
+    def is_enabled(self, level):
+        if isinstance(level, LogLevel):
+            level = level.value
+        return self.level is not None and level >= self.level
+
     def log(self, message, level=0):
+        if isinstance(level, LogLevel):
+            level = level.value
+        if not self.is_enabled(level):
+            return
         self.print('*' * level + "[" + str(list(LogLevel)[level].name) + "][" + get_formated_datetime() + "]: " + message )
 
     def print(self, text):
-        with open(self.filename, 'a+') as f:
-            with redirect_stdout(f):
-                print(text)
+        if self.file is None:
+            self.open()
+        self.file.write(text + "\n")
+        self.file.flush()
 
     def run_window(self):
+        from src.Logger.window_renderer import Window_Render
         Window_Render(self.filename)
 
     def __del__(self):
+        if self.file is not None:
+            self.file.close()
         # Destroy Logs upon Logger Object destruction, only if enabled
-        if self.auto_destroy:
+        if self.auto_destroy and os.path.exists(log_directory):
             shutil.rmtree(log_directory)
 
 
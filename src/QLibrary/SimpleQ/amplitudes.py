@@ -0,0 +1,148 @@
+import numpy as np
+
+from src.QLibrary.SimpleQ.column import Column
+from src.QLibrary.SimpleQ.mps import MPS
+from src.QLibrary.SimpleQ.estimator import get_circuit_statistics, get_max_bond_dimension, estimate_backend, operations_per_second
+
+implemented_amplitude_methods = ["auto", "feynman", "mps"]
+max_feynman_qubits = 64 # basis states are stored as uint64 indexes
+
+def parse_bitstring(bitstring : str, qubit_amount : int):
+    """
+    Returns the bits of a basis state given as a string of 0 and 1, qubit 0 first.
+    """
+    if len(bitstring) != qubit_amount or set(bitstring) - {"0", "1"}:
+        raise ValueError(f"Invalid basis state {bitstring}: expected {qubit_amount} bits")
+    return [int(bit) for bit in bitstring]
+
+def check_unitary(columns):
+    """
+    Amplitudes of C|0...0> are only defined for circuits without measurement, reset or classical condition.
+    """
+    for column in columns:
+        if type(column) is not Column or column.get_condition() is not None:
+            raise ValueError("Amplitude queries need a circuit without measurement, reset or classical condition")
+
+def is_branching(gate_matrix : np.array):
+    """
+    Checks if a gate sends a basis state to a superposition (a column of its matrix has two non-zero entries, e.g. H).
+    Other gates (X, Y, Z) only permute basis states and change their phase.
+    """
+    return bool(np.any(np.count_nonzero(gate_matrix, axis=0) > 1))
+
+def merge_paths(indexes : np.array, amplitudes : np.array):
+    """
+    Sums the amplitudes of paths ending on the same basis state and drops the states they cancel on.
+    """
+    indexes, inverse = np.unique(indexes, return_inverse=True)
+    amplitudes = np.bincount(inverse, weights=amplitudes.real) + 1j * np.bincount(inverse, weights=amplitudes.imag)
+    kept = np.abs(amplitudes) > 1e-15
+    return indexes[kept], amplitudes[kept]
+
+def apply_sparse_gate(indexes : np.array, amplitudes : np.array, gate_matrix : np.array, target : int, controls : list, qubit_amount : int):
+    """
+    Applies a controlled 1 qubit gate on a sparse state (basis state indexes and their amplitudes).
+    Each active basis state b is sent to b with the target bit set to 0 and to 1, weighted by the matrix column of its
+    target bit; zero weights are dropped, so a non-branching gate keeps the number of states.
+    """
+    target_bit = np.uint64(1 << (qubit_amount - 1 - target))
+    control_mask = np.uint64(sum(1 << (qubit_amount - 1 - control) for control in controls))
+    active = (indexes & control_mask) == control_mask
+    bits = ((indexes[active] & target_bit) != 0).astype(np.int64)
+    new_indexes, new_amplitudes = [indexes[~active]], [amplitudes[~active]]
+    for output, output_indexes in [(0, indexes[active] & ~target_bit), (1, indexes[active] | target_bit)]:
+        weights = gate_matrix[output, bits]
+        nonzero = weights != 0
+        new_indexes.append(output_indexes[nonzero])
+        new_amplitudes.append(amplitudes[active][nonzero] * weights[nonzero])
+    indexes, amplitudes = np.concatenate(new_indexes), np.concatenate(new_amplitudes)
+    if is_branching(gate_matrix):
+        indexes, amplitudes = merge_paths(indexes, amplitudes)
+    return indexes, amplitudes
+
+def propagate(indexes : np.array, amplitudes : np.array, columns, qubit_amount : int, adjoint : bool=False):
+    """
+    Applies columns on a sparse state, or the adjoint of each column in reverse order.
+    """
+    for column in (reversed(columns) if adjoint else columns):
+        gate = column.get_gate()
+        gate_matrix = gate.get_gate().astype(np.complex128)
+        if adjoint:
+            gate_matrix = gate_matrix.conj().T
+        indexes, amplitudes = apply_sparse_gate(indexes, amplitudes, gate_matrix, column.get_index(), gate.get_ctrl(), qubit_amount)
+    return indexes, amplitudes
+
+def get_split(columns):
+    """
+    Returns the position splitting the columns into two halves with the same number of branching gates, and the number
+    of branching gates of each half.
+    """
+    branching = [position for position, column in enumerate(columns) if is_branching(column.get_gate().get_gate())]
+    first_half = (len(branching) + 1) // 2
+    split = branching[first_half - 1] + 1 if first_half > 0 else 0
+    return split, first_half, len(branching) - first_half
+
+def get_feynman_amplitudes(qubit_amount : int, columns, bitstrings : list):
+    """
+    Feynman path summation, met in the middle: the first half of the circuit is applied to |0...0> and the adjoint of
+    the second half to each requested basis state <x|, as sparse states; <x|C|0> is the overlap of the two.
+    Memory follows the number of paths (2^half the branching gates), not 2^n.
+    """
+    split, _, _ = get_split(columns)
+    forward = propagate(np.zeros(1, dtype=np.uint64), np.ones(1, dtype=np.complex128), columns[:split], qubit_amount)
+    amplitudes = []
+    for bitstring in bitstrings:
+        index = np.uint64(int(bitstring, 2))
+        backward = propagate(np.array([index], dtype=np.uint64), np.ones(1, dtype=np.complex128), columns[split:], qubit_amount, adjoint=True)
+        _, forward_positions, backward_positions = np.intersect1d(forward[0], backward[0], assume_unique=True, return_indices=True)
+        amplitudes.append(np.sum(np.conj(backward[1][backward_positions]) * forward[1][forward_positions]))
+    return np.array(amplitudes, dtype=np.complex128)
+
+def get_mps_amplitudes(qubit_amount : int, columns, bitstrings : list):
+    """
+    Tensor contraction: the circuit is run as an exact MPS and each amplitude contracts one slice per qubit.
+    """
+    state = MPS(qubit_amount)
+    for column in columns:
+        gate = column.get_gate()
+        state.apply_gate(gate.get_gate(), column.get_index(), gate.get_ctrl())
+    return np.array([state.get_amplitude(parse_bitstring(bitstring, qubit_amount)) for bitstring in bitstrings], dtype=np.complex128)
+
+def plan_amplitudes(qubit_amount : int, columns, bitstring_count : int):
+    """
+    Returns the estimated operations of each method and the cheapest one ({"method", "operations": {method: count}}).
+    """
+    columns = list(columns)
+    check_unitary(columns)
+    size = 2. ** qubit_amount
+    operations = {}
+    if qubit_amount <= max_feynman_qubits:
+        _, first_half, second_half = get_split(columns)
+        operations["feynman"] = max(len(columns), 1) * (min(2. ** first_half, size) + bitstring_count * min(2. ** second_half, size))
+    statistics = get_circuit_statistics(qubit_amount, columns)
+    chi = float(get_max_bond_dimension(qubit_amount, statistics["bond_crossings"]))
+    operations["mps"] = estimate_backend(qubit_amount, statistics, "mps")["seconds"] * operations_per_second + bitstring_count * qubit_amount * chi ** 2
+    return {
+        "method": min(operations, key=operations.get),
+        "operations": operations
+    }
+
+def get_amplitudes(qubit_amount : int, columns, bitstrings : list, method : str="auto"):
+    """
+    Returns the amplitudes <x|C|0...0> of the requested basis states (strings of 0 and 1, qubit 0 first) without
+    building the 2^n statevector, by Feynman path summation or MPS contraction ("auto" picks the cheapest estimate).
+    Returns the amplitudes and the method used.
+    """
+    if method not in implemented_amplitude_methods:
+        raise NameError(f"{method} amplitude method not found")
+    columns = list(columns)
+    for bitstring in bitstrings:
+        parse_bitstring(bitstring, qubit_amount)
+    plan = plan_amplitudes(qubit_amount, columns, len(bitstrings))
+    if method == "auto":
+        method = plan["method"]
+    if method == "feynman":
+        if qubit_amount > max_feynman_qubits:
+            raise ValueError(f"Feynman path summation supports at most {max_feynman_qubits} qubits")
+        return get_feynman_amplitudes(qubit_amount, columns, bitstrings), method
+    return get_mps_amplitudes(qubit_amount, columns, bitstrings), method
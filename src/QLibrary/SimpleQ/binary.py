@@ -0,0 +1,58 @@
+import struct
+
+import numpy as np
+
+# Binary circuit format: a header (magic, qubit amount, column amount) followed by one fixed-width record per column
+binary_magic = b"SQC1"
+binary_header = struct.Struct("<4sHI")
+binary_content_type = "application/x-simpleq-circuit"
+opcodes = ["X", "Y", "Z", "H", "M", "R"]
+record_dtype = np.dtype([
+    ("opcode", "u1"),
+    ("condition_value", "i1"), # -1 without classical condition
+    ("target", "<u2"),
+    ("condition_qubit", "<u2"),
+    ("controls", "<u8") # bit i set when qubit i is a control
+])
+max_binary_qubits = 64
+
+def encode_records(records : np.array, qubit_amount : int):
+    """
+    Returns the binary circuit format of already built records.
+    """
+    if qubit_amount > max_binary_qubits:
+        raise ValueError(f"The binary format supports at most {max_binary_qubits} qubits")
+    return binary_header.pack(binary_magic, qubit_amount, len(records)) + records.tobytes()
+
+def decode_records(data : bytes):
+    """
+    Parses and validates the binary circuit format without building column objects.
+    Returns the qubit amount and the records.
+    """
+    if len(data) < binary_header.size:
+        raise ValueError("Invalid binary circuit: truncated header")
+    magic, qubit_amount, column_amount = binary_header.unpack_from(data)
+    if magic != binary_magic:
+        raise ValueError("Invalid binary circuit: wrong magic number")
+    if len(data) != binary_header.size + column_amount * record_dtype.itemsize:
+        raise ValueError("Invalid binary circuit: wrong length")
+    records = np.frombuffer(data, dtype=record_dtype, offset=binary_header.size, count=column_amount)
+    validate_records(records, qubit_amount)
+    return qubit_amount, records
+
+def validate_records(records : np.array, qubit_amount : int):
+    """
+    Checks every record at once (gate, qubit indexes, controls and classical conditions) and raises a ValueError if one is invalid.
+    """
+    if qubit_amount > max_binary_qubits:
+        raise ValueError(f"The binary format supports at most {max_binary_qubits} qubits")
+    opcode_values, targets = records["opcode"], records["target"]
+    if np.any(opcode_values >= len(opcodes)) or np.any(targets >= qubit_amount):
+        raise ValueError("Invalid binary circuit: unknown gate or qubit index")
+    conditioned = records["condition_value"] >= 0
+    if np.any(records["condition_value"] > 1) or np.any(records["condition_value"] < -1) or np.any(records["condition_qubit"][conditioned] >= qubit_amount):
+        raise ValueError("Invalid binary circuit: invalid classical condition")
+    controls = records["controls"]
+    outside_register = qubit_amount < max_binary_qubits and np.any(controls >> np.uint64(qubit_amount))
+    if outside_register or np.any((controls >> targets.astype(np.uint64)) & np.uint64(1)):
+        raise ValueError("Invalid binary circuit: invalid control qubits")
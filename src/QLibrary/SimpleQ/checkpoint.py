@@ -0,0 +1,137 @@
+import threading
+from collections import OrderedDict
+
+from src.QLibrary.SimpleQ.column import Column
+from src.QLibrary.SimpleQ.metrics import checkpoint_requests
+from src.Logger.logger import logger, LogLevel
+
+def get_column_key(column : Column):
+    """
+    Returns a hashable description of a column, used to find the prefix two versions of a circuit have in common.
+    """
+    gate = column.get_gate()
+    condition = tuple(column.get_condition()) if column.get_condition() is not None else None
+    return (type(column).__name__, gate.get_name(), column.get_index(), tuple(gate.get_ctrl()), condition)
+
+def is_deterministic(column : Column):
+    """
+    Checks if a column always leads to the same state (no measurement, reset or classical condition).
+    Checkpoints are only taken on deterministic prefixes, a sampled outcome must not be replayed from the cache.
+    """
+    return type(column) is Column and column.get_condition() is None
+
+class CheckpointEntry:
+    """
+    Checkpoints of one circuit.
+
+    Attributes
+    ----------
+    qubit_amount, backend, dtype :
+        register size, backend and precision the checkpoints were computed for
+    keys : list[tuple]
+        keys of the simulated columns (see `get_column_key`)
+    snapshots : dict
+        position -> state snapshot after the first `position` columns
+    lock : threading.Lock
+        held while a circuit is simulated from these checkpoints
+    """
+
+    def __init__(self, qubit_amount : int, backend : str, dtype):
+        self.qubit_amount = qubit_amount
+        self.backend = backend
+        self.dtype = dtype
+        self.keys = []
+        self.snapshots = {}
+        self.lock = threading.Lock()
+
+    def matches(self, circuit):
+        return self.qubit_amount == circuit.get_qubit_amount() and self.backend == circuit.backend and self.dtype == circuit.dtype
+
+class CheckpointCache:
+    """
+    A bounded LRU cache of statevector checkpoints, used to re-simulate edited circuits incrementally.
+
+    For each circuit (identified by a key, e.g. its database id), the state is stored every `interval` columns and after
+    the last simulated column. An edit at position p resumes from the last checkpoint before p, and appending a gate costs
+    a single gate application. Only the `max_circuits` most recently used circuits are kept.
+
+    Attributes
+    ----------
+    interval : int
+        number of columns between two checkpoints
+    max_circuits : int
+        maximum number of circuits with checkpoints
+    entries : OrderedDict
+        circuit key -> CheckpointEntry, from least to most recently used
+    lock : threading.Lock
+        guards `entries`: simulations run in worker threads, those of different circuits in parallel
+    """
+
+    def __init__(self, interval : int=16, max_circuits : int=32):
+        if interval < 1 or max_circuits < 1:
+            raise ValueError("The checkpoint interval and the cache size must be at least 1")
+        self.interval = interval
+        self.max_circuits = max_circuits
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def get_entry(self, key, circuit):
+        """
+        Returns the entry of a circuit (marked as most recently used), creating it if needed and evicting the least recently used one.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or not entry.matches(circuit):
+                entry = CheckpointEntry(circuit.get_qubit_amount(), circuit.backend, circuit.dtype)
+                self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_circuits:
+                evicted, _ = self.entries.popitem(last=False)
+                logger.log(f"CheckpointCache - get_entry: evicted circuit {evicted}", LogLevel.DEBUG)
+        return entry
+
+    def simulate(self, key, circuit):
+        """
+        Runs `circuit` from the latest valid checkpoint of `key` instead of |0...0>, and updates the checkpoints.
+        The circuit must be freshly built (in its initial state).
+        Returns the position the simulation resumed from and the number of applied columns.
+        """
+        entry = self.get_entry(key, circuit)
+        # Concurrent requests on the same circuit would read and rewrite its checkpoints at the same time
+        with entry.lock:
+            columns = circuit.circuit
+            keys = [get_column_key(column) for column in columns]
+            # Longest common prefix between the cached columns and the new ones
+            prefix = 0
+            while prefix < min(len(keys), len(entry.keys)) and keys[prefix] == entry.keys[prefix]:
+                prefix += 1
+            # Checkpoints after the first edited column are stale
+            entry.snapshots = {position: snapshot for position, snapshot in entry.snapshots.items() if position <= prefix}
+            start = max(entry.snapshots, default=0)
+            checkpoint_requests.inc(1, ("hit" if start > 0 else "miss",))
+            if start > 0:
+                circuit.set_state_snapshot(entry.snapshots[start])
+            deterministic = True # checkpoints only exist on deterministic prefixes
+            for position in range(start, len(columns)):
+                deterministic = deterministic and is_deterministic(columns[position])
+                circuit.execute_column(columns[position])
+                if deterministic and ((position + 1) % self.interval == 0 or position + 1 == len(columns)):
+                    entry.snapshots[position + 1] = circuit.get_state_snapshot()
+            # Keep the regular grid and the final checkpoint (the previous final checkpoint is dropped)
+            entry.snapshots = {position: snapshot for position, snapshot in entry.snapshots.items()
+                               if position % self.interval == 0 or position == len(columns)}
+            entry.keys = keys
+            if circuit.backend == "inplace":
+                circuit.buffer.normalize()
+        logger.log(f"CheckpointCache - simulate: circuit {key} resumed from column {start}, {len(columns) - start} columns applied", LogLevel.INFO)
+        return {
+            "resumed_from": start,
+            "columns_applied": len(columns) - start
+        }
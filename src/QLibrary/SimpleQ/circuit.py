@@ -1,7 +1,23 @@
 import numpy as np
 
-from src.QLibrary.SimpleQ.column import Column
-from src.QLibrary.SimpleQ.tools import prepare_initial_state, build_unitary, get_distribution
+from src.QLibrary.SimpleQ.column import Column, MeasureColumn, ResetColumn
+from src.QLibrary.SimpleQ.tools import prepare_initial_state, get_distribution, get_sampling_probabilities, get_precision_dtype
+from src.QLibrary.SimpleQ.tools import get_probabilities, get_joint_distribution
+from src.QLibrary.SimpleQ.tools import insert_qubit_state, remove_qubit_state
+from src.QLibrary.SimpleQ.mps import MPS
+from src.QLibrary.SimpleQ.factorized import FactorizedState
+from src.QLibrary.SimpleQ.statebuffer import StateBuffer
+from src.QLibrary.SimpleQ.lightcone import prune_light_cone
+from src.QLibrary.SimpleQ.optimizer import optimize_columns
+from src.QLibrary.SimpleQ.binary import encode_records, decode_records
+from src.QLibrary.SimpleQ.columntable import ColumnTable
+from src.QLibrary.SimpleQ.ingest import ingest_columns
+from src.QLibrary.SimpleQ.scheduler import schedule_moments, is_fusable, apply_moment
+from src.QLibrary.SimpleQ.profiler import ColumnProfiler
+from src.QLibrary.SimpleQ.sampler import Sampler
+from src.QLibrary.SimpleQ.observables import get_expectation, get_pauli_expectations
+from src.QLibrary.SimpleQ.snapshot import load_snapshot, get_columns_hash, snapshot_backends, snapshot_version
+from src.QLibrary.SimpleQ.metrics import timed_phase, circuit_qubits, circuit_columns, columns_executed, measurements, state_peak_bytes
 from src.Logger.logger import logger, LogLevel
 from src.QLibrary.SimpleQ.qubit import Qubit
 
@@ -13,54 +29,197 @@ class Circuit:
 
     Attributes
     ----------
-    quantum_register : list[Qubit]
-        qubits stockage
-    circuit : list[Column]
-        gates representation
+    qubit_amount : int
+        number of qubits
+    circuit : ColumnTable
+        gates representation, stored as parallel arrays (a list of columns can be assigned)
     gate_register : list[Gate]
         custom gates
+    backend : str
+        "statevector" (dense unitaries), "inplace" (preallocated ping-pong buffers, no allocation per gate)
+        "factorized" (one small statevector per group of interacting qubits)
+        or "mps" (matrix product state, for wide low-entanglement circuits)
+    dtype : np.dtype
+        precision of the statevector and gate matrices (complex64 or complex128)
+    classical_register : list[dict]
+        last measurement result of each qubit
+    measurement_requests : list[tuple]
+        deferred measurements (index, shots, simulation), resolved together by `resolve_measurements`
+    joint_register : dict
+        joint outcome of the last resolved deferred measurements
+    optimization_statistics : dict
+        statistics of the last `optimize` call
+    profiler : ColumnProfiler
+        per-column costs of the last profiled run (`launch_circuit(profile=True)`)
+    samplers : dict
+        sampled qubits (tuple, None for all) -> Sampler of the current state, cleared whenever the state changes
     """
 
-    def __init__(self, qubit_amount):
-        self.quantum_register = [Qubit() for _ in range(qubit_amount)]
-        self.system_matrix = prepare_initial_state(qubit_amount)
-        self.circuit = []
+    def __init__(self, qubit_amount, backend="statevector", max_bond_dimension=None, truncation_threshold=1e-12, precision="complex128"):
+        implemented_backends = ["statevector", "inplace", "factorized", "mps"]
+        if backend not in implemented_backends:
+            raise NameError(f"{backend} backend not found")
+        self.backend = backend
+        self.backend_options = {"max_bond_dimension": max_bond_dimension, "truncation_threshold": truncation_threshold}
+        self.dtype = get_precision_dtype(precision)
+        self.qubit_amount = qubit_amount
+        self.mps = None
+        self.factorized = None
+        self.buffer = None
+        self.system_matrix = None
+        if backend == "mps":
+            self.mps = MPS(qubit_amount, max_bond_dimension, truncation_threshold, self.dtype)
+        elif backend == "factorized":
+            self.factorized = FactorizedState(qubit_amount, self.dtype)
+        elif backend == "inplace":
+            self.buffer = StateBuffer(qubit_amount, self.dtype)
+            self.system_matrix = self.buffer.get_state()
+        else:
+            self.system_matrix = prepare_initial_state(qubit_amount, self.dtype)
+        self.columns = ColumnTable(self.dtype)
         self.classical_register = [None for _ in range(qubit_amount)]
-        logger.log(f"Circuit - __init__: created new circuit with {str(len(self.quantum_register))} qubits.", LogLevel.INFO)
-        logger.log(f"Circuit - __init_: system matrix : {self.system_matrix}", LogLevel.DEBUG)
+        self.measurement_requests = []
+        self.joint_register = None
+        self.optimization_statistics = None
+        self.profiler = None
+        self.samplers = {}
+        logger.log(f"Circuit - __init__: created new circuit with {str(self.qubit_amount)} qubits.", LogLevel.INFO)
+        if logger.is_enabled(LogLevel.DEBUG):
+            logger.log(f"Circuit - __init_: system matrix : {self.system_matrix}", LogLevel.DEBUG)
+
+    @property
+    def circuit(self):
+        return self.columns
+
+    @circuit.setter
+    def circuit(self, columns):
+        self.columns = columns if isinstance(columns, ColumnTable) else ColumnTable.from_columns(columns, self.dtype)
 
+    @timed_phase("serialization")
     def circuit_to_json(self):
         circ = []
         for column in self.circuit:
             circ.append(column.column_to_json())
         circuit_json = {
-            "nb_qubit": str(len(self.quantum_register)),
+            "nb_qubit": str(self.qubit_amount),
             "circuit": circ
         }
         return circuit_json
 
+    @timed_phase("serialization")
+    def circuit_to_binary(self):
+        """
+        Returns the circuit in the compact binary format (fixed-width records of opcode, target and control bitmask).
+        """
+        return encode_records(self.columns.to_records(), self.qubit_amount)
+
+    def get_qubit_amount(self):
+        return self.qubit_amount
+
     def get_quantum_register(self):
-        return self.quantum_register
+        return [Qubit() for _ in range(self.qubit_amount)]
 
     def get_gate_register(self):
         return self.gate_register
 
     def get_system_matrix(self):
+        if self.backend == "mps":
+            return self.mps.to_statevector()
+        if self.backend == "factorized":
+            return self.factorized.to_statevector()
         return self.system_matrix
 
+    def get_state_nbytes(self):
+        """
+        Returns the memory used by the simulated state, in bytes.
+        """
+        if self.backend == "mps":
+            return sum(tensor.nbytes for tensor in self.mps.tensors)
+        if self.backend == "factorized":
+            return sum(tensor.nbytes for _, tensor in self.factorized.components)
+        if self.backend == "inplace":
+            return self.buffer.state.nbytes + self.buffer.scratch.nbytes
+        return self.system_matrix.nbytes
+
+    def get_truncation_error(self):
+        if self.backend == "mps":
+            return self.mps.get_truncation_error()
+        return 0.
+
     def add_qubit(self, index=None):
+        """
+        Inserts a qubit in |0> at `index` (at the end by default).
+        The state is extended in place of a re-run and every column, classical result and deferred request is renumbered.
+        """
         if index is None:
-            self.quantum_register.append(Qubit())
+            index = self.qubit_amount
+        if index < 0 or index > self.qubit_amount:
+            raise ValueError("Invalid qubit index")
+        self.columns.insert_qubit(index)
+        self.classical_register.insert(index, None)
+        self.measurement_requests = [(qubit + (qubit >= index), shots, simulation) for qubit, shots, simulation in self.measurement_requests]
+        if self.backend == "mps":
+            self.mps.insert_qubit(index)
+        elif self.backend == "factorized":
+            self.factorized.insert_qubit(index)
+        elif self.backend == "inplace":
+            self.buffer.insert_qubit(index)
+            self.system_matrix = self.buffer.get_state()
         else:
-            self.quantum_register.insert(index, Qubit())
+            self.system_matrix = insert_qubit_state(self.system_matrix, self.qubit_amount, index)
+        self.qubit_amount += 1
+        self.samplers.clear()
+        logger.log(f"Circuit-add_qubit : added qubit {index}", LogLevel.INFO)
+        return self
 
     def get_classical_register(self):
         return self.classical_register
 
-    def delete_qubit(self, index):
-        self.quantum_register.pop(index)
+    def delete_qubit(self, index, outcome=None):
+        """
+        Removes qubit `index` and every column acting on it.
+
+        A qubit entangled with the rest of the register cannot be removed from a pure state, so it is projected first:
+        on `outcome` if given, otherwise on an outcome sampled from its probabilities (a qubit in a basis state always
+        gives the same result). The other qubits and columns are renumbered.
+        Gates the qubit only controls are removed when it is projected on 0, and kept without that control on 1.
+        Returns the outcome the qubit was projected on.
+        """
+        if index < 0 or index >= self.qubit_amount:
+            raise ValueError("Invalid qubit index")
+        if self.qubit_amount == 1:
+            raise ValueError("Cannot remove the last qubit of the register")
+        probabilities = get_sampling_probabilities(*self.get_qubit_probabilities(index))
+        if outcome is None:
+            outcome = np.random.choice([0, 1], p=probabilities)
+        elif outcome not in (0, 1):
+            raise ValueError("Invalid outcome, expected 0 or 1")
+        elif probabilities[outcome] < 1e-12:
+            # Projecting on it would divide the state by a null norm
+            raise ValueError(f"Qubit {index} cannot be projected on {outcome}, it has a zero probability")
+        self.collapse([index], [outcome])
+        if outcome == 1:
+            # A control in |1> is always satisfied
+            self.columns.clear_control(index)
+        self.columns.keep_columns(~self.columns.get_qubit_usage(index))
+        self.columns.delete_qubit(index)
+        self.classical_register.pop(index)
+        self.measurement_requests = [(qubit - (qubit > index), shots, simulation) for qubit, shots, simulation in self.measurement_requests if qubit != index]
+        if self.backend == "mps":
+            self.mps.delete_qubit(index, outcome)
+        elif self.backend == "factorized":
+            self.factorized.delete_qubit(index, outcome)
+        elif self.backend == "inplace":
+            self.buffer.delete_qubit(index, outcome)
+            self.system_matrix = self.buffer.get_state()
+        else:
+            self.system_matrix = remove_qubit_state(self.system_matrix, self.qubit_amount, index, outcome)
+        self.qubit_amount -= 1
+        self.samplers.clear()
+        logger.log(f"Circuit-delete_qubit : removed qubit {index} (projected on {outcome})", LogLevel.INFO)
+        return outcome
 
-    def set_gate(self, gate_name, index, ctrl=[]):
+    def set_gate(self, gate_name, index, ctrl=[], condition=None):
         """
         Add a gate to the circuit.
         Parameters
@@ -71,35 +230,59 @@ class Circuit:
             qubit index
         ctrl : int?
             control qubit index
+        condition : tuple(int, int)?
+            classical condition (qubit index, value), the gate is only applied if the last measurement of that qubit gave this value
         """
         
         implemented_gates = ["X", "Y", "Z", "H"]
         if gate_name not in implemented_gates:
             raise NameError(f"{gate_name} gate not found")
-        self.circuit.append(Column(index, gate_name, ctrl))
+        self.columns.append_column(gate_name, index, ctrl, condition)
         logger.log(f"Circuit-set_gate : added {gate_name} gate at index {index}", LogLevel.INFO)
         return self
 
-    def measure(self, index, shots=1000, simulation=False):
-        psi = self.system_matrix
-        # Our measurement operators in the {|0>,|1>} basis
-        M0 = np.array([[1, 0],
-                       [0, 0]])
-        M1 = np.array([[0, 0],
-                       [0, 1]])
-
-        # Build unitary measurement operators
-        M0 = build_unitary(M0, len(self.quantum_register), index)
-        M1 = build_unitary(M1, len(self.quantum_register), index)
-
-        # Get associate probabilities to obtain 0 or 1
-        p0 = psi.conjugate() @ M0.conjugate().T @ M0 @ psi
-        p1 = psi.conjugate() @ M1.conjugate().T @ M1 @ psi
-        
+    def set_measure(self, index, condition=None):
+        """
+        Add a mid-circuit measurement of a qubit, its outcome is written to the classical register.
+        """
+        self.columns.append_column("M", index, [], condition)
+        logger.log(f"Circuit-set_measure : added measurement at index {index}", LogLevel.INFO)
+        return self
+
+    def set_reset(self, index, condition=None):
+        """
+        Add a reset of a qubit to |0>.
+        """
+        self.columns.append_column("R", index, [], condition)
+        logger.log(f"Circuit-set_reset : added reset at index {index}", LogLevel.INFO)
+        return self
+
+    @timed_phase("measurement")
+    def measure(self, index, shots=1000, simulation=False, deferred=False):
+        """
+        Measures a qubit and stores the result in the classical register.
+        Parameters
+        ----------
+        index : int
+            qubit index
+        shots : int
+            number of trials of the simulated distribution
+        simulation : bool
+            sample an outcome and collapse the state
+        deferred : bool
+            only record the request, see `resolve_measurements`
+        """
+        if deferred:
+            self.measurement_requests.append((index, shots, simulation))
+            logger.log(f"Circuit-measure : deferred measurement of qubit {index}", LogLevel.INFO)
+            return None
+        measurements.inc(1, (self.backend,))
+        # Probabilities come from the marginal of the qubit (cached with the state's sampler), no measurement operator is built
+        p0, p1 = self.get_qubit_probabilities(index)
         results = {
             "proba": {
                 "p0": p0,
-                "p1": p1, 
+                "p1": p1,
             },
             "simulation" : None
         }
@@ -107,37 +290,549 @@ class Circuit:
             # Get probability statistics
             distribution = get_distribution(p0, p1, shots)
             # Perform measurement according to probabilities
-            measure = np.random.choice([0, 1], size=1, p=[p0, p1])
-            simulation = {
+            measure = np.random.choice([0, 1], size=1, p=get_sampling_probabilities(p0, p1))
+            results["simulation"] = {
                 "distribution": distribution,
                 "measurement": measure[0]
             }
-            results["simulation"] = simulation
             # Update state vector
-            if measure[0] == 0:
-                psi = (M0 @ psi) / np.sqrt(p0)
-            else:
-                psi = (M1 @ psi) / np.sqrt(p1)
-            self.system_matrix = psi
-
+            self.collapse([index], [measure[0]])
         self.classical_register[index] = results
         return results
 
-    def measure_all(self, shots=1000, simulation=False):
-        for i in range(len(self.quantum_register)):
-            self.measure(i, shots, simulation)
+    def measure_all(self, shots=1000, simulation=False, deferred=False):
+        for i in range(self.qubit_amount):
+            self.measure(i, shots, simulation, deferred)
+
+    @timed_phase("measurement")
+    def resolve_measurements(self):
+        """
+        Resolves every deferred measurement at once from a single |psi|^2 array.
+
+        The requested qubits are sampled jointly (with the largest requested number of shots, and simulated if any request
+        asked for it), so their outcomes stay correlated. Each qubit also gets its usual entry in the classical register.
+        Returns the joint result, also stored in `joint_register`.
+        """
+        if self.measurement_requests == []:
+            return None
+        qubits = list(dict.fromkeys(index for index, _, _ in self.measurement_requests))
+        shots = max(request_shots for _, request_shots, _ in self.measurement_requests)
+        simulation = any(request_simulation for _, _, request_simulation in self.measurement_requests)
+        self.measurement_requests = []
+
+        sampler = self.get_sampler(qubits)
+        marginal = sampler.probabilities
+        qubit_count = len(qubits)
+        results = {
+            "qubits": qubits,
+            "proba": {format(outcome, f"0{qubit_count}b"): p for outcome, p in enumerate(marginal) if p > 0},
+            "simulation": None
+        }
+        if simulation:
+            outcomes = sampler.sample(shots)
+            measurement = sampler.sample(1)[0]
+            results["simulation"] = {
+                "distribution": get_joint_distribution(outcomes, qubit_count),
+                "measurement": format(measurement, f"0{qubit_count}b")
+            }
+
+        joint = marginal.reshape((2,) * qubit_count)
+        measured_bits = []
+        for position, index in enumerate(qubits):
+            other_axes = tuple(axis for axis in range(qubit_count) if axis != position)
+            p0, p1 = np.sum(joint, axis=other_axes)
+            qubit_results = {
+                "proba": {
+                    "p0": p0,
+                    "p1": p1,
+                },
+                "simulation": None
+            }
+            if simulation:
+                bits = (outcomes >> (qubit_count - 1 - position)) & 1
+                bit = (measurement >> (qubit_count - 1 - position)) & 1
+                measured_bits.append(bit)
+                qubit_results["simulation"] = {
+                    "distribution": {"0": int(shots - np.sum(bits)), "1": int(np.sum(bits))},
+                    "measurement": bit
+                }
+            self.classical_register[index] = qubit_results
+        if simulation:
+            self.collapse(qubits, measured_bits)
+
+        self.joint_register = results
+        logger.log(f"Circuit-resolve_measurements : resolved qubits {qubits}", LogLevel.INFO)
+        return results
+
+    def collapse(self, qubits, outcomes):
+        """
+        Projects the given qubits on the measured outcomes and renormalises the state in place.
+        """
+        self.samplers.clear()
+        if self.backend == "mps":
+            for index, outcome in zip(qubits, outcomes):
+                self.mps.collapse(index, outcome)
+            return
+        if self.backend == "factorized":
+            for index, outcome in zip(qubits, outcomes):
+                self.factorized.collapse(index, outcome)
+            return
+        if self.backend == "inplace":
+            for index, outcome in zip(qubits, outcomes):
+                self.buffer.collapse(index, outcome)
+            self.system_matrix = self.buffer.get_state()
+            return
+        psi = self.system_matrix.reshape((2,) * self.qubit_amount)
+        for index, outcome in zip(qubits, outcomes):
+            slices = [slice(None)] * psi.ndim
+            slices[index] = 1 - outcome
+            psi[tuple(slices)] = 0
+        self.system_matrix /= np.linalg.norm(self.system_matrix)
+
+    def get_marginal(self, qubits):
+        """
+        Returns the marginal probabilities of a subset of qubits (first qubit as the most significant bit).
+        With the mps backend the state is contracted first, so only small registers are supported.
+        """
+        if self.backend == "factorized":
+            return self.factorized.get_marginal(qubits)
+        return self.get_sampler().get_marginal(qubits)
+
+    def get_sampler(self, qubits=None):
+        """
+        Returns the sampler of the joint outcome of a subset of qubits (all of them by default).
+        It is built once from |psi|^2 and reused until the state changes, so repeated sampling recomputes nothing.
+        """
+        key = tuple(qubits) if qubits is not None else None
+        sampler = self.samplers.get(key)
+        if sampler is None:
+            if key is not None:
+                probabilities = self.get_marginal(list(key))
+            elif self.backend == "factorized":
+                probabilities = self.factorized.get_marginal(list(range(self.qubit_amount)))
+            else:
+                probabilities = get_probabilities(self.get_system_matrix())
+            sampler = self.samplers[key] = Sampler(probabilities)
+        return sampler
+
+    def get_joint_distribution(self, qubits=None, shots=1000):
+        """
+        Samples the joint outcome of a subset of qubits (all of them by default) and returns the histogram of bitstrings.
+        """
+        return self.get_sampler(qubits).get_histogram(shots)
+
+    def get_expectation(self, hamiltonian):
+        """
+        Returns the exact expectation value of a weighted Pauli-string Hamiltonian on the current state, without sampling.
+        Parameters
+        ----------
+        hamiltonian : dict | list
+            pauli string -> coefficient, or (coefficient, pauli string) pairs, e.g. {"ZZI": 1.0, "XIX": 0.5}
+            (one I, X, Y or Z per qubit, qubit 0 first)
+        """
+        expectation, _ = get_expectation(self.get_system_matrix(), hamiltonian)
+        return expectation
+
+    def get_pauli_expectations(self, pauli_strings):
+        """
+        Returns the exact expectation value of each Pauli string on the current state (strings with the same X/Y
+        support share one permuted copy of the state, see `observables.get_pauli_expectations`).
+        """
+        return get_pauli_expectations(self.get_system_matrix(), pauli_strings)
+
+    def get_amplitudes(self, bitstrings, method="auto"):
+        """
+        Returns the amplitude <x|C|0...0> of each requested basis state (bitstring -> complex), without simulating the
+        circuit nor building its statevector (see `amplitudes.get_amplitudes`).
+        Parameters
+        ----------
+        bitstrings : list[str]
+            basis states, one 0 or 1 per qubit, qubit 0 first
+        method : str
+            "feynman" (path summation), "mps" (tensor contraction) or "auto" for the cheapest estimate
+        """
+        # Imported here: the amplitude planner relies on the estimator, which imports this module
+        from src.QLibrary.SimpleQ.amplitudes import get_amplitudes
+        values, _ = get_amplitudes(self.qubit_amount, self.circuit, bitstrings, method)
+        return dict(zip(bitstrings, values.tolist()))
+
+    def stream_samples(self, shots, batch_size=65536, qubits=None):
+        """
+        Yields `shots` sampled joint outcomes of a subset of qubits (all of them by default), as arrays of at most
+        `batch_size` outcome indexes (first qubit as the most significant bit). The state is not collapsed.
+        """
+        return self.get_sampler(qubits).stream(shots, batch_size)
     
-    def launch_circuit(self):
-        for column in self.circuit:
-            self.system_matrix = column.apply_column(self.system_matrix, len(self.quantum_register))
-        logger.log(f"Circuit-launch_circuit : Final obtained vector state : {self.system_matrix}", LogLevel.INFO)
+    @timed_phase("compile")
+    def optimize(self):
+        """
+        Cancels pairs of identical self-inverse gates (H H, X X, controlled gates undoing each other...), commuting
+        gates past each other where legal to expose more cancellations, until a fixed point is reached.
+        Returns the optimization statistics, also stored in `optimization_statistics`.
+        """
+        self.circuit, self.optimization_statistics = optimize_columns(self.circuit)
+        return self.optimization_statistics
+
+    @timed_phase("compile")
+    def light_cone(self, qubits):
+        """
+        Returns a reduced circuit that only contains what can influence the measurement of `qubits`.
+
+        Columns outside the past light cone of the measured qubits are dropped and the register is shrunk to the
+        relevant qubits, renumbered in their original order. The reduced circuit uses the same backend and precision.
+        Returns the reduced circuit and the pruning statistics (removed columns and qubits, old index -> new index map).
+        """
+        kept, relevant = prune_light_cone(self.circuit, qubits)
+        qubit_map = {qubit: new_index for new_index, qubit in enumerate(relevant)}
+        reduced = Circuit(len(relevant), self.backend, precision=self.dtype.name, **self.backend_options)
+        reduced.circuit = [self.circuit[position].remap(qubit_map) for position in kept]
+        statistics = {
+            "columns_removed": len(self.circuit) - len(kept),
+            "qubits_removed": self.qubit_amount - len(relevant),
+            "qubit_map": qubit_map
+        }
+        logger.log(f"Circuit-light_cone : removed {statistics['columns_removed']} columns and {statistics['qubits_removed']} qubits", LogLevel.INFO)
+        return reduced, statistics
+
+    def measure_light_cone(self, qubits, shots=1000, simulation=False):
+        """
+        Runs only the light cone of `qubits` and measures them, without simulating the rest of the circuit.
+        Results are written to this circuit's classical register. The state of this circuit is left untouched.
+        Returns the results of every measured qubit and the pruning statistics.
+        """
+        reduced, statistics = self.light_cone(qubits)
+        reduced.launch_circuit()
+        results = {}
+        for qubit in qubits:
+            results[qubit] = reduced.measure(statistics["qubit_map"][qubit], shots, simulation)
+            self.classical_register[qubit] = results[qubit]
+        return {
+            "results": results,
+            "pruning": statistics
+        }
+
+    @timed_phase("compile")
+    def get_moments(self):
+        """
+        Returns the columns grouped into moments (columns acting on disjoint qubits), see `schedule_moments`.
+        """
+        return schedule_moments(self.circuit)
+
+    def get_depth(self):
+        return len(self.get_moments())
+
+    @timed_phase("gate_application")
+    def launch_circuit(self, fuse_moments=False, profile=False, trace_memory=True, snapshots=None, resume=False):
+        """
+        Runs every column of the circuit on the current state.
+        Parameters
+        ----------
+        fuse_moments : bool
+            with the statevector backend, apply each moment of gates as fused tensor contractions on the statevector
+            instead of one dense unitary per column (ignored by the other backends)
+        profile : bool
+            record the time, allocations, kernel and transpiler SWAPs of each column in `profiler`
+            (the unprofiled loop is left untouched)
+        trace_memory : bool
+            when profiling, record the bytes allocated by each column (tracemalloc slows the run down)
+        snapshots : SnapshotWriter
+            save the state to disk in the background at the writer's intervals and after the last column
+            (snapshots are taken between columns, so moments are not fused)
+        resume : bool
+            with `snapshots`, restart from the writer's last snapshot if there is one instead of the current state
+        """
+        fuse_moments = fuse_moments and self.backend == "statevector" and snapshots is None
+        start = 0
+        if snapshots is not None:
+            self.check_snapshot_backend()
+            if resume:
+                start = self.load_disk_snapshot(snapshots.path)
+            snapshots.start(start)
+        if profile:
+            self.profiler = ColumnProfiler(trace_memory)
+            with self.profiler:
+                if fuse_moments:
+                    self.launch_moments(self.profiler)
+                else:
+                    for position, column in self.iterate_columns(start, snapshots):
+                        self.profiler.record_column(position, column, self.backend, self.condition_met(column), self.execute_column, column)
+        elif fuse_moments:
+            self.launch_moments()
+        else:
+            for _, column in self.iterate_columns(start, snapshots):
+                self.execute_column(column)
+        if snapshots is not None:
+            snapshots.flush()
+            snapshots.submit(*self.get_disk_snapshot(len(self.circuit)))
+            snapshots.flush()
+        if self.backend == "mps":
+            logger.log(f"Circuit-launch_circuit : bond dimensions {self.mps.get_bond_dimensions()}, truncation error {self.mps.get_truncation_error()}", LogLevel.INFO)
+        elif self.backend == "factorized":
+            logger.log(f"Circuit-launch_circuit : component sizes {self.factorized.get_component_sizes()}", LogLevel.INFO)
+        elif self.backend == "inplace":
+            self.buffer.normalize()
+            logger.log(f"Circuit-launch_circuit : {len(self.circuit)} columns applied in place, {self.buffer.get_allocation_count()} buffers allocated", LogLevel.INFO)
+        elif logger.is_enabled(LogLevel.INFO):
+            logger.log(f"Circuit-launch_circuit : Final obtained vector state : {self.system_matrix}", LogLevel.INFO)
+        labels = (self.backend,)
+        circuit_qubits.observe(self.qubit_amount)
+        circuit_columns.observe(len(self.circuit))
+        columns_executed.inc(len(self.circuit) - start, labels)
+        state_peak_bytes.set_max(self.get_state_nbytes(), labels)
+
+    def iterate_columns(self, start=0, snapshots=None):
+        """
+        Yields the (position, column) pairs of the circuit from `start`, and hands the state over to a SnapshotWriter
+        once each column has been executed by the caller.
+        """
+        for position, column in enumerate(self.circuit):
+            if position < start:
+                continue
+            yield position, column
+            if snapshots is not None:
+                snapshots.maybe_submit(position + 1, lambda: self.get_disk_snapshot(position + 1))
+
+    def check_snapshot_backend(self):
+        if self.backend not in snapshot_backends:
+            raise ValueError(f"Disk snapshots need a dense backend ({', '.join(snapshot_backends)}), not {self.backend}")
+
+    def get_disk_snapshot(self, position):
+        """
+        Returns a copy of the dense state and the metadata needed to resume the circuit after `position` columns.
+        """
+        self.check_snapshot_backend()
+        metadata = {
+            "version": snapshot_version,
+            "position": position,
+            "qubit_amount": self.qubit_amount,
+            "backend": self.backend,
+            "dtype": np.dtype(self.dtype).name,
+            "circuit_hash": get_columns_hash(self.qubit_amount, self.circuit),
+            # The writer serializes it later, while the run goes on: copy the entries of this position
+            "classical_register": list(self.classical_register)
+        }
+        return self.get_state_snapshot(), metadata
+
+    def load_disk_snapshot(self, path):
+        """
+        Restores the last snapshot written to `path` by a SnapshotWriter and returns the number of columns it had
+        executed (0, with the state untouched, if there is no snapshot yet).
+        Raises a ValueError if the snapshot was taken from another circuit, register size or precision.
+        """
+        state, metadata = load_snapshot(path)
+        if metadata is None:
+            return 0
+        self.check_snapshot_backend()
+        if metadata["version"] != snapshot_version or metadata["qubit_amount"] != self.qubit_amount or metadata["dtype"] != np.dtype(self.dtype).name:
+            raise ValueError(f"Snapshot {path} does not match a {self.qubit_amount} qubit {np.dtype(self.dtype).name} circuit")
+        if metadata["circuit_hash"] != get_columns_hash(self.qubit_amount, self.circuit):
+            raise ValueError(f"Snapshot {path} was taken from another circuit")
+        self.set_state_snapshot(np.array(state, dtype=self.dtype))
+        self.classical_register = metadata["classical_register"]
+        logger.log(f"Circuit-load_disk_snapshot : resumed after column {metadata['position']} from {path}", LogLevel.INFO)
+        return metadata["position"]
+
+    def launch_moments(self, profiler=None):
+        """
+        Runs the circuit moment by moment: the plain gates of a moment are fused, measurements, resets and conditioned
+        gates are executed one by one (they act on other qubits than the rest of the moment).
+        A ColumnProfiler records one event per fused moment and per column executed alone.
+        """
+        qubit_amount = self.qubit_amount
+        moments = self.get_moments()
+        self.samplers.clear()
+        for moment_index, moment in enumerate(moments):
+            fusable = [column for column in moment if is_fusable(column)]
+            if fusable != [] and profiler is None:
+                self.system_matrix = apply_moment(self.system_matrix, fusable, qubit_amount)
+            elif fusable != []:
+                self.system_matrix = profiler.record_moment(moment_index, fusable, apply_moment, self.system_matrix, fusable, qubit_amount)
+            for column in moment:
+                if is_fusable(column):
+                    continue
+                if profiler is None:
+                    self.execute_column(column)
+                else:
+                    profiler.record_column(moment_index, column, self.backend, self.condition_met(column), self.execute_column, column)
+        logger.log(f"Circuit-launch_moments : {len(self.circuit)} columns applied in {len(moments)} moments", LogLevel.INFO)
+
+    def execute_column(self, column, outcome=None):
+        """
+        Executes one column on the current state: a gate, a mid-circuit measurement or a reset.
+        Parameters
+        ----------
+        column : Column
+            column to execute, skipped if its classical condition is not met
+        outcome : int
+            forces the outcome of a measurement or reset instead of sampling it
+        Returns the outcome of a measurement or reset, None otherwise.
+        """
+        if not self.condition_met(column):
+            return None
+        if isinstance(column, (MeasureColumn, ResetColumn)):
+            return self.measure_column(column, outcome)
+        gate = column.get_gate()
+        self.samplers.clear()
+        if self.backend == "mps":
+            logger.log(f"Applying matrix {gate.get_name()} on qubit {column.get_index()} (MPS)", LogLevel.INFO)
+            self.mps.apply_gate(gate.get_gate(), column.get_index(), gate.get_ctrl())
+        elif self.backend == "factorized":
+            self.factorized.apply_gate(gate.get_gate(), column.get_index(), gate.get_ctrl())
+        elif self.backend == "inplace":
+            self.buffer.apply_gate(gate.get_gate(), column.get_index(), gate.get_ctrl())
+            self.system_matrix = self.buffer.get_state()
+        else:
+            self.system_matrix = column.apply_column(self.system_matrix, self.qubit_amount)
+        return None
+
+    def condition_met(self, column):
+        """
+        Checks the classical condition of a column against the classical register (an unmeasured qubit reads 0).
+        """
+        condition = column.get_condition()
+        if condition is None:
+            return True
+        index, value = condition
+        results = self.classical_register[index]
+        measured = 0
+        if results is not None and results["simulation"] is not None:
+            measured = results["simulation"]["measurement"]
+        return measured == value
+
+    def measure_column(self, column, outcome=None):
+        """
+        Measures the column's qubit in place: the state is collapsed and renormalised without being copied.
+        A measurement writes its outcome to the classical register, a reset flips the qubit back to |0>.
+        """
+        index = column.get_index()
+        p0, p1 = self.get_qubit_probabilities(index)
+        if outcome is None:
+            outcome = np.random.choice([0, 1], p=get_sampling_probabilities(p0, p1))
+        self.collapse([index], [outcome])
+        if isinstance(column, ResetColumn):
+            if outcome == 1:
+                self.execute_column(column.get_flip())
+            logger.log(f"Circuit-measure_column : reset qubit {index}", LogLevel.INFO)
+            return outcome
+        self.classical_register[index] = {
+            "proba": {
+                "p0": p0,
+                "p1": p1,
+            },
+            "simulation": {
+                "distribution": {"0": int(outcome == 0), "1": int(outcome == 1)},
+                "measurement": outcome
+            }
+        }
+        logger.log(f"Circuit-measure_column : measured {outcome} on qubit {index}", LogLevel.INFO)
+        return outcome
+
+    def get_qubit_probabilities(self, index):
+        """
+        Returns the probabilities to measure 0 and 1 on a qubit, without building measurement operators.
+        """
+        if self.backend == "mps":
+            return self.mps.get_probabilities(index)
+        if self.backend == "factorized":
+            return self.factorized.get_probabilities(index)
+        if self.backend == "inplace":
+            return self.buffer.get_probabilities(index)
+        p0, p1 = self.get_marginal([index])
+        return p0, p1
+
+    def get_state_snapshot(self):
+        """
+        Returns a copy of the current state, that can be restored with `set_state_snapshot`.
+        """
+        if self.backend == "mps":
+            return self.mps.copy()
+        if self.backend == "factorized":
+            return self.factorized.copy()
+        return self.system_matrix.copy()
+
+    def get_initial_snapshot(self):
+        """
+        Returns a |0...0> state of the circuit's backend, in the format of `get_state_snapshot`.
+        """
+        if self.backend == "mps":
+            return MPS(self.qubit_amount, self.backend_options["max_bond_dimension"], self.backend_options["truncation_threshold"], self.dtype)
+        if self.backend == "factorized":
+            return FactorizedState(self.qubit_amount, self.dtype)
+        return prepare_initial_state(self.qubit_amount, self.dtype)
+
+    def set_state_snapshot(self, snapshot):
+        """
+        Restores a state returned by `get_state_snapshot`. The snapshot itself is left untouched, so it can be reused.
+        """
+        self.samplers.clear()
+        if self.backend == "mps":
+            self.mps = snapshot.copy()
+        elif self.backend == "factorized":
+            self.factorized = snapshot.copy()
+        elif self.backend == "inplace":
+            self.buffer.set_state(snapshot)
+            self.system_matrix = self.buffer.get_state()
+        else:
+            self.system_matrix = snapshot.copy()
+
+    @timed_phase("measurement")
+    def run_shots(self, shots=1000):
+        """
+        Runs the circuit `shots` times, with mid-circuit measurements and resets.
+
+        Shots are grouped by outcome branch: at each measurement the remaining shots are split between outcomes 0 and 1
+        (binomial draw) and the state is copied only when both branches are non-empty. Identical prefixes are therefore
+        simulated once for every shot that follows them.
+        Every shot starts from |0...0> with an empty classical register, whatever the current state (the circuit may
+        already have been run).
+        Returns the histogram of mid-circuit measurement outcomes (in column order) and the number of simulated branches.
+        The circuit is left in the state of the last simulated branch.
+        """
+        histogram = {}
+        branches = 0
+        # Pending branches : (position, shots, outcomes so far, state snapshot, classical register, forced outcome)
+        pending = [(0, shots, "", self.get_initial_snapshot(), [None for _ in range(self.qubit_amount)], None)]
+        while pending != []:
+            position, count, outcomes, snapshot, register, forced = pending.pop()
+            self.set_state_snapshot(snapshot)
+            self.classical_register = register
+            while position < len(self.circuit):
+                column = self.circuit[position]
+                if not isinstance(column, (MeasureColumn, ResetColumn)) or not self.condition_met(column):
+                    self.execute_column(column)
+                    position += 1
+                    continue
+                outcome = forced
+                forced = None
+                if outcome is None:
+                    p1 = get_sampling_probabilities(*self.get_qubit_probabilities(column.get_index()))[1]
+                    count_1 = np.random.binomial(count, p1)
+                    if count_1 != 0 and count_1 != count:
+                        pending.append((position, count_1, outcomes, self.get_state_snapshot(), list(self.classical_register), 1))
+                        count -= count_1
+                        outcome = 0
+                    else:
+                        outcome = 1 if count_1 == count else 0
+                self.execute_column(column, outcome)
+                if isinstance(column, MeasureColumn):
+                    outcomes += str(outcome)
+                position += 1
+            if self.backend == "inplace":
+                self.buffer.normalize()
+            histogram[outcomes] = histogram.get(outcomes, 0) + count
+            branches += 1
+        logger.log(f"Circuit-run_shots : {shots} shots simulated in {branches} branches", LogLevel.INFO)
+        return {
+            "distribution": histogram,
+            "branches": branches
+        }
 
     def print_results(self):
-        for qubit in self.quantum_register:
+        for qubit in self.get_quantum_register():
             qubit.print_state()
 
     def pretty_print(self):
-        m = [["-----" for _ in range(len(self.circuit))] for _ in range(len(self.quantum_register))]
+        m = [["-----" for _ in range(len(self.circuit))] for _ in range(self.qubit_amount)]
         i = 0
         for col in self.circuit:
             m[col.get_index()][i] = f"[ {col.get_gate().get_gate_name()[0]} ]"
@@ -151,6 +846,7 @@ class Circuit:
             print()
 
     @staticmethod
+    @timed_phase("parse")
     def json_to_circuit(json_element):
         circuit_data = json.loads(json_element)
         nb_qubit = circuit_data["nb_qubit"]
@@ -159,8 +855,33 @@ class Circuit:
         for column in columns_data:
             data = json.loads(column)
             gate_data = json.loads(data["qubit_information"])
-            circuit.set_gate(gate_data["gate_name"], data["qubit_index"], gate_data["ctrl_qubits_indexes"])
+            condition = data.get("condition")
+            if gate_data["gate_name"] == "M":
+                circuit.set_measure(data["qubit_index"], condition)
+            elif gate_data["gate_name"] == "R":
+                circuit.set_reset(data["qubit_index"], condition)
+            else:
+                circuit.set_gate(gate_data["gate_name"], data["qubit_index"], gate_data["ctrl_qubits_indexes"], condition)
         return circuit
 
+    @staticmethod
+    @timed_phase("parse")
+    def dict_to_circuit(circuit_data, backend="statevector", precision="complex128"):
+        """
+        Builds a circuit from an already parsed circuit dictionary (API request body) in a single validated pass, see `ingest_columns`.
+        """
+        qubit_amount, columns = ingest_columns(circuit_data, get_precision_dtype(precision))
+        circuit = Circuit(qubit_amount, backend, precision=precision)
+        circuit.circuit = columns
+        return circuit
 
-
+    @staticmethod
+    @timed_phase("parse")
+    def binary_to_circuit(data, backend="statevector", precision="complex128"):
+        """
+        Builds a circuit from the binary format returned by `circuit_to_binary`.
+        """
+        qubit_amount, records = decode_records(data)
+        circuit = Circuit(qubit_amount, backend, precision=precision)
+        circuit.circuit = ColumnTable.from_records(records, circuit.dtype)
+        return circuit
@@ -1,6 +1,8 @@
+import copy
+
 import numpy as np
 
-from src.QLibrary.SimpleQ.tools import Gate, get_gate_by_name, get_control_matrix, build_unitary, get_swap_unitary
+from src.QLibrary.SimpleQ.tools import Gate, get_control_matrix, build_unitary, get_swap_unitary
 from src.Logger.logger import logger, LogLevel
 
 class Column:
@@ -13,24 +15,42 @@ class Column:
         the qubit on which the gate is applied
     gate : Gate
         the quantum gate we are applying at this specific index
+    condition : tuple(int, int)
+        optional classical condition (qubit index, value): the column is only executed if the last measurement of
+        that qubit gave this value
     """
+    __slots__ = ("qubit_index", "gate", "condition")
 
-    def __init__(self, index : int, gate_name : str, ctrl : list=[]):
+    def __init__(self, index : int, gate_name : str, ctrl : list=[], dtype=np.complex128, condition : tuple=None):
         """
         Parameters
         ----------
         index : qubit index
         gate_name : gate identifier
         ctrl : control qubit index
+        dtype : gate matrix dtype
+        condition : classical condition (qubit index, value)
         """
         self.qubit_index = index
-        self.gate : Gate = Gate(gate_name, ctrl)
+        self.gate : Gate = Gate(gate_name, ctrl, dtype)
+        self.condition = tuple(condition) if condition is not None else None
+
+    def __eq__(self, other):
+        """
+        Columns are equal when they are of the same kind and apply the same gate on the same qubits, with the same condition.
+        """
+        if not isinstance(other, Column):
+            return NotImplemented
+        return (type(self) is type(other) and self.qubit_index == other.qubit_index and self.gate.get_name() == other.gate.get_name()
+                and sorted(self.gate.get_ctrl()) == sorted(other.gate.get_ctrl()) and self.condition == other.condition)
 
     def column_to_json(self):
         column_json = {
             "qubit_index": str(self.qubit_index),
             "qubit_information": self.gate.gate_to_json()
         }
+        if self.condition is not None:
+            column_json["condition"] = list(self.condition)
         return column_json
 
     def get_gate(self):
@@ -38,7 +58,41 @@ class Column:
     
     def get_index(self):
         return self.qubit_index
+
+    def get_condition(self):
+        return self.condition
+
+    def remap(self, qubit_map : dict):
+        """
+        Returns a copy of the column with every qubit index (target, controls, condition) replaced through `qubit_map`.
+        The gate matrix is shared with the original column.
+        """
+        column = copy.copy(self)
+        column.qubit_index = qubit_map[self.qubit_index]
+        column.gate = copy.copy(self.gate)
+        column.gate.ctrl = [qubit_map[control] for control in self.gate.get_ctrl()]
+        if self.condition is not None:
+            column.condition = (qubit_map[self.condition[0]], self.condition[1])
+        return column
     
+    def get_swaps(self):
+        """
+        Returns the SWAPs (pairs of neighbouring qubits) the transpiler of `apply_column` inserts to bring the controls next to the target.
+        """
+        index = self.get_index()
+        controls = self.gate.get_ctrl()
+        swaps = []
+        for control in controls:
+            pos = control
+            if control > index or control < index - len(controls):
+                while pos < index - len(controls):
+                    swaps.append((pos, pos + 1))
+                    pos += 1
+                while pos >= index + 1:
+                    swaps.append((pos, pos - 1))
+                    pos -= 1
+        return swaps
+
     def apply_column(self, system_matrix : np.array, len_register : int):
         """
         Decomposes a column to its corresponding gate and applies it to the whole system.
@@ -57,28 +111,22 @@ class Column:
         log_control = f"with control {controls}" if controls != [] else f"without control"
         logger.log(f"Applying matrix {gate.get_name()} on qubit {index} {log_control}", LogLevel.INFO)
         
-        gate_matrix = get_gate_by_name(gate.get_name())
+        gate_matrix = gate.get_gate()
         gate_matrix = build_unitary(gate_matrix, len_register, index, controls)
 
-        logger.log(f"Control gate: {gate_matrix}", LogLevel.DEBUG)
-        whole_unitary = np.identity(2 ** len_register)        
+        # Printing whole matrices is expensive, skip it when DEBUG messages are dropped
+        debug = logger.is_enabled(LogLevel.DEBUG)
+        if debug:
+            logger.log(f"Control gate: {gate_matrix}", LogLevel.DEBUG)
+        whole_unitary = np.identity(2 ** len_register, dtype=gate_matrix.dtype)
 
         if controls == []:
             whole_unitary = whole_unitary @ gate_matrix
         else:
             swap_matrices = []
-            for control in controls:
-                pos = control
-                # Transpiler job
-                if control > index or control < index - len(controls):
-                    while pos < index - len(controls):
-                        logger.log(f"SWAP between {pos} and {pos+1}", LogLevel.DEBUG)
-                        swap_matrices.append(get_swap_unitary(len_register, pos, pos + 1))
-                        pos += 1
-                    while pos >= index + 1:
-                        logger.log(f"SWAP between {pos} and {pos-1}", LogLevel.DEBUG)
-                        swap_matrices.append(get_swap_unitary(len_register, pos, pos - 1))
-                        pos -= 1
+            for pos, next_pos in self.get_swaps():
+                logger.log(f"SWAP between {pos} and {next_pos}", LogLevel.DEBUG)
+                swap_matrices.append(get_swap_unitary(len_register, pos, next_pos, gate_matrix.dtype))
             logger.log(f"Building control matrix for {gate.get_name()} gate and {len(controls)} controls", LogLevel.DEBUG)
             gate_matrix = get_control_matrix(gate, len(controls))
             gate_matrix = build_unitary(gate_matrix, len_register, index, controls)
@@ -91,7 +139,34 @@ class Column:
                     unitary = unitary @ swap_matrix
             whole_unitary = whole_unitary @ unitary
 
-        logger.log(f"Whole unitary: {whole_unitary} @ {system_matrix}", LogLevel.DEBUG)
+        if debug:
+            logger.log(f"Whole unitary: {whole_unitary} @ {system_matrix}", LogLevel.DEBUG)
         system_matrix = whole_unitary @ system_matrix
         
-        return system_matrix / np.linalg.norm(system_matrix)
\ No newline at end of file
+        return system_matrix / np.linalg.norm(system_matrix)
+
+
+class MeasureColumn(Column):
+    """
+    A column measuring one qubit in the middle of the circuit. The outcome is written to the classical register.
+    """
+    __slots__ = ()
+
+    def __init__(self, index : int, dtype=np.complex128, condition : tuple=None):
+        super().__init__(index, "M", [], dtype, condition)
+
+
+class ResetColumn(Column):
+    """
+    A column resetting one qubit to |0> : the qubit is measured, then flipped if the outcome is 1.
+    """
+    __slots__ = ()
+
+    def __init__(self, index : int, dtype=np.complex128, condition : tuple=None):
+        super().__init__(index, "R", [], dtype, condition)
+
+    def get_flip(self):
+        """
+        Returns the X gate applied when the measured outcome is 1.
+        """
+        return Column(self.qubit_index, "X", [], self.gate.get_dtype())
@@ -0,0 +1,258 @@
+import numpy as np
+
+from src.QLibrary.SimpleQ.column import Column, MeasureColumn, ResetColumn
+from src.QLibrary.SimpleQ.binary import opcodes, record_dtype, max_binary_qubits
+
+class ColumnTable:
+    """
+    A class used to store the columns of a circuit as parallel arrays (structure of arrays) instead of one object per column.
+
+    Column objects are only built when a column is read (indexing or iteration), as lightweight views of one row.
+    Arrays are over-allocated so that appending a column is amortised O(1).
+
+    Attributes
+    ----------
+    opcodes : np.array[uint8]
+        gate of each column, position in `binary.opcodes`
+    targets : np.array[uint32]
+        target qubit of each column
+    controls : np.array[uint64]
+        control mask of each column, one row of 64-bit words per column (bit i of word w is qubit 64 * w + i)
+    condition_qubits, condition_values : np.array
+        classical condition of each column (value -1 without condition)
+    length : int
+        number of columns (the arrays may be longer)
+    """
+
+    def __init__(self, dtype=np.complex128, capacity : int=64):
+        self.dtype = dtype
+        self.length = 0
+        self.opcodes = np.zeros(capacity, dtype=np.uint8)
+        self.targets = np.zeros(capacity, dtype=np.uint32)
+        self.controls = np.zeros((capacity, 1), dtype=np.uint64)
+        self.condition_qubits = np.zeros(capacity, dtype=np.uint32)
+        self.condition_values = np.full(capacity, -1, dtype=np.int8)
+        self.opcode_of = {name: opcode for opcode, name in enumerate(opcodes)}
+        self.control_lists = {} # control mask (tuple of words) -> list of control qubits
+
+    @staticmethod
+    def from_columns(columns, dtype=np.complex128):
+        table = ColumnTable(dtype, max(len(columns), 1))
+        for column in columns:
+            table.append(column)
+        return table
+
+    @staticmethod
+    def from_records(records : np.array, dtype=np.complex128):
+        """
+        Builds a table from validated binary circuit records, without building any column object.
+        """
+        table = ColumnTable(dtype, max(len(records), 1))
+        table.length = len(records)
+        table.opcodes[:table.length] = records["opcode"]
+        table.targets[:table.length] = records["target"]
+        table.controls[:table.length, 0] = records["controls"]
+        table.condition_qubits[:table.length] = records["condition_qubit"]
+        table.condition_values[:table.length] = records["condition_value"]
+        return table
+
+    @staticmethod
+    def from_arrays(opcodes : np.array, targets : np.array, controls : np.array, condition_qubits : np.array, condition_values : np.array,
+                    dtype=np.complex128):
+        """
+        Builds a table from validated column fields, `controls` holding one row of 64-bit mask words per column.
+        """
+        table = ColumnTable(dtype, max(len(targets), 1))
+        table.reserve(len(targets), controls.shape[1])
+        table.length = len(targets)
+        table.opcodes[:table.length] = opcodes
+        table.targets[:table.length] = targets
+        table.controls[:table.length] = controls
+        table.condition_qubits[:table.length] = condition_qubits
+        table.condition_values[:table.length] = condition_values
+        return table
+
+    def to_records(self):
+        """
+        Returns the columns as binary circuit records (registers of at most 64 qubits).
+        """
+        if self.controls.shape[1] > 1 and np.any(self.controls[:self.length, 1:]):
+            raise ValueError(f"The binary format supports at most {max_binary_qubits} qubits")
+        records = np.zeros(self.length, dtype=record_dtype)
+        records["opcode"] = self.opcodes[:self.length]
+        records["target"] = self.targets[:self.length]
+        records["controls"] = self.controls[:self.length, 0]
+        records["condition_qubit"] = self.condition_qubits[:self.length]
+        records["condition_value"] = self.condition_values[:self.length]
+        return records
+
+    def get_nbytes(self):
+        return self.opcodes.nbytes + self.targets.nbytes + self.controls.nbytes + self.condition_qubits.nbytes + self.condition_values.nbytes
+
+    def reserve(self, capacity : int, words : int=1):
+        """
+        Grows the arrays to hold at least `capacity` columns and `words` control words per column.
+        """
+        current_capacity, current_words = self.controls.shape
+        if capacity <= current_capacity and words <= current_words:
+            return
+        new_capacity = max(capacity, 2 * current_capacity) if capacity > current_capacity else current_capacity
+        new_words = max(words, current_words)
+        for name in ["opcodes", "targets", "condition_qubits", "condition_values"]:
+            array = getattr(self, name)
+            grown = np.full(new_capacity, -1 if name == "condition_values" else 0, dtype=array.dtype)
+            grown[:self.length] = array[:self.length]
+            setattr(self, name, grown)
+        controls = np.zeros((new_capacity, new_words), dtype=np.uint64)
+        controls[:self.length, :current_words] = self.controls[:self.length]
+        self.controls = controls
+
+    def append_column(self, gate_name : str, index : int, ctrl : list=[], condition : tuple=None):
+        """
+        Appends a column given by its fields.
+        """
+        if gate_name not in self.opcode_of:
+            raise NameError(f"{gate_name} gate not found")
+        if index < 0 or any(control < 0 for control in ctrl):
+            raise ValueError("Invalid qubit index")
+        words = max([control // 64 + 1 for control in ctrl] + [1])
+        self.reserve(self.length + 1, words)
+        position = self.length
+        self.opcodes[position] = self.opcode_of[gate_name]
+        self.targets[position] = index
+        self.controls[position] = 0
+        for control in ctrl:
+            self.controls[position, control // 64] |= np.uint64(1 << (control % 64))
+        if condition is not None:
+            self.condition_qubits[position] = condition[0]
+            self.condition_values[position] = condition[1]
+        else:
+            self.condition_qubits[position] = 0
+            self.condition_values[position] = -1
+        self.length += 1
+
+    def append(self, column : Column):
+        self.append_column(column.get_gate().get_name(), column.get_index(), column.get_gate().get_ctrl(), column.get_condition())
+
+    def extend(self, columns):
+        for column in columns:
+            self.append(column)
+
+    def __len__(self):
+        return self.length
+
+    def get_controls(self, mask : tuple):
+        """
+        Returns the control qubits of a mask (tuple of words), expanded once per distinct mask.
+        """
+        if mask not in self.control_lists:
+            self.control_lists[mask] = [64 * word + bit for word, value in enumerate(mask) for bit in range(64) if (value >> bit) & 1]
+        return list(self.control_lists[mask])
+
+    def make_column(self, opcode : int, target : int, mask : tuple, condition_qubit : int, condition_value : int):
+        condition = (condition_qubit, condition_value) if condition_value >= 0 else None
+        gate_name = opcodes[opcode]
+        if gate_name == "M":
+            return MeasureColumn(target, self.dtype, condition)
+        if gate_name == "R":
+            return ResetColumn(target, self.dtype, condition)
+        return Column(target, gate_name, self.get_controls(mask), self.dtype, condition)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self.length))]
+        if position < 0:
+            position += self.length
+        if position < 0 or position >= self.length:
+            raise IndexError("column index out of range")
+        return self.make_column(int(self.opcodes[position]), int(self.targets[position]), tuple(self.controls[position].tolist()),
+                                int(self.condition_qubits[position]), int(self.condition_values[position]))
+
+    def __iter__(self):
+        fields = zip(self.opcodes[:self.length].tolist(), self.targets[:self.length].tolist(), map(tuple, self.controls[:self.length].tolist()),
+                     self.condition_qubits[:self.length].tolist(), self.condition_values[:self.length].tolist())
+        for opcode, target, mask, condition_qubit, condition_value in fields:
+            yield self.make_column(opcode, target, mask, condition_qubit, condition_value)
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, ColumnTable)):
+            return NotImplemented
+        return len(self) == len(other) and all(column == other_column for column, other_column in zip(self, other))
+
+    def get_qubit_usage(self, index : int):
+        """
+        Returns, for each column, whether it acts on qubit `index` (as target, control or condition qubit).
+        """
+        word, bit = divmod(index, 64)
+        used = self.targets[:self.length] == index
+        if word < self.controls.shape[1]:
+            used |= ((self.controls[:self.length, word] >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        used |= (self.condition_values[:self.length] >= 0) & (self.condition_qubits[:self.length] == index)
+        return used
+
+    def clear_control(self, index : int):
+        """
+        Removes qubit `index` from the controls of every column.
+        """
+        word, bit = divmod(index, 64)
+        if word < self.controls.shape[1]:
+            self.controls[:self.length, word] &= ~np.uint64(1 << bit)
+
+    def keep_columns(self, kept : np.array):
+        """
+        Keeps only the columns selected by a boolean mask, in order.
+        """
+        kept = np.flatnonzero(kept)
+        for name in ["opcodes", "targets", "controls", "condition_qubits", "condition_values"]:
+            array = getattr(self, name)
+            array[:len(kept)] = array[kept]
+        self.length = len(kept)
+
+    def insert_qubit(self, index : int):
+        """
+        Renumbers every column after inserting a qubit at `index`: qubits from `index` on are shifted by one.
+        """
+        columns = slice(0, self.length)
+        self.targets[columns][self.targets[columns] >= index] += 1
+        conditioned = (self.condition_values[columns] >= 0) & (self.condition_qubits[columns] >= index)
+        self.condition_qubits[columns][conditioned] += 1
+        # Insert a zero bit at `index` in the control masks, carrying the top bit of each word into the next one
+        words = self.controls.shape[1]
+        word, bit = divmod(index, 64)
+        if word >= words:
+            # Every control is below `index`
+            return
+        if np.any(self.controls[columns, words - 1] >> np.uint64(63)):
+            self.reserve(self.length, words + 1)
+            words += 1
+        old = self.controls[columns].copy()
+        low_mask = np.uint64((1 << bit) - 1)
+        self.controls[columns, word] = (old[:, word] & low_mask) | ((old[:, word] & ~low_mask) << np.uint64(1))
+        for w in range(word + 1, words):
+            self.controls[columns, w] = (old[:, w] << np.uint64(1)) | (old[:, w - 1] >> np.uint64(63))
+
+    def delete_qubit(self, index : int):
+        """
+        Renumbers every column after deleting qubit `index`: qubits after `index` are shifted down by one.
+        No column may act on the deleted qubit.
+        """
+        if np.any(self.get_qubit_usage(index)):
+            raise ValueError(f"Qubit {index} is still used by the circuit")
+        columns = slice(0, self.length)
+        self.targets[columns][self.targets[columns] > index] -= 1
+        conditioned = (self.condition_values[columns] >= 0) & (self.condition_qubits[columns] > index)
+        self.condition_qubits[columns][conditioned] -= 1
+        # Remove bit `index` from the control masks, pulling the lowest bit of each next word into the top of the previous one
+        words = self.controls.shape[1]
+        word, bit = divmod(index, 64)
+        if word >= words:
+            return
+        old = self.controls[columns].copy()
+        low_mask = np.uint64((1 << bit) - 1)
+        high = (old[:, word] >> np.uint64(bit + 1)) << np.uint64(bit) if bit < 63 else np.zeros(self.length, dtype=np.uint64)
+        self.controls[columns, word] = (old[:, word] & low_mask) | high
+        for w in range(word, words):
+            if w > word:
+                self.controls[columns, w] = old[:, w] >> np.uint64(1)
+            if w + 1 < words:
+                self.controls[columns, w] |= (old[:, w + 1] & np.uint64(1)) << np.uint64(63)
@@ -0,0 +1,183 @@
+import numpy as np
+
+from src.QLibrary.SimpleQ.circuit import Circuit
+from src.QLibrary.SimpleQ.columntable import ColumnTable
+from src.QLibrary.SimpleQ.column import MeasureColumn, ResetColumn
+from src.QLibrary.SimpleQ.ingest import ingest_columns
+from src.QLibrary.SimpleQ.tools import get_precision_dtype
+
+implemented_backends = ["statevector", "inplace", "factorized", "mps"]
+# Rough throughput of the numpy kernels (complex multiply-adds per second), only used to rank backends and reject jobs
+operations_per_second = 1e9
+
+class AdmissionError(ValueError):
+    """
+    Raised when no backend can run a circuit within the memory and time limits.
+
+    Attributes
+    ----------
+    estimates : list[dict]
+        estimate of every backend considered (see `estimate_backend`)
+    """
+
+    def __init__(self, message : str, estimates : list):
+        super().__init__(message)
+        self.estimates = estimates
+
+def get_circuit_statistics(qubit_amount : int, columns):
+    """
+    Returns the structure of a circuit the estimates are based on, without simulating it:
+    column_count, measurement_count, max_swaps (transpiler SWAPs of the worst column), largest_group (largest set of
+    qubits linked by controlled gates), max_span (widest controlled gate, in qubits) and bond_crossings (number of
+    controlled gates spanning each bond of the qubit chain).
+    """
+    parent = list(range(qubit_amount))
+
+    def find(qubit):
+        while parent[qubit] != qubit:
+            parent[qubit] = parent[parent[qubit]]
+            qubit = parent[qubit]
+        return qubit
+
+    statistics = {"column_count": 0, "measurement_count": 0, "max_swaps": 0, "max_span": 1}
+    crossings = np.zeros(max(qubit_amount, 1), dtype=np.int64)
+    for column in columns:
+        statistics["column_count"] += 1
+        if isinstance(column, (MeasureColumn, ResetColumn)):
+            statistics["measurement_count"] += 1
+            continue
+        controls = column.get_gate().get_ctrl()
+        if controls == []:
+            continue
+        qubits = [column.get_index()] + controls
+        for qubit in controls:
+            parent[find(qubit)] = find(column.get_index())
+        first, last = min(qubits), max(qubits)
+        crossings[first] += 1
+        crossings[last] -= 1
+        statistics["max_swaps"] = max(statistics["max_swaps"], len(column.get_swaps()))
+        statistics["max_span"] = max(statistics["max_span"], last - first + 1)
+    group_sizes = np.bincount([find(qubit) for qubit in range(qubit_amount)]) if qubit_amount > 0 else np.zeros(1)
+    statistics["largest_group"] = int(group_sizes.max())
+    statistics["group_sizes"] = [int(size) for size in group_sizes if size > 0]
+    statistics["bond_crossings"] = np.cumsum(crossings)[:max(qubit_amount - 1, 0)].tolist()
+    return statistics
+
+def get_max_bond_dimension(qubit_amount : int, bond_crossings : list, max_bond_dimension : int=None):
+    """
+    Upper bound of the MPS bond dimension: a bond is limited by the smaller side of the chain and doubles at most once
+    per controlled gate spanning it (a controlled gate has an operator Schmidt rank of 2 across any cut).
+    """
+    bound = 1
+    for bond, crossing in enumerate(bond_crossings):
+        bond_dimension = 2 ** min(bond + 1, qubit_amount - bond - 1, crossing)
+        if max_bond_dimension is not None:
+            bond_dimension = min(bond_dimension, max_bond_dimension)
+        bound = max(bound, bond_dimension)
+    return bound
+
+def estimate_backend(qubit_amount : int, statistics : dict, backend : str, itemsize : int=16, shots : int=0,
+                     dense_output : bool=False, max_bond_dimension : int=None):
+    """
+    Estimates the peak memory (bytes) and the runtime (seconds) of running a circuit on one backend.
+    Parameters
+    ----------
+    statistics : dict
+        circuit structure, see `get_circuit_statistics`
+    itemsize : int
+        bytes per amplitude (16 for complex128, 8 for complex64)
+    shots : int
+        sampled measurement shots
+    dense_output : bool
+        the full statevector is read at the end (backends without a dense state have to build it)
+    Returns {"backend", "memory_bytes", "seconds"}.
+    """
+    if backend not in implemented_backends:
+        raise NameError(f"{backend} backend not found")
+    size = 2. ** qubit_amount
+    columns = statistics["column_count"]
+    if backend == "statevector":
+        # Each column builds dense 2^n x 2^n unitaries: identity, gate, product and one per transpiler SWAP
+        dense_matrices = 3 + statistics["max_swaps"] + (1 if statistics["max_span"] > 1 else 0)
+        memory = dense_matrices * size ** 2 * itemsize + 2 * size * itemsize
+        operations = columns * (2 + 2 * statistics["max_swaps"]) * size ** 3
+    elif backend == "inplace":
+        memory = 2 * size * itemsize
+        operations = columns * 4 * size
+    elif backend == "factorized":
+        memory = sum(2. ** group for group in statistics["group_sizes"]) * itemsize + 2 * 2. ** statistics["largest_group"] * itemsize
+        operations = columns * 4 * 2. ** statistics["largest_group"]
+        if dense_output:
+            memory += size * itemsize
+            operations += size
+    else:
+        chi = float(get_max_bond_dimension(qubit_amount, statistics["bond_crossings"], max_bond_dimension))
+        block = 2. ** statistics["max_span"] * chi ** 2
+        memory = 2 * qubit_amount * chi ** 2 * itemsize + 3 * block * itemsize
+        # Controlled gates merge their block and split it back with one SVD per site
+        operations = columns * (4 * chi ** 2 + statistics["max_span"] * block * 2 * chi)
+        if dense_output:
+            memory += 2 * size * itemsize
+            operations += 2 * size * chi
+    operations += statistics["measurement_count"] * size + shots * max(qubit_amount, 1)
+    return {
+        "backend": backend,
+        "memory_bytes": int(memory),
+        "seconds": operations / operations_per_second
+    }
+
+def estimate_resources(qubit_amount : int, columns, shots : int=0, precision="complex128", dense_output : bool=False,
+                       backends : list=None, max_bond_dimension : int=None):
+    """
+    Returns the estimate of every backend (all implemented backends by default), see `estimate_backend`.
+    """
+    statistics = get_circuit_statistics(qubit_amount, columns)
+    itemsize = np.dtype(get_precision_dtype(precision)).itemsize
+    return [estimate_backend(qubit_amount, statistics, backend, itemsize, shots, dense_output, max_bond_dimension)
+            for backend in backends or implemented_backends]
+
+def format_limit(limit, unit : float, name : str):
+    return "none" if limit is None else f"{limit / unit:.3g} {name}"
+
+def plan_backend(qubit_amount : int, columns, shots : int=0, precision="complex128", dense_output : bool=False,
+                 memory_limit : int=None, time_limit : float=None, backends : list=None):
+    """
+    Picks the fastest backend whose estimate fits in `memory_limit` bytes and `time_limit` seconds (None for no limit).
+    Returns its estimate, or raises an AdmissionError if no backend fits.
+    """
+    estimates = estimate_resources(qubit_amount, columns, shots, precision, dense_output, backends)
+    admissible = [estimate for estimate in estimates
+                  if (memory_limit is None or estimate["memory_bytes"] <= memory_limit) and (time_limit is None or estimate["seconds"] <= time_limit)]
+    if admissible == []:
+        best = min(estimates, key=lambda estimate: (estimate["memory_bytes"], estimate["seconds"]))
+        raise AdmissionError(f"Circuit rejected: {qubit_amount} qubits and {len(columns)} columns need at least "
+                             f"{best['memory_bytes'] / 2 ** 30:.3g} GiB and {best['seconds']:.3g} s ({best['backend']} backend), "
+                             f"limits are {format_limit(memory_limit, 2 ** 30, 'GiB')} and {format_limit(time_limit, 1, 's')}", estimates)
+    return min(admissible, key=lambda estimate: (estimate["seconds"], estimate["memory_bytes"]))
+
+def admit_columns(qubit_amount : int, columns : ColumnTable, shots : int=0, precision="complex128", dense_output : bool=False,
+                  memory_limit : int=None, time_limit : float=None):
+    """
+    Plans the backend of validated circuit columns before anything is allocated and builds the circuit.
+    Returns the circuit and the chosen estimate, or raises an AdmissionError (a ValueError) if it does not fit the limits.
+    """
+    estimate = plan_backend(qubit_amount, columns, shots, precision, dense_output, memory_limit, time_limit)
+    circuit = Circuit(qubit_amount, estimate["backend"], precision=precision)
+    circuit.circuit = columns
+    return circuit, estimate
+
+def admit_records(qubit_amount : int, records : np.array, shots : int=0, precision="complex128", dense_output : bool=False,
+                  memory_limit : int=None, time_limit : float=None):
+    """
+    Same as `admit_columns` for validated binary circuit records.
+    """
+    columns = ColumnTable.from_records(records, get_precision_dtype(precision))
+    return admit_columns(qubit_amount, columns, shots, precision, dense_output, memory_limit, time_limit)
+
+def admit_circuit(circuit_data : dict, shots : int=0, precision="complex128", dense_output : bool=False,
+                  memory_limit : int=None, time_limit : float=None):
+    """
+    Same as `admit_columns` for a circuit dictionary (see `ingest_columns`).
+    """
+    qubit_amount, columns = ingest_columns(circuit_data, get_precision_dtype(precision))
+    return admit_columns(qubit_amount, columns, shots, precision, dense_output, memory_limit, time_limit)
@@ -0,0 +1,158 @@
+import numpy as np
+
+from src.QLibrary.SimpleQ.tools import apply_gate_to_tensor, get_marginal
+from src.Logger.logger import logger, LogLevel
+
+class FactorizedState:
+    """
+    A class used to represent the system state as a product of independent subsystems.
+
+    Qubits that never interacted through a controlled gate belong to different components. Each component is simulated
+    as its own small statevector, and components are merged (tensor product) only when a gate first links them.
+
+    Attributes
+    ----------
+    components : list[tuple(list[int], np.array)]
+        for each component, its qubits and its state as a (2, ..., 2) tensor with one axis per qubit, in the same order
+    component_of : list[int]
+        position of the component holding each qubit
+    """
+
+    def __init__(self, qubit_amount : int, dtype=np.complex128):
+        self.qubit_amount = qubit_amount
+        self.components = []
+        for i in range(qubit_amount):
+            tensor = np.zeros(2, dtype=dtype)
+            tensor[0] = 1
+            self.components.append(([i], tensor))
+        self.component_of = list(range(qubit_amount))
+
+    def copy(self):
+        """
+        Returns a copy of the state. Component tensors are never modified in place, so they can be shared.
+        """
+        state = FactorizedState(0)
+        state.qubit_amount = self.qubit_amount
+        state.components = list(self.components)
+        state.component_of = list(self.component_of)
+        return state
+
+    def get_component_sizes(self):
+        return [len(qubits) for qubits, _ in self.components]
+
+    def merge(self, qubits : list):
+        """
+        Merges the components holding the given qubits into a single one and returns its position.
+        """
+        positions = sorted(set(self.component_of[qubit] for qubit in qubits))
+        if len(positions) == 1:
+            return positions[0]
+        merged_qubits, merged_tensor = self.components[positions[0]]
+        for position in positions[1:]:
+            component_qubits, tensor = self.components[position]
+            merged_qubits = merged_qubits + component_qubits
+            merged_tensor = np.multiply.outer(merged_tensor, tensor)
+        logger.log(f"FactorizedState - merge: merged qubits {merged_qubits} into one component", LogLevel.DEBUG)
+        # Replace the first component, drop the others and renumber the remaining ones
+        self.components[positions[0]] = (merged_qubits, merged_tensor)
+        for position in reversed(positions[1:]):
+            self.components.pop(position)
+        for position, (component_qubits, _) in enumerate(self.components):
+            for qubit in component_qubits:
+                self.component_of[qubit] = position
+        return self.component_of[qubits[0]]
+
+    def apply_gate(self, gate_matrix : np.array, index : int, controls : list=[]):
+        """
+        Applies a 1 qubit gate with an arbitrary number of controls, merging the involved components first.
+        """
+        position = self.merge([index] + controls)
+        component_qubits, tensor = self.components[position]
+        tensor = apply_gate_to_tensor(tensor, gate_matrix, component_qubits.index(index), [component_qubits.index(control) for control in controls])
+        self.components[position] = (component_qubits, tensor)
+
+    def get_marginal(self, qubits : list):
+        """
+        Returns the marginal probabilities of a subset of qubits (first qubit as the most significant bit).
+        Components are independent, so the marginal is the product of the marginals of each component.
+        """
+        marginal = np.ones(())
+        marginal_qubits = []
+        for position in sorted(set(self.component_of[qubit] for qubit in qubits)):
+            component_qubits, tensor = self.components[position]
+            kept = [qubit for qubit in component_qubits if qubit in qubits]
+            local = get_marginal(np.abs(tensor) ** 2, len(component_qubits), [component_qubits.index(qubit) for qubit in kept])
+            marginal = np.multiply.outer(marginal, local.reshape((2,) * len(kept)))
+            marginal_qubits += kept
+        marginal = np.transpose(marginal, [marginal_qubits.index(qubit) for qubit in qubits])
+        return marginal.reshape(-1)
+
+    def get_probabilities(self, index : int):
+        """
+        Returns the probabilities to measure 0 and 1 on a qubit.
+        """
+        p0, p1 = self.get_marginal([index])
+        return p0, p1
+
+    def collapse(self, index : int, outcome : int):
+        """
+        Projects a qubit on the measured outcome and renormalises its component.
+        """
+        position = self.component_of[index]
+        component_qubits, tensor = self.components[position]
+        tensor = tensor.copy()
+        slices = [slice(None)] * tensor.ndim
+        slices[component_qubits.index(index)] = 1 - outcome
+        tensor[tuple(slices)] = 0
+        self.components[position] = (component_qubits, tensor / np.linalg.norm(tensor))
+
+    def renumber(self, qubit_map):
+        """
+        Renames the qubits of every component through `qubit_map` and rebuilds `component_of`.
+        """
+        self.components = [([qubit_map(qubit) for qubit in qubits], tensor) for qubits, tensor in self.components]
+        self.component_of = [0] * self.qubit_amount
+        for position, (qubits, _) in enumerate(self.components):
+            for qubit in qubits:
+                self.component_of[qubit] = position
+
+    def insert_qubit(self, index : int):
+        """
+        Adds a qubit in |0> at `index`, as a new component of its own.
+        """
+        self.qubit_amount += 1
+        tensor = np.zeros(2, dtype=self.components[0][1].dtype)
+        tensor[0] = 1
+        self.components.append(([-1], tensor))
+        self.renumber(lambda qubit: index if qubit == -1 else qubit + (qubit >= index))
+
+    def delete_qubit(self, index : int, outcome : int):
+        """
+        Removes qubit `index`, already collapsed on `outcome`, from its component (the component is dropped if it becomes empty).
+        """
+        position = self.component_of[index]
+        component_qubits, tensor = self.components[position]
+        axis = component_qubits.index(index)
+        tensor = np.take(tensor, outcome, axis=axis)
+        component_qubits = component_qubits[:axis] + component_qubits[axis + 1:]
+        if component_qubits == []:
+            self.components.pop(position)
+            # Keep the global phase of the removed component
+            first_qubits, first_tensor = self.components[0]
+            self.components[0] = (first_qubits, first_tensor * tensor)
+        else:
+            self.components[position] = (component_qubits, tensor)
+        self.qubit_amount -= 1
+        self.renumber(lambda qubit: qubit - (qubit > index))
+
+    def to_statevector(self):
+        """
+        Returns the full statevector (tensor product of every component, in qubit order).
+        """
+        state = np.ones((), dtype=self.components[0][1].dtype)
+        state_qubits = []
+        for component_qubits, tensor in self.components:
+            state = np.multiply.outer(state, tensor)
+            state_qubits += component_qubits
+        state = np.transpose(state, [state_qubits.index(qubit) for qubit in range(self.qubit_amount)])
+        return state.reshape(-1)
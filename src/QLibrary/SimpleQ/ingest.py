@@ -0,0 +1,58 @@
+import numpy as np
+
+from src.QLibrary.SimpleQ.binary import opcodes
+from src.QLibrary.SimpleQ.columntable import ColumnTable
+
+def ingest_columns(circuit_data : dict, dtype=np.complex128):
+    """
+    Converts a circuit dictionary, as sent to the API ({"nb_qubit", "circuit": [{"qubit_index", "qubit_information":
+    {"gate_name", "ctrl_qubits_indexes"}, "condition"?}, ...]}), into a ColumnTable.
+
+    The column list is read once to gather every field into flat lists, then all the bounds checks run on whole arrays.
+    Unlike the binary format, the register is not limited to 64 qubits (control masks take one word per 64 qubits).
+    Returns the qubit amount and the table.
+    """
+    try:
+        qubit_amount = int(circuit_data["nb_qubit"])
+        columns = circuit_data["circuit"]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Invalid circuit: missing qubit amount or column list")
+    if qubit_amount < 1:
+        raise ValueError("Invalid circuit: the qubit amount must be at least 1")
+
+    opcode_of = {name: opcode for opcode, name in enumerate(opcodes)}
+    column_opcodes, targets, control_counts, controls, condition_qubits, condition_values = [], [], [], [], [], []
+    try:
+        for column in columns:
+            gate = column["qubit_information"]
+            column_opcodes.append(opcode_of[gate["gate_name"]])
+            targets.append(int(column["qubit_index"]))
+            column_controls = gate.get("ctrl_qubits_indexes") or []
+            control_counts.append(len(column_controls))
+            controls += column_controls
+            condition = column.get("condition")
+            condition_qubits.append(condition[0] if condition is not None else 0)
+            condition_values.append(condition[1] if condition is not None else -1)
+    except (KeyError, TypeError, ValueError, IndexError):
+        raise ValueError("Invalid circuit: malformed column")
+
+    # Every index is checked in 64 bits before being packed into the table
+    targets = np.array(targets, dtype=np.int64)
+    controls = np.array(controls, dtype=np.int64)
+    condition_qubits = np.array(condition_qubits, dtype=np.int64)
+    condition_values = np.array(condition_values, dtype=np.int64)
+    indexes = np.concatenate([targets, controls, condition_qubits])
+    if np.any(indexes < 0) or np.any(indexes >= qubit_amount):
+        raise ValueError("Invalid circuit: qubit index out of the register")
+    if np.any((condition_values < -1) | (condition_values > 1)):
+        raise ValueError("Invalid circuit: invalid classical condition")
+
+    column_of_control = np.repeat(np.arange(len(targets)), control_counts)
+    if np.any(controls == targets[column_of_control]):
+        raise ValueError("Invalid circuit: invalid control qubits")
+
+    # Control mask of each column: bit control % 64 of word control // 64, OR-ed over the controls of that column
+    masks = np.zeros((len(targets), (qubit_amount + 63) // 64), dtype=np.uint64)
+    np.bitwise_or.at(masks, (column_of_control, controls // 64), np.left_shift(np.uint64(1), (controls % 64).astype(np.uint64)))
+    table = ColumnTable.from_arrays(column_opcodes, targets, masks, condition_qubits, condition_values, dtype)
+    return qubit_amount, table
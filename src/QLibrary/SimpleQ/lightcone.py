@@ -0,0 +1,35 @@
+from src.QLibrary.SimpleQ.column import Column
+
+def get_column_qubits(column : Column):
+    """
+    Returns every qubit a column depends on: its target, its controls and the qubit read by its classical condition.
+    """
+    qubits = [column.get_index()] + list(column.get_gate().get_ctrl())
+    if column.get_condition() is not None:
+        qubits.append(column.get_condition()[0])
+    return qubits
+
+def prune_light_cone(columns : list, measured_qubits : list):
+    """
+    Walks the column list backwards from the measured qubits and keeps only the columns inside their past light cone.
+
+    A column acting only on qubits that never interact (later on) with the measured qubits cannot change their outcome
+    distribution, so it is dropped. A kept column brings all of its qubits into the light cone.
+    Parameters
+    ----------
+    columns : list[Column]
+        circuit columns, in execution order
+    measured_qubits : list[int]
+        qubits whose outcomes are requested
+    Returns the positions of the kept columns (in execution order) and the sorted list of relevant qubits.
+    """
+    relevant = set(measured_qubits)
+    kept = []
+    for position in reversed(range(len(columns))):
+        qubits = get_column_qubits(columns[position])
+        if relevant.isdisjoint(qubits):
+            continue
+        relevant.update(qubits)
+        kept.append(position)
+    kept.reverse()
+    return kept, sorted(relevant)
@@ -0,0 +1,171 @@
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Bucket upper bounds (the +Inf bucket is implicit)
+latency_buckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+qubit_buckets = (1, 2, 4, 8, 12, 16, 20, 24, 28, 32, 48, 64)
+column_buckets = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+
+class Metric:
+    """
+    Base class of the metrics: a value per label tuple.
+
+    Updates are plain dictionary operations (no lock): they are cheap enough for the hot paths, and the API runs the
+    emulator in a single thread of its event loop.
+
+    Attributes
+    ----------
+    name, description : str
+        exposed metric name and help text
+    label_names : tuple[str]
+        names of the labels, values are passed as a tuple in the same order
+    """
+    kind = "untyped"
+
+    def __init__(self, name : str, description : str, label_names : tuple=()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.values = {}
+
+    def format_labels(self, labels : tuple, extra : dict=None):
+        pairs = list(zip(self.label_names, labels)) + list((extra or {}).items())
+        if pairs == []:
+            return ""
+        escaped = [(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for name, value in pairs]
+        return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+    def get(self, labels : tuple=()):
+        return self.values.get(labels, 0)
+
+    def render_samples(self):
+        return [f"{self.name}{self.format_labels(labels)} {format_value(value)}" for labels, value in self.values.items()]
+
+    def render(self):
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"] + self.render_samples()
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount : float=1, labels : tuple=()):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value : float, labels : tuple=()):
+        self.values[labels] = value
+
+    def set_max(self, value : float, labels : tuple=()):
+        """
+        Keeps the largest value ever set (peak gauges).
+        """
+        if value > self.values.get(labels, float("-inf")):
+            self.values[labels] = value
+
+class Histogram(Metric):
+    """
+    Cumulative histogram: each label tuple stores a count per bucket, the sum and the number of observations.
+    """
+    kind = "histogram"
+
+    def __init__(self, name : str, description : str, label_names : tuple=(), buckets : tuple=latency_buckets):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value : float, labels : tuple=()):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = {"buckets": [0] * (len(self.buckets) + 1), "sum": 0., "count": 0}
+        # Counts are stored per bucket and accumulated when rendered
+        series["buckets"][bisect_left(self.buckets, value)] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def get(self, labels : tuple=()):
+        series = self.values.get(labels)
+        return series["count"] if series is not None else 0
+
+    def render_samples(self):
+        lines = []
+        for labels, series in self.values.items():
+            total = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series["buckets"]):
+                total += count
+                lines.append(f"{self.name}_bucket{self.format_labels(labels, {'le': format_value(bound)})} {total}")
+            lines.append(f"{self.name}_sum{self.format_labels(labels)} {format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{self.format_labels(labels)} {series['count']}")
+        return lines
+
+def format_value(value : float):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """
+    A set of metrics rendered together in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric : Metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name : str, description : str, label_names : tuple=()):
+        return self.register(Counter(name, description, label_names))
+
+    def gauge(self, name : str, description : str, label_names : tuple=()):
+        return self.register(Gauge(name, description, label_names))
+
+    def histogram(self, name : str, description : str, label_names : tuple=(), buckets : tuple=latency_buckets):
+        return self.register(Histogram(name, description, label_names, buckets))
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.values.clear()
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# Emulator metrics, updated by Circuit and CheckpointCache
+phase_seconds = registry.histogram("simpleq_simulation_phase_seconds", "Time spent in each simulation phase", ("phase",))
+circuit_qubits = registry.histogram("simpleq_circuit_qubits", "Qubit amount of the launched circuits", buckets=qubit_buckets)
+circuit_columns = registry.histogram("simpleq_circuit_columns", "Column amount of the launched circuits", buckets=column_buckets)
+columns_executed = registry.counter("simpleq_columns_executed_total", "Columns applied by launch_circuit", ("backend",))
+measurements = registry.counter("simpleq_measurements_total", "Qubit measurements", ("backend",))
+state_peak_bytes = registry.gauge("simpleq_state_peak_bytes", "Largest simulated state, in bytes", ("backend",))
+checkpoint_requests = registry.counter("simpleq_checkpoint_requests_total", "Checkpoint cache lookups", ("result",))
+
+implemented_phases = ["parse", "compile", "gate_application", "measurement", "serialization"]
+
+def timed_phase(phase : str):
+    """
+    Decorator recording the duration of each call in `phase_seconds` (two clock reads per call, not per column).
+    """
+    if phase not in implemented_phases:
+        raise NameError(f"{phase} phase not found")
+    labels = (phase,)
+
+    def decorator(function):
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                phase_seconds.observe(time.perf_counter() - start, labels)
+        return timed
+    return decorator
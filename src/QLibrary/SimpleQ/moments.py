@@ -0,0 +1,17 @@
+# No imports: the API metadata (also computed by the alembic migrations) layers circuits with the same function
+
+def get_moment_positions(qubit_lists : list):
+    """
+    Returns the moment of each column given the qubits it uses, in execution order.
+
+    Each column is placed in the moment right after the last one using any of its qubits (as soon as possible), so the
+    order of columns sharing a qubit is preserved. The number of moments (depth) is max(positions) + 1.
+    """
+    positions = []
+    last_moment = {} # qubit -> position of the last moment using it
+    for qubits in qubit_lists:
+        position = max([last_moment.get(qubit, -1) for qubit in qubits]) + 1
+        positions.append(position)
+        for qubit in qubits:
+            last_moment[qubit] = position
+    return positions
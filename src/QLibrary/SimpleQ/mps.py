@@ -0,0 +1,196 @@
+import copy
+
+import numpy as np
+
+from src.QLibrary.SimpleQ.tools import apply_gate_to_tensor
+from src.Logger.logger import logger, LogLevel
+
+class MPS:
+    """
+    A class used to represent the system state as a matrix product state (MPS).
+
+    Each qubit is stored as a tensor of shape (left bond, 2, right bond). The state is kept in mixed canonical form
+    around an orthogonality center so that singular values obtained when splitting tensors are the true Schmidt
+    coefficients and the truncation error is exact.
+
+    Attributes
+    ----------
+    tensors : list[np.array]
+        one tensor per qubit
+    max_bond_dimension : int
+        maximum number of singular values kept on each bond (None for no limit)
+    truncation_threshold : float
+        singular values below this threshold (relative to the largest one) are discarded
+    truncation_error : float
+        accumulated discarded weight since the creation of the state
+    """
+
+    def __init__(self, qubit_amount : int, max_bond_dimension : int=None, truncation_threshold : float=1e-12, dtype=np.complex128):
+        if max_bond_dimension is not None and max_bond_dimension < 1:
+            raise ValueError("The maximum bond dimension must be at least 1")
+        self.qubit_amount = qubit_amount
+        self.max_bond_dimension = max_bond_dimension
+        self.truncation_threshold = truncation_threshold
+        self.truncation_error = 0.
+        self.center = 0
+        self.tensors = []
+        for _ in range(qubit_amount):
+            tensor = np.zeros((1, 2, 1), dtype=dtype)
+            tensor[0, 0, 0] = 1
+            self.tensors.append(tensor)
+
+    def get_truncation_error(self):
+        return self.truncation_error
+
+    def copy(self):
+        """
+        Returns a copy of the state. Tensors are never modified in place, so they can be shared.
+        """
+        state = copy.copy(self)
+        state.tensors = list(self.tensors)
+        return state
+
+    def get_bond_dimensions(self):
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+
+    def move_center(self, site : int):
+        """
+        Moves the orthogonality center to `site` with QR decompositions.
+        """
+        while self.center < site:
+            tensor = self.tensors[self.center]
+            left, _, right = tensor.shape
+            q, r = np.linalg.qr(tensor.reshape(left * 2, right))
+            self.tensors[self.center] = q.reshape(left, 2, q.shape[1])
+            self.tensors[self.center + 1] = np.tensordot(r, self.tensors[self.center + 1], axes=([1], [0]))
+            self.center += 1
+        while self.center > site:
+            tensor = self.tensors[self.center]
+            left, _, right = tensor.shape
+            q, r = np.linalg.qr(tensor.reshape(left, 2 * right).T)
+            self.tensors[self.center] = q.T.reshape(q.shape[1], 2, right)
+            self.tensors[self.center - 1] = np.tensordot(self.tensors[self.center - 1], r.T, axes=([2], [0]))
+            self.center -= 1
+
+    def apply_gate(self, gate_matrix : np.array, index : int, controls : list=[]):
+        """
+        Applies a 1 qubit gate with an arbitrary number of controls.
+
+        Without control, the gate is contracted locally with the target tensor. Otherwise the tensors spanning from the
+        first to the last involved qubit are merged, the controlled gate is applied and the block is split back with SVDs.
+        Parameters
+        ----------
+        gate_matrix : 2x2 gate matrix
+        index : target qubit index
+        controls : control qubit indexes
+        """
+        if controls == []:
+            self.tensors[index] = np.einsum("ij,ajb->aib", gate_matrix, self.tensors[index])
+            return
+        first = min([index] + controls)
+        last = max([index] + controls)
+        self.move_center(first)
+        # Merge the block into a single tensor of shape (left bond, 2, ..., 2, right bond)
+        block = self.tensors[first]
+        for site in range(first + 1, last + 1):
+            block = np.tensordot(block, self.tensors[site], axes=([-1], [0]))
+        block = apply_gate_to_tensor(block, gate_matrix, index - first + 1, [control - first + 1 for control in controls])
+        self.split_block(block, first, last)
+
+    def split_block(self, block : np.array, first : int, last : int):
+        """
+        Splits a merged block back into one tensor per qubit, from left to right, truncating each bond.
+        """
+        for site in range(first, last):
+            left = block.shape[0]
+            matrix = block.reshape(left * 2, -1)
+            u, s, vh = np.linalg.svd(matrix, full_matrices=False)
+            keep = self.truncate(s)
+            self.tensors[site] = u[:, :keep].reshape(left, 2, keep)
+            remaining = block.shape[2:]
+            block = (s[:keep, None] * vh[:keep, :]).reshape((keep,) + remaining)
+        self.tensors[last] = block
+        self.center = last
+
+    def truncate(self, singular_values : np.array):
+        """
+        Returns how many singular values are kept on a bond and updates the truncation error.
+        The kept values are renormalised in place.
+        """
+        total_weight = np.sum(singular_values ** 2)
+        keep = int(np.sum(singular_values > self.truncation_threshold * singular_values[0])) if singular_values[0] > 0 else 1
+        keep = max(keep, 1)
+        if self.max_bond_dimension is not None:
+            keep = min(keep, self.max_bond_dimension)
+        discarded_weight = np.sum(singular_values[keep:] ** 2) / total_weight
+        if discarded_weight > 0:
+            self.truncation_error += discarded_weight
+            logger.log(f"MPS - truncate: discarded weight {discarded_weight}, kept {keep} singular values", LogLevel.DEBUG)
+        singular_values[:keep] /= np.sqrt(np.sum(singular_values[:keep] ** 2) / total_weight)
+        return keep
+
+    def get_probabilities(self, index : int):
+        """
+        Returns the probabilities to measure 0 and 1 on a qubit.
+        """
+        self.move_center(index)
+        tensor = self.tensors[index]
+        weights = np.sum(np.abs(tensor) ** 2, axis=(0, 2))
+        weights = weights / np.sum(weights)
+        return weights[0], weights[1]
+
+    def collapse(self, index : int, outcome : int):
+        """
+        Projects a qubit on the measured outcome and renormalises the state.
+        """
+        self.move_center(index)
+        tensor = self.tensors[index].copy()
+        tensor[:, 1 - outcome, :] = 0
+        self.tensors[index] = tensor / np.linalg.norm(tensor)
+
+    def insert_qubit(self, index : int):
+        """
+        Adds a qubit in |0> at `index`. The new tensor carries the bond it is inserted on unchanged (identity on the bond
+        times |0>), so the canonical form is preserved.
+        """
+        bond = self.tensors[index].shape[0] if index < self.qubit_amount else self.tensors[-1].shape[2]
+        tensor = np.zeros((bond, 2, bond), dtype=self.tensors[0].dtype)
+        tensor[:, 0, :] = np.identity(bond)
+        self.tensors.insert(index, tensor)
+        if self.center >= index:
+            self.center += 1
+        self.qubit_amount += 1
+
+    def delete_qubit(self, index : int, outcome : int):
+        """
+        Removes qubit `index`, already collapsed on `outcome`: its slice for that outcome is contracted into a neighbour.
+        """
+        if self.qubit_amount == 1:
+            raise ValueError("Cannot remove the last qubit of the register")
+        self.move_center(index)
+        matrix = self.tensors.pop(index)[:, outcome, :]
+        if index > 0:
+            self.tensors[index - 1] = np.tensordot(self.tensors[index - 1], matrix, axes=([2], [0]))
+            self.center = index - 1
+        else:
+            self.tensors[0] = np.tensordot(matrix, self.tensors[0], axes=([1], [0]))
+            self.center = 0
+        self.qubit_amount -= 1
+
+    def get_amplitude(self, bits : list):
+        """
+        Returns the amplitude of one basis state (bits[q] is the value of qubit q), contracting one slice of each tensor.
+        """
+        vector = np.ones(1, dtype=self.tensors[0].dtype)
+        for tensor, bit in zip(self.tensors, bits):
+            vector = vector @ tensor[:, bit, :]
+        return vector[0]
+
+    def to_statevector(self):
+        """
+        Contracts the whole MPS into a statevector. Only usable for small registers.
+        """
+        state = self.tensors[0]
+        for tensor in self.tensors[1:]:
+            state = np.tensordot(state, tensor, axes=([-1], [0]))
+        return state.reshape(-1)
@@ -0,0 +1,92 @@
+import numpy as np
+
+implemented_paulis = ["I", "X", "Y", "Z"]
+
+def parse_hamiltonian(hamiltonian):
+    """
+    Returns the terms of a weighted Pauli-string Hamiltonian as (coefficient, pauli string) pairs.
+    The Hamiltonian is either a dictionary pauli string -> coefficient or a list of (coefficient, pauli string) pairs.
+    Pauli strings have one character (I, X, Y or Z) per qubit, qubit 0 first.
+    """
+    if isinstance(hamiltonian, dict):
+        return [(coefficient, pauli_string) for pauli_string, coefficient in hamiltonian.items()]
+    return [(coefficient, pauli_string) for coefficient, pauli_string in hamiltonian]
+
+def get_pauli_masks(pauli_string : str, qubit_amount : int):
+    """
+    Returns the bit masks of a Pauli string (bit n - 1 - q for qubit q, like basis state indexes):
+    x_mask (X or Y, the basis states it flips), z_mask (Z or Y, the parity giving its sign) and the number of Y.
+    The string is i^y_count X^x_mask Z^z_mask, since Y = iXZ.
+    """
+    if len(pauli_string) != qubit_amount:
+        raise ValueError(f"Pauli string {pauli_string} does not have {qubit_amount} qubits")
+    x_mask, z_mask, y_count = 0, 0, 0
+    for qubit, pauli in enumerate(pauli_string.upper()):
+        if pauli not in implemented_paulis:
+            raise ValueError(f"{pauli} Pauli operator not found")
+        bit = 1 << (qubit_amount - 1 - qubit)
+        if pauli in "XY":
+            x_mask |= bit
+        if pauli in "ZY":
+            z_mask |= bit
+        y_count += pauli == "Y"
+    return x_mask, z_mask, y_count
+
+def get_parity_sum(values : np.array, z_mask : int, qubit_amount : int):
+    """
+    Returns sum_b values[b] (-1)^popcount(b & z_mask), by summing or subtracting the two halves of each qubit in turn (2N operations).
+    """
+    for qubit in range(qubit_amount):
+        halves = values.reshape(2, -1)
+        values = halves[0] - halves[1] if (z_mask >> (qubit_amount - 1 - qubit)) & 1 else halves[0] + halves[1]
+    return values[0]
+
+def walsh_hadamard(values : np.array, qubit_amount : int):
+    """
+    Returns the Walsh-Hadamard transform of a vector: entry z is sum_b values[b] (-1)^popcount(b & z), for every z at once.
+    """
+    spectrum = np.array(values, copy=True)
+    for qubit in range(qubit_amount):
+        view = spectrum.reshape(2 ** qubit, 2, -1)
+        first = view[:, 0, :].copy()
+        view[:, 0, :] += view[:, 1, :]
+        view[:, 1, :] = first - view[:, 1, :]
+    return spectrum
+
+def get_pauli_expectations(state_vector : np.array, pauli_strings : list):
+    """
+    Returns the exact expectation value <psi|P|psi> of each Pauli string, without sampling.
+
+    <psi|P|psi> = i^y_count sum_b conj(psi[b ^ x_mask]) psi[b] (-1)^popcount(b & z_mask): X and Y flips are an index
+    permutation and Z a parity sign. Strings are grouped by x_mask, so each group builds a single permuted product
+    conj(psi[b ^ x_mask]) psi[b]; the signs of the group's strings are then either reduced one by one, or all read from
+    one Walsh-Hadamard transform when the group has more strings than qubits.
+    """
+    qubit_amount = int(np.log2(len(state_vector)))
+    masks = [get_pauli_masks(pauli_string, qubit_amount) for pauli_string in pauli_strings]
+    groups = {}
+    for position, (x_mask, _, _) in enumerate(masks):
+        groups.setdefault(x_mask, []).append(position)
+    indexes = np.arange(len(state_vector)) if any(x_mask != 0 for x_mask in groups) else None
+    expectations = np.zeros(len(pauli_strings), dtype=np.complex128)
+    for x_mask, positions in groups.items():
+        flipped = state_vector if x_mask == 0 else state_vector[indexes ^ x_mask]
+        products = (np.conj(flipped) * state_vector).astype(np.complex128)
+        if len(positions) > qubit_amount:
+            spectrum = walsh_hadamard(products, qubit_amount)
+            expectations[positions] = spectrum[[masks[position][1] for position in positions]]
+        else:
+            for position in positions:
+                expectations[position] = get_parity_sum(products, masks[position][1], qubit_amount)
+        expectations[positions] *= [1j ** masks[position][2] for position in positions]
+    # Pauli strings are Hermitian, their expectation values are real
+    return expectations.real
+
+def get_expectation(state_vector : np.array, hamiltonian):
+    """
+    Returns the expectation value of a weighted Pauli-string Hamiltonian (see `parse_hamiltonian`) and the value of each term.
+    """
+    terms = parse_hamiltonian(hamiltonian)
+    values = get_pauli_expectations(state_vector, [pauli_string for _, pauli_string in terms])
+    coefficients = np.array([coefficient for coefficient, _ in terms])
+    return np.sum(coefficients * values), values
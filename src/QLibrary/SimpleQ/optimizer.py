@@ -0,0 +1,106 @@
+from src.QLibrary.SimpleQ.column import Column, MeasureColumn, ResetColumn
+from src.Logger.logger import logger, LogLevel
+
+self_inverse_gates = ["X", "Y", "Z", "H"]
+
+def get_qubit_actions(column : Column):
+    """
+    Returns, for every qubit a column touches, the Pauli the column is built from on that qubit.
+
+    A controlled gate is a polynomial in Z on its controls and in its gate on its target, so two columns commute when
+    they use the same Pauli on every qubit they share. None marks a qubit the column does not commute with anything on
+    (H target, measurement, reset, classical condition).
+    """
+    if isinstance(column, (MeasureColumn, ResetColumn)):
+        actions = {column.get_index(): None}
+    else:
+        actions = {control: "Z" for control in column.get_gate().get_ctrl()}
+        gate_name = column.get_gate().get_name()
+        actions[column.get_index()] = gate_name if gate_name in ["X", "Y", "Z"] else None
+    if column.get_condition() is not None:
+        actions[column.get_condition()[0]] = None
+    return actions
+
+def columns_commute(first : Column, second : Column):
+    first_actions, second_actions = get_qubit_actions(first), get_qubit_actions(second)
+    for qubit, action in first_actions.items():
+        if qubit in second_actions and (action is None or action != second_actions[qubit]):
+            return False
+    return True
+
+def columns_cancel(first : Column, second : Column):
+    """
+    Checks if two columns apply the same self-inverse gate (same target, controls and condition).
+    """
+    if type(first) is not Column or type(second) is not Column:
+        return False
+    return (first.get_gate().get_name() in self_inverse_gates
+            and first.get_gate().get_name() == second.get_gate().get_name()
+            and first.get_index() == second.get_index()
+            and sorted(first.get_gate().get_ctrl()) == sorted(second.get_gate().get_ctrl())
+            and first.get_condition() == second.get_condition())
+
+def optimize_columns(columns : list):
+    """
+    Peephole optimization of a column list, iterated until nothing changes.
+
+    Each column looks backwards for an identical self-inverse column, moving past every column it commutes with
+    (disjoint qubits, or the same Pauli on every shared qubit, e.g. Z past a control). When one is found, both are removed.
+    Only columns sharing a wire with the current one are visited, thanks to one stack of positions per qubit.
+    Parameters
+    ----------
+    columns : list[Column]
+        circuit columns, in execution order (left untouched)
+    Returns the optimized column list and the optimization statistics.
+    """
+    statistics = {
+        "columns_before": len(columns),
+        "columns_after": len(columns),
+        "cancelled_pairs": 0,
+        "commutations": 0,
+        "passes": 0
+    }
+    changed = True
+    while changed:
+        changed = False
+        statistics["passes"] += 1
+        optimized = [] # kept columns, removed ones are replaced by None
+        wires = {} # qubit -> positions in `optimized` of the columns touching it
+        for column in columns:
+            qubits = list(get_qubit_actions(column))
+            pointers = {qubit: len(wires.get(qubit, [])) - 1 for qubit in qubits}
+            partner = None
+            commutations = 0
+            while True:
+                # Latest live column sharing a wire with the current one
+                candidates = []
+                for qubit in qubits:
+                    while pointers[qubit] >= 0 and optimized[wires[qubit][pointers[qubit]]] is None:
+                        pointers[qubit] -= 1
+                    if pointers[qubit] >= 0:
+                        candidates.append(wires[qubit][pointers[qubit]])
+                if candidates == []:
+                    break
+                position = max(candidates)
+                if columns_cancel(optimized[position], column):
+                    partner = position
+                    break
+                if not columns_commute(optimized[position], column):
+                    break
+                commutations += 1
+                for qubit in qubits:
+                    if pointers[qubit] >= 0 and wires[qubit][pointers[qubit]] == position:
+                        pointers[qubit] -= 1
+            if partner is not None:
+                optimized[partner] = None
+                statistics["cancelled_pairs"] += 1
+                statistics["commutations"] += commutations
+                changed = True
+                continue
+            for qubit in qubits:
+                wires.setdefault(qubit, []).append(len(optimized))
+            optimized.append(column)
+        columns = [column for column in optimized if column is not None]
+    statistics["columns_after"] = len(columns)
+    logger.log(f"optimize_columns : {statistics['columns_before']} -> {statistics['columns_after']} columns in {statistics['passes']} passes", LogLevel.INFO)
+    return columns, statistics
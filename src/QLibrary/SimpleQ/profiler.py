@@ -0,0 +1,152 @@
+import json
+import time
+import tracemalloc
+
+from src.QLibrary.SimpleQ.column import Column, MeasureColumn, ResetColumn
+
+def get_column_label(column : Column):
+    """
+    Returns a short name of a column: the gate name prefixed by one C per control (e.g. CCX), M or R.
+    """
+    return "C" * len(column.get_gate().get_ctrl()) + column.get_gate().get_name()
+
+def get_column_kernel(column : Column, backend : str):
+    """
+    Returns the kernel a column runs with:
+    "measurement" or "reset", "dense" (uncontrolled gate unitary), "controlled" (controlled unitary),
+    "swap" (controlled unitary wrapped in transpiler SWAPs) or "specialised" (tensor kernels of the other backends).
+    """
+    if isinstance(column, MeasureColumn):
+        return "measurement"
+    if isinstance(column, ResetColumn):
+        return "reset"
+    if backend != "statevector":
+        return "specialised"
+    if column.get_gate().get_ctrl() == []:
+        return "dense"
+    return "swap" if column.get_swaps() != [] else "controlled"
+
+class ColumnProfiler:
+    """
+    A class used to record the cost of each executed column, see `Circuit.launch_circuit(profile=True)`.
+
+    Attributes
+    ----------
+    trace_memory : bool
+        record the bytes allocated by each column with tracemalloc (slower)
+    events : list[dict]
+        one event per column (or fused moment): position (moment index when moments are fused), label, kernel, qubits,
+        swaps, start and duration (seconds), allocated_bytes (peak allocation during the column, None without memory tracing)
+    """
+
+    def __init__(self, trace_memory : bool=True):
+        self.trace_memory = trace_memory
+        self.events = []
+        self.origin = None
+        self.started_tracing = False
+
+    def __enter__(self):
+        self.origin = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        return self
+
+    def __exit__(self, *exc):
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        return False
+
+    def record(self, event : dict, function, *args):
+        """
+        Runs `function(*args)`, completes `event` with its timing and allocations and stores it.
+        Returns the result of the function.
+        """
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        result = function(*args)
+        end = time.perf_counter()
+        event["start"] = start - self.origin
+        event["duration"] = end - start
+        event["allocated_bytes"] = tracemalloc.get_traced_memory()[1] - before if self.trace_memory else None
+        self.events.append(event)
+        return result
+
+    def record_column(self, position : int, column : Column, backend : str, executed : bool, function, *args):
+        gate = column.get_gate()
+        event = {
+            "position": position,
+            "label": get_column_label(column),
+            "kernel": get_column_kernel(column, backend) if executed else "skipped",
+            "qubits": [column.get_index()] + list(gate.get_ctrl()),
+            "swaps": len(column.get_swaps()) if executed and backend == "statevector" else 0
+        }
+        return self.record(event, function, *args)
+
+    def record_moment(self, moment_index : int, columns : list, function, *args):
+        event = {
+            "position": moment_index,
+            "label": "+".join(get_column_label(column) for column in columns),
+            "kernel": "fused",
+            "qubits": sorted({qubit for column in columns for qubit in [column.get_index()] + list(column.get_gate().get_ctrl())}),
+            "swaps": 0
+        }
+        return self.record(event, function, *args)
+
+    def get_total_time(self):
+        return sum(event["duration"] for event in self.events)
+
+    def to_chrome_trace(self):
+        """
+        Returns the events in the Chrome trace-event format (load the JSON in chrome://tracing or Perfetto).
+        """
+        trace_events = []
+        for event in self.events:
+            trace_events.append({
+                "name": event["label"],
+                "cat": event["kernel"],
+                "ph": "X",
+                "ts": event["start"] * 1e6,
+                "dur": event["duration"] * 1e6,
+                "pid": 0,
+                "tid": 0,
+                "args": {name: event[name] for name in ["position", "qubits", "swaps", "allocated_bytes"]}
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path : str):
+        with open(path, "w") as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file)
+
+    def get_summary(self):
+        """
+        Returns one row per (label, kernel): count, total, mean and max duration, allocated bytes and swaps,
+        sorted by decreasing total duration.
+        """
+        rows = {}
+        for event in self.events:
+            row = rows.setdefault((event["label"], event["kernel"]), {
+                "label": event["label"], "kernel": event["kernel"], "count": 0, "total": 0., "max": 0., "allocated_bytes": 0, "swaps": 0
+            })
+            row["count"] += 1
+            row["total"] += event["duration"]
+            row["max"] = max(row["max"], event["duration"])
+            row["allocated_bytes"] += event["allocated_bytes"] or 0
+            row["swaps"] += event["swaps"]
+        for row in rows.values():
+            row["mean"] = row["total"] / row["count"]
+        return sorted(rows.values(), key=lambda row: row["total"], reverse=True)
+
+    def format_summary(self, top : int=None):
+        """
+        Returns the summary as a text table (the `top` most expensive rows if given).
+        """
+        total = self.get_total_time() or 1
+        lines = [f"{'gate':<10}{'kernel':<13}{'count':>7}{'total ms':>11}{'mean ms':>10}{'max ms':>10}{'%':>7}{'alloc KiB':>12}{'swaps':>7}"]
+        for row in self.get_summary()[:top]:
+            lines.append(f"{row['label']:<10}{row['kernel']:<13}{row['count']:>7}{row['total'] * 1e3:>11.3f}{row['mean'] * 1e3:>10.3f}"
+                         f"{row['max'] * 1e3:>10.3f}{100 * row['total'] / total:>7.1f}{row['allocated_bytes'] / 1024:>12.1f}{row['swaps']:>7}")
+        return "\n".join(lines)
@@ -0,0 +1,75 @@
+import numpy as np
+
+from src.QLibrary.SimpleQ.tools import get_marginal
+
+class Sampler:
+    """
+    A class used to draw measurement outcomes from a fixed probability vector, built once per state.
+
+    Only outcomes with a non-zero probability are indexed, by their cumulative distribution: drawing `shots` outcomes is
+    one vectorized binary search per shot (np.searchsorted), and a histogram of any number of shots is a single
+    multinomial draw over the support.
+
+    Attributes
+    ----------
+    probabilities : np.array[float64]
+        normalised probability of every outcome (outcome index = bitstring, first qubit as the most significant bit)
+    qubit_count : int
+        number of sampled qubits
+    support : np.array[int64]
+        outcomes with a non-zero probability
+    cumulative : np.array[float64]
+        cumulative distribution over the support, ending at 1
+    """
+
+    def __init__(self, probabilities : np.array):
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        total = np.sum(probabilities)
+        if not total > 0:
+            raise ValueError("Cannot sample from a null probability vector")
+        self.probabilities = probabilities / total
+        self.qubit_count = int(np.log2(len(probabilities)))
+        self.support = np.flatnonzero(self.probabilities > 0)
+        self.cumulative = np.cumsum(self.probabilities[self.support])
+        self.cumulative /= self.cumulative[-1]
+
+    def sample(self, shots : int=1000):
+        """
+        Returns `shots` outcome indexes.
+        """
+        positions = np.searchsorted(self.cumulative, np.random.random(shots), side="right")
+        # A draw can only reach the end through rounding of the last cumulative value
+        np.minimum(positions, len(self.support) - 1, out=positions)
+        return self.support[positions]
+
+    def stream(self, shots : int, batch_size : int=65536):
+        """
+        Yields the outcomes of `shots` draws in batches of at most `batch_size` outcome indexes.
+        """
+        if batch_size < 1:
+            raise ValueError("The batch size must be at least 1")
+        remaining = shots
+        while remaining > 0:
+            batch = min(batch_size, remaining)
+            remaining -= batch
+            yield self.sample(batch)
+
+    def get_counts(self, shots : int=1000):
+        """
+        Returns the number of draws of every outcome of the support (same order as `support`), in O(support) whatever the shots.
+        """
+        return np.random.multinomial(shots, np.diff(self.cumulative, prepend=0.))
+
+    def get_histogram(self, shots : int=1000):
+        """
+        Returns the histogram of `shots` draws keyed by bitstring (only observed outcomes are listed).
+        """
+        counts = self.get_counts(shots)
+        observed = np.flatnonzero(counts)
+        return {format(outcome, f"0{self.qubit_count}b"): int(count) for outcome, count in zip(self.support[observed].tolist(), counts[observed].tolist())}
+
+    def get_marginal(self, qubits : list):
+        """
+        Returns the marginal probabilities of a subset of the sampled qubits (see `tools.get_marginal`).
+        """
+        return get_marginal(self.probabilities, self.qubit_count, qubits)
@@ -0,0 +1,68 @@
+import numpy as np
+
+from src.QLibrary.SimpleQ.column import Column
+from src.QLibrary.SimpleQ.tools import get_control_matrix
+from src.QLibrary.SimpleQ.lightcone import get_column_qubits
+from src.QLibrary.SimpleQ.moments import get_moment_positions
+
+def schedule_moments(columns : list):
+    """
+    Groups columns into moments: sets of columns acting on disjoint qubits, which can therefore be applied together.
+
+    Each column is placed in the moment right after the last one using any of its qubits (as soon as possible), so the
+    order of columns sharing a qubit is preserved. The classical condition qubit counts as a used qubit.
+    Parameters
+    ----------
+    columns : list[Column]
+        circuit columns, in execution order
+    Returns the list of moments, each being a list of columns.
+    """
+    moments = []
+    for column, position in zip(columns, get_moment_positions([get_column_qubits(column) for column in columns])):
+        if position == len(moments):
+            moments.append([])
+        moments[position].append(column)
+    return moments
+
+def get_depth(columns : list):
+    return len(schedule_moments(columns))
+
+def is_fusable(column : Column):
+    """
+    Checks if a column is a plain gate (no measurement, reset or classical condition) that can be fused.
+    """
+    return type(column) is Column and column.get_condition() is None
+
+def apply_matrix_to_tensor(tensor : np.array, matrix : np.array, axes : list):
+    """
+    Applies a 2^k x 2^k matrix on k axes of a (2, ..., 2) tensor in a single contraction (first axis as the most significant bit).
+    """
+    k = len(axes)
+    moved = np.moveaxis(tensor, axes, range(k))
+    updated = (matrix @ moved.reshape(2 ** k, -1)).reshape(moved.shape)
+    return np.moveaxis(updated, range(k), axes)
+
+def apply_moment(state_vector : np.array, moment : list, qubit_amount : int, max_fused_qubits : int=4):
+    """
+    Applies every gate of a moment on a statevector.
+
+    Gates of a moment act on disjoint qubits, so their matrices are combined with Kronecker products into operators on
+    at most `max_fused_qubits` qubits, each applied with one pass over the statevector instead of one pass per gate.
+    Only fusable columns (see `is_fusable`) are accepted.
+    Returns the new statevector.
+    """
+    # Group the gates into operators (matrix, wires) acting on at most `max_fused_qubits` qubits
+    operators = []
+    for column in moment:
+        gate = column.get_gate()
+        wires = list(gate.get_ctrl()) + [column.get_index()]
+        matrix = get_control_matrix(gate, len(gate.get_ctrl())) if gate.get_ctrl() != [] else gate.get_gate()
+        if operators != [] and len(operators[-1][1]) + len(wires) <= max_fused_qubits:
+            fused_matrix, fused_wires = operators[-1]
+            operators[-1] = (np.kron(fused_matrix, matrix), fused_wires + wires)
+        else:
+            operators.append((matrix, wires))
+    tensor = state_vector.reshape((2,) * qubit_amount)
+    for matrix, wires in operators:
+        tensor = apply_matrix_to_tensor(tensor, matrix, wires)
+    return np.ascontiguousarray(tensor).reshape(-1)
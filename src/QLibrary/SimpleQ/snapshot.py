@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+import numpy as np
+
+from src.QLibrary.SimpleQ.columntable import ColumnTable
+from src.Logger.logger import logger, LogLevel
+
+snapshot_version = 1
+# Backends whose whole state is the dense statevector
+snapshot_backends = ["statevector", "inplace"]
+
+def get_columns_hash(qubit_amount : int, columns : ColumnTable):
+    """
+    Returns a fingerprint of a circuit, so that a snapshot is only resumed by the circuit it was taken from.
+    """
+    digest = hashlib.sha256(str(qubit_amount).encode())
+    digest.update(columns.to_records().tobytes())
+    return digest.hexdigest()
+
+def get_state_path(path : str, position : int, compressed : bool):
+    return f"{path}.{position}.{'npz' if compressed else 'npy'}"
+
+def replace_file(path : str, write):
+    """
+    Writes a file through a temporary file renamed over it, so that a crash never leaves a partial file behind.
+    """
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        write(file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+def write_snapshot(path : str, state : np.array, metadata : dict, compressed : bool=False):
+    """
+    Writes a snapshot: the state to its own file (.npy, memory-mappable, or compressed .npz) then the metadata to
+    `path`.json. The metadata names the state file and is replaced last, so it always points to a complete snapshot;
+    the state file of the previous snapshot is removed afterwards.
+    """
+    state_path = get_state_path(path, metadata["position"], compressed)
+    if compressed:
+        replace_file(state_path, lambda file: np.savez_compressed(file, state=state))
+    else:
+        replace_file(state_path, lambda file: np.save(file, state))
+    previous = read_metadata(path)
+    metadata = dict(metadata, state_file=os.path.basename(state_path), compressed=compressed)
+    replace_file(path + ".json", lambda file: file.write(json.dumps(metadata, default=lambda value: value.item()).encode()))
+    if previous is not None and previous["state_file"] != metadata["state_file"]:
+        previous_path = os.path.join(os.path.dirname(path), previous["state_file"])
+        if os.path.exists(previous_path):
+            os.remove(previous_path)
+
+def read_metadata(path : str):
+    """
+    Returns the metadata of the last complete snapshot written to `path`, None if there is none.
+    """
+    if not os.path.exists(path + ".json"):
+        return None
+    with open(path + ".json") as file:
+        return json.load(file)
+
+def load_snapshot(path : str, mmap : bool=True):
+    """
+    Returns the state and metadata of the last snapshot written to `path`, (None, None) if there is none.
+    Uncompressed states are memory-mapped (read-only) when `mmap` is set.
+    """
+    metadata = read_metadata(path)
+    if metadata is None:
+        return None, None
+    state_path = os.path.join(os.path.dirname(path), metadata["state_file"])
+    if metadata["compressed"]:
+        with np.load(state_path) as archive:
+            state = archive["state"]
+    else:
+        state = np.load(state_path, mmap_mode="r" if mmap else None)
+    return state, metadata
+
+class SnapshotWriter:
+    """
+    A class used to save the state of a running circuit to disk, every `every_columns` columns and/or every
+    `every_seconds` seconds, so that `Circuit.launch_circuit(snapshots=..., resume=True)` can restart from it.
+
+    The run only pays for a copy of the state: files are written by a background thread. A snapshot that falls due
+    while the previous one is still being written is postponed to the next column rather than queued, so the run never
+    waits for the disk and at most one extra copy of the state is held.
+
+    Attributes
+    ----------
+    path : str
+        snapshot prefix, the files are `path`.json (metadata) and `path`.<position>.npy|npz (state)
+    every_columns : int
+        columns between two snapshots (None to only use the time interval)
+    every_seconds : float
+        seconds between two snapshots (None to only use the column interval)
+    compressed : bool
+        write compressed .npz states instead of memory-mappable .npy states
+    written : int
+        number of snapshots written
+    """
+
+    def __init__(self, path : str, every_columns : int=None, every_seconds : float=None, compressed : bool=False):
+        if every_columns is None and every_seconds is None:
+            raise ValueError("A snapshot interval (every_columns or every_seconds) is required")
+        if every_columns is not None and every_columns < 1:
+            raise ValueError("The column interval must be at least 1")
+        self.path = path
+        self.every_columns = every_columns
+        self.every_seconds = every_seconds
+        self.compressed = compressed
+        self.written = 0
+        self.last_position = None
+        self.last_time = None
+        self.thread = None
+        self.error = None
+
+    def start(self, position : int=0):
+        """
+        Starts the intervals at a column position (the resumed one, 0 for a new run).
+        """
+        self.last_position = position
+        self.last_time = time.monotonic()
+
+    def is_busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def is_due(self, position : int):
+        if self.every_columns is not None and position - self.last_position >= self.every_columns:
+            return True
+        return self.every_seconds is not None and time.monotonic() - self.last_time >= self.every_seconds
+
+    def write(self, state : np.array, metadata : dict):
+        try:
+            write_snapshot(self.path, state, metadata, self.compressed)
+            self.written += 1
+            logger.log(f"SnapshotWriter-write : state after column {metadata['position']} saved to {self.path}", LogLevel.INFO)
+        except Exception as error:
+            self.error = error
+
+    def submit(self, state : np.array, metadata : dict):
+        """
+        Writes a copy of the state in the background. The state must not be modified by the caller afterwards.
+        """
+        self.raise_error()
+        self.last_position = metadata["position"]
+        self.last_time = time.monotonic()
+        self.thread = threading.Thread(target=self.write, args=(state, metadata), daemon=True)
+        self.thread.start()
+
+    def maybe_submit(self, position : int, get_snapshot):
+        """
+        Submits `get_snapshot()` (state, metadata) if a snapshot is due at this position and the writer is idle.
+        Returns whether a snapshot was submitted.
+        """
+        if self.is_busy() or not self.is_due(position):
+            return False
+        self.submit(*get_snapshot())
+        return True
+
+    def flush(self):
+        """
+        Waits for the snapshot being written, and raises the error of a failed write.
+        """
+        if self.thread is not None:
+            self.thread.join()
+        self.raise_error()
+
+    def raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
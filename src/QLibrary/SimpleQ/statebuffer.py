@@ -0,0 +1,154 @@
+import numpy as np
+
+from src.QLibrary.SimpleQ.tools import insert_qubit_state, remove_qubit_state
+
+class StateBuffer:
+    """
+    A class used to run a circuit without allocating memory in the gate loop.
+
+    The buffer owns two preallocated statevectors (complex128 by default) used in ping-pong: gates either update the current state in place
+    or write their result into the scratch buffer, which then becomes the current state.
+
+    Attributes
+    ----------
+    state : np.array
+        current statevector
+    scratch : np.array
+        second buffer, used for temporaries and as the output of permutation gates
+    allocation_count : int
+        number of arrays allocated by the buffer since its creation
+    """
+
+    def __init__(self, qubit_amount : int, dtype=np.complex128):
+        self.qubit_amount = qubit_amount
+        self.dtype = dtype
+        self.shape = (2,) * qubit_amount
+        self.allocation_count = 0
+        self.state = self.allocate()
+        self.scratch = self.allocate()
+        self.state[0] = 1
+
+    def allocate(self):
+        self.allocation_count += 1
+        return np.zeros(2 ** self.qubit_amount, dtype=self.dtype)
+
+    def get_state(self):
+        return self.state
+
+    def get_allocation_count(self):
+        return self.allocation_count
+
+    def set_state(self, state_vector : np.array):
+        np.copyto(self.state, state_vector)
+
+    def swap(self):
+        self.state, self.scratch = self.scratch, self.state
+
+    def insert_qubit(self, index : int):
+        """
+        Grows the register by one qubit in |0> at `index`: both buffers are reallocated and the state is copied once.
+        """
+        state = self.state
+        self.qubit_amount += 1
+        self.shape = (2,) * self.qubit_amount
+        self.state = insert_qubit_state(state, self.qubit_amount - 1, index, self.allocate())
+        self.scratch = self.allocate()
+
+    def delete_qubit(self, index : int, outcome : int):
+        """
+        Shrinks the register by removing qubit `index`, already collapsed on `outcome`.
+        """
+        state = self.state
+        self.qubit_amount -= 1
+        self.shape = (2,) * self.qubit_amount
+        self.state = remove_qubit_state(state, self.qubit_amount + 1, index, outcome, self.allocate())
+        self.scratch = self.allocate()
+
+    def normalize(self):
+        # |amplitude|^2 goes through the scratch buffer and is summed pairwise in float64 (a single precision dot product
+        # accumulates too much error on large registers)
+        np.conjugate(self.state, out=self.scratch)
+        np.multiply(self.scratch, self.state, out=self.scratch)
+        norm = float(np.sqrt(np.sum(self.scratch.real, dtype=np.float64)))
+        np.divide(self.state, norm, out=self.state)
+
+    def apply_gate(self, gate_matrix : np.array, index : int, controls : list=[]):
+        """
+        Applies a 1 qubit gate with an arbitrary number of controls on the current state, without allocating.
+        (numpy may still use its fixed-size iteration buffers, see `np.getbufsize`, which do not grow with the register)
+
+        The statevector is viewed as a (2, ..., 2) tensor: `low` and `high` are the views where the target qubit is 0 and 1
+        (and every control is 1), so only the affected amplitudes are touched.
+        Returns the name of the kernel used: "diagonal", "antidiagonal" or "dense".
+        """
+        # Python complex scalars avoid casting the whole operands to the gate's dtype
+        u00, u01 = complex(gate_matrix[0, 0]), complex(gate_matrix[0, 1])
+        u10, u11 = complex(gate_matrix[1, 0]), complex(gate_matrix[1, 1])
+        state = self.state.reshape(self.shape)
+        low_slices = [slice(None)] * self.qubit_amount
+        for control in controls:
+            low_slices[control] = slice(1, 2)
+        high_slices = list(low_slices)
+        # Slices (rather than integers) keep every operand a view, even when no free axis remains
+        low_slices[index] = slice(0, 1)
+        high_slices[index] = slice(1, 2)
+        low_slices, high_slices = tuple(low_slices), tuple(high_slices)
+        low, high = state[low_slices], state[high_slices]
+
+        if u01 == 0 and u10 == 0:
+            if u00 != 1:
+                np.multiply(low, u00, out=low)
+            if u11 != 1:
+                np.multiply(high, u11, out=high)
+            return "diagonal"
+
+        # Temporaries are taken from the same positions in the scratch buffer, so that every operand shares the same strides
+        scratch = self.scratch.reshape(self.shape)
+        scratch_low, scratch_high = scratch[low_slices], scratch[high_slices]
+        if u00 == 0 and u11 == 0:
+            if controls == []:
+                # Ping-pong: write the permuted state into the scratch buffer and swap buffers
+                np.multiply(high, u01, out=scratch_low)
+                np.multiply(low, u10, out=scratch_high)
+                self.swap()
+            else:
+                np.multiply(low, u10, out=scratch_low)
+                np.multiply(high, u01, out=low)
+                np.copyto(high, scratch_low)
+            return "antidiagonal"
+
+        # new low = u00 * low + u01 * high, new high = u10 * low + u11 * high
+        np.multiply(low, u00, out=scratch_low)
+        np.multiply(high, u01, out=scratch_high)
+        np.add(scratch_low, scratch_high, out=scratch_low)
+        np.multiply(low, u10, out=scratch_high)
+        np.multiply(high, u11, out=high)
+        np.add(high, scratch_high, out=high)
+        np.copyto(low, scratch_low)
+        return "dense"
+
+    def get_probabilities(self, index : int):
+        """
+        Returns the probabilities to measure 0 and 1 on a qubit, using the scratch buffer for |amplitude|^2.
+        """
+        state = self.state.reshape(self.shape)
+        scratch = self.scratch.reshape(self.shape)
+        slices = [slice(None)] * self.qubit_amount
+        weights = []
+        for outcome in [0, 1]:
+            slices[index] = slice(outcome, outcome + 1)
+            amplitudes, squares = state[tuple(slices)], scratch[tuple(slices)]
+            np.conjugate(amplitudes, out=squares)
+            np.multiply(squares, amplitudes, out=squares)
+            weights.append(float(np.sum(squares.real, dtype=np.float64)))
+        total = weights[0] + weights[1]
+        return weights[0] / total, weights[1] / total
+
+    def collapse(self, index : int, outcome : int):
+        """
+        Projects a qubit on the measured outcome and renormalises the state in place.
+        """
+        slices = [slice(None)] * self.qubit_amount
+        slices[index] = 1 - outcome
+        self.state.reshape(self.shape)[tuple(slices)] = 0
+        self.normalize()
@@ -0,0 +1,63 @@
+import time
+
+import numpy as np
+
+from src.QLibrary.SimpleQ.tools import get_probabilities
+
+implemented_update_modes = ["probabilities", "amplitudes"]
+
+def get_top_amplitudes(state_vector : np.array, top_k : int):
+    """
+    Returns the `top_k` largest amplitudes (in modulus) of a statevector, as bitstring -> [real part, imaginary part].
+    """
+    qubit_amount = int(np.log2(len(state_vector)))
+    probabilities = get_probabilities(state_vector)
+    top_k = min(top_k, len(state_vector))
+    indexes = np.argpartition(probabilities, -top_k)[-top_k:]
+    indexes = indexes[np.argsort(probabilities[indexes])[::-1]]
+    return {format(index, f"0{qubit_amount}b"): [float(state_vector[index].real), float(state_vector[index].imag)] for index in indexes}
+
+def get_column_update(circuit, position : int, outcome=None, mode : str="probabilities", top_k : int=8):
+    """
+    Returns the update sent after the column at `position` has been executed.
+    """
+    state_vector = circuit.get_system_matrix()
+    update = {"column": position}
+    if mode == "probabilities":
+        update["probabilities"] = get_probabilities(state_vector).tolist()
+    else:
+        update["amplitudes"] = get_top_amplitudes(state_vector, top_k)
+    if outcome is not None:
+        update["measurement"] = int(outcome)
+    return update
+
+def stream_updates(circuit, mode : str="probabilities", top_k : int=8, max_rate : float=None):
+    """
+    Runs the circuit column by column and yields an update after each column.
+
+    Updates are throttled to `max_rate` per second (None for no limit): a throttled column yields None, so the caller can
+    still check for cancellation after every column. The last column always yields its update.
+    Parameters
+    ----------
+    circuit : Circuit
+        circuit in its initial state
+    mode : str
+        "probabilities" (every basis state) or "amplitudes" (the `top_k` largest amplitudes)
+    max_rate : float
+        maximum number of updates per second
+    """
+    if mode not in implemented_update_modes:
+        raise NameError(f"{mode} update mode not found")
+    min_interval = 1 / max_rate if max_rate else 0
+    last_update = None
+    for position, column in enumerate(circuit.circuit):
+        outcome = circuit.execute_column(column)
+        if circuit.backend == "inplace":
+            circuit.buffer.normalize()
+        now = time.perf_counter()
+        due = last_update is None or now - last_update >= min_interval
+        if due or outcome is not None or position == len(circuit.circuit) - 1:
+            last_update = now
+            yield get_column_update(circuit, position, outcome, mode, top_k)
+        else:
+            yield None
@@ -1,30 +1,55 @@
 import numpy as np
 
-def prepare_initial_state(qubit_amount : int):
+implemented_precisions = ["complex64", "complex128"]
+
+def get_precision_dtype(precision):
+    """
+    Returns the numpy dtype associated to a precision name (or dtype), raising if it is not supported.
+    """
+    dtype = np.dtype(precision)
+    if dtype.name not in implemented_precisions:
+        raise ValueError(f"{dtype.name} precision is not supported, use one of {implemented_precisions}")
+    return dtype
+
+def prepare_initial_state(qubit_amount : int, dtype=np.complex128):
     """
     Initialize a vector state to `|0> ⊗ qubit_amount`
     """
-    matrix = np.array([1, 0])
-    for _ in range(qubit_amount - 1):
-        matrix = np.kron(matrix, np.array([1, 0]))
+    matrix = np.zeros(2 ** qubit_amount, dtype=dtype)
+    matrix[0] = 1
     return matrix
 
-def get_gate_by_name(gate_name : str):
+def get_gate_by_name(gate_name : str, dtype=np.complex128):
     """
     Returns the gate matrix associated to its name.
     """
     if gate_name == "X":
-        return np.array([[0, 1], [1, 0]])
+        return np.array([[0, 1], [1, 0]], dtype=dtype)
     if gate_name == "Y":
-        return np.array([[0, -1j], [1j, 0]])
+        return np.array([[0, -1j], [1j, 0]], dtype=dtype)
     if gate_name == "Z":
-        return np.array([[1, 0], [0, -1]])
+        return np.array([[1, 0], [0, -1]], dtype=dtype)
     if gate_name == "H":
-        return np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+        return (np.array([[1, 1], [1, -1]]) / np.sqrt(2)).astype(dtype)
     if gate_name == "M":
-        return np.array([[1, 0], [0, 0]])
+        return np.array([[1, 0], [0, 0]], dtype=dtype)
+
+shared_gates = {} # (gate name, dtype) -> gate matrix shared by every Gate
 
-def get_SWAP_gate():
+def get_shared_gate(gate_name : str, dtype=np.complex128):
+    """
+    Returns the gate matrix associated to its name, built once per name and dtype.
+    The matrix is read-only since every Gate of that name uses it.
+    """
+    key = (gate_name, np.dtype(dtype))
+    if key not in shared_gates:
+        gate = get_gate_by_name(gate_name, dtype)
+        if gate is not None:
+            gate.setflags(write=False)
+        shared_gates[key] = gate
+    return shared_gates[key]
+
+def get_SWAP_gate(dtype=np.complex128):
     """
     Returns SWAP gate matrix.
     This method is separated from the method `get_gate_by_name` because it handles a 2 qubit gate that is not intended to be part of the built-in gates.
@@ -32,20 +57,20 @@ def get_SWAP_gate():
     return np.array([[1, 0, 0, 0],
                      [0, 0, 1, 0],
                      [0, 1, 0, 0],
-                     [0, 0, 0, 1]])
+                     [0, 0, 0, 1]], dtype=dtype)
 
 def get_control_matrix(gate : np.array, len_controls : int):
     """
     Returns a control matrix according to the the corresponding gate and the number of controls.
     """
-    control_gate = np.identity(2 ** (len_controls + 1))
-    gate = get_gate_by_name(gate.get_name())
+    gate = gate.get_gate()
+    control_gate = np.identity(2 ** (len_controls + 1), dtype=gate.dtype)
     identity_rows, identity_cols = control_gate.shape
     inserted_rows, inserted_cols = gate.shape
     control_gate[identity_rows - inserted_rows:, identity_cols - inserted_cols:] = gate
     return control_gate
 
-def get_swap_unitary(len_register : int, q0: int, q1: int):
+def get_swap_unitary(len_register : int, q0: int, q1: int, dtype=np.complex128):
     """
     Returns a matrix unitary that performs a swap between two qubits.
 
@@ -54,30 +79,31 @@ def get_swap_unitary(len_register : int, q0: int, q1: int):
     ----------
     len_register : quantum register length
     q0, q1 : qubit indexes to swap
+    dtype : matrix dtype
     """
     if q0 < 0 or q0 >= len_register or q1 < 0 or q1 >= len_register:
         raise ValueError("Invalid qubit index")
     
     # Initialize all needed variables
-    SWAP_gate = get_SWAP_gate() # SWAP gate
+    SWAP_gate = get_SWAP_gate(dtype) # SWAP gate
     unitary = 1 # final unitary
     min_qubit = min(q0, q1) # Maximum index
     max_qubit = max(q0, q1) # Minimum index
     permutation_matrices = [] # List to stock our permutations matrices that will be reused to put the qubits back to their original positions.
-    permutation_matrix = 1
+    permutation_matrix = np.ones((1, 1), dtype=dtype)
     
     dist = max_qubit - min_qubit
     
     # Build permutation matrices
     # To swap the qubits, we need to perform 'dist' permutations
     for _ in range(dist):
-        permutation_matrix = np.kron(np.identity(2**((len_register - 1) - max_qubit)), permutation_matrix) # Start by building the unitary from the bottom of the circuit (ie. from the last qubit) to the SWAP gate 
+        permutation_matrix = np.kron(np.identity(2**((len_register - 1) - max_qubit), dtype=dtype), permutation_matrix) # Start by building the unitary from the bottom of the circuit (ie. from the last qubit) to the SWAP gate 
         permutation_matrix = np.kron(SWAP_gate, permutation_matrix) # Add SWAP gate to the unitary
         max_qubit -= 1 # Update qubit position index
         dist = max_qubit - min_qubit # Update distance between the two qubits
-        permutation_matrix = np.kron(np.identity(2 ** max_qubit), permutation_matrix) # Tensor product between the permutation matrix and identity with the size of the rest of the qubits that are not touched.
+        permutation_matrix = np.kron(np.identity(2 ** max_qubit, dtype=dtype), permutation_matrix) # Tensor product between the permutation matrix and identity with the size of the rest of the qubits that are not touched.
         permutation_matrices.append(permutation_matrix) # Append the permutation matrix to the list
-        permutation_matrix = 1 # Set the permutation matrix back to 1
+        permutation_matrix = np.ones((1, 1), dtype=dtype) # Set the permutation matrix back to 1
 
     # Build unitary
     # Here we multiply all the permutation matrices to get the whole unitary that will perform the full SWAP
@@ -92,31 +118,62 @@ def get_swap_unitary(len_register : int, q0: int, q1: int):
 def build_unitary(gate_matrix : np.array, len_register : int, target_index : int, control_indexes : list=[]):
     """
     Build a unitary matrix according to a specific gate, the full register length, the gate's target qubit and optionally the control indexes
+    The unitary has the same dtype as the gate matrix.
     """
-    unitary = 1
+    identity = np.identity(2, dtype=gate_matrix.dtype)
+    unitary = np.ones((1, 1), dtype=gate_matrix.dtype) # a plain 1 would be promoted to int64 by np.kron
     for i in reversed(range(len_register)):
         if i in control_indexes:
             continue
         if i > target_index:
-            unitary = np.kron(unitary, np.identity(2))
+            unitary = np.kron(unitary, identity)
         if i == target_index:
             unitary = np.kron(gate_matrix, unitary)
         if i < target_index:
-            unitary = np.kron(np.identity(2), unitary)
+            unitary = np.kron(identity, unitary)
     return unitary
 
+def apply_gate_to_tensor(tensor : np.array, gate_matrix : np.array, target_axis : int, control_axes : list=[]):
+    """
+    Applies a 1 qubit gate on one axis of a tensor and returns the resulting tensor.
+
+    The gate only acts on the slice where every control axis is set to 1, which avoids building the full controlled unitary.
+    Parameters
+    ----------
+    tensor : tensor with one axis of dimension 2 per qubit (other axes are left untouched)
+    gate_matrix : 2x2 gate matrix
+    target_axis : axis the gate is applied on
+    control_axes : axes that must be in the state |1>
+    """
+    slices = [slice(None)] * tensor.ndim
+    for axis in control_axes:
+        slices[axis] = 1
+    slices = tuple(slices)
+    # Target position once the control axes have been indexed out
+    sub_target = target_axis - len([axis for axis in control_axes if axis < target_axis])
+    sub_tensor = tensor[slices]
+    updated = np.tensordot(gate_matrix, sub_tensor, axes=([1], [sub_target]))
+    updated = np.moveaxis(updated, 0, sub_target)
+    result = tensor.astype(np.result_type(tensor, gate_matrix), copy=True)
+    result[slices] = updated
+    return result
+
+def get_sampling_probabilities(p0: float, p1: float):
+    """
+    Returns the probabilities of 0 and 1 as float64 values summing to 1.
+    Probabilities computed in single precision can be off by more than what `np.random.choice` accepts.
+    """
+    probabilities = np.array([np.real(p0), np.real(p1)], dtype=np.float64)
+    return probabilities / np.sum(probabilities)
+
 def get_distribution(p0: float, p1: float, shots=1000):
     """
     Returns a distribution of 0 and 1 with 'shots' trials according to their probabilities.
+    The number of 1 is a single binomial draw instead of one draw per shot.
     """
-    result_0 = 0
-    result_1 = 0
-    for _ in range(shots):
-        measure = np.random.choice([0, 1], size=1, p=[p0, p1])
-        if measure[0] == 0:
-            result_0 += 1
-        else:
-            result_1 += 1
+    probabilities = get_sampling_probabilities(p0, p1)
+    result_1 = int(np.random.binomial(shots, probabilities[1]))
+    result_0 = shots - result_1
     results = {
         "0": result_0,
         "1": result_1
@@ -124,6 +181,61 @@ def get_distribution(p0: float, p1: float, shots=1000):
     
     return results
 
+def insert_qubit_state(state_vector : np.array, qubit_amount : int, index : int, out : np.array=None):
+    """
+    Returns the statevector with a new qubit in |0> inserted at `index`.
+
+    Viewed as a (2^index, 2, 2^(qubit_amount - index)) array, the new state holds the old amplitudes in its [:, 0, :] slice
+    and zeros in [:, 1, :], so the old state is copied once with a strided write.
+    `out` can be given to write into a preallocated array of 2^(qubit_amount + 1) amplitudes.
+    """
+    if out is None:
+        out = np.zeros(2 ** (qubit_amount + 1), dtype=state_vector.dtype)
+    new_state = out.reshape(2 ** index, 2, 2 ** (qubit_amount - index))
+    new_state[:, 1, :] = 0
+    np.copyto(new_state[:, 0, :], state_vector.reshape(2 ** index, 2 ** (qubit_amount - index)))
+    return out
+
+def remove_qubit_state(state_vector : np.array, qubit_amount : int, index : int, outcome : int, out : np.array=None):
+    """
+    Returns the statevector without qubit `index`, keeping the amplitudes where that qubit is `outcome`.
+    The state should already be collapsed on that outcome (see `Circuit.collapse`), so the result stays normalised.
+    `out` can be given to write into a preallocated array of 2^(qubit_amount - 1) amplitudes.
+    """
+    if out is None:
+        out = np.empty(2 ** (qubit_amount - 1), dtype=state_vector.dtype)
+    kept = state_vector.reshape(2 ** index, 2, 2 ** (qubit_amount - 1 - index))[:, outcome, :]
+    np.copyto(out.reshape(kept.shape), kept)
+    return out
+
+def get_probabilities(state_vector : np.array):
+    """
+    Returns the probability of every basis state, |psi|^2.
+    """
+    return np.abs(state_vector) ** 2
+
+def get_marginal(probabilities : np.array, qubit_amount : int, qubits : list):
+    """
+    Returns the marginal probabilities of a subset of qubits, as a vector of 2^len(qubits) values.
+
+    The probability vector is viewed as a (2, ..., 2) tensor and the other qubits are summed out.
+    Outcomes are indexed with the first requested qubit as the most significant bit.
+    """
+    tensor = probabilities.reshape((2,) * qubit_amount)
+    other_qubits = tuple(i for i in range(qubit_amount) if i not in qubits)
+    marginal = np.sum(tensor, axis=other_qubits)
+    # Remaining axes are in increasing qubit order, put them back in the requested order
+    kept_qubits = sorted(qubits)
+    marginal = np.transpose(marginal, [kept_qubits.index(qubit) for qubit in qubits])
+    return marginal.reshape(-1)
+
+def get_joint_distribution(outcomes : np.array, qubit_count : int):
+    """
+    Returns the histogram of sampled outcome indexes, keyed by bitstring (only observed outcomes are listed).
+    """
+    values, counts = np.unique(outcomes, return_counts=True)
+    return {format(value, f"0{qubit_count}b"): int(count) for value, count in zip(values, counts)}
+
 class Gate:
     """
     Gate class represented by name and control indexes.
@@ -133,11 +245,18 @@ class Gate:
     gate_name : gate identifier
     gate : gate array
     ctrl : list of control qubit's indexes
+    dtype : gate matrix dtype
     """
-    def __init__(self, gate_name : str, ctrl : list):
+    __slots__ = ("gate_name", "gate", "ctrl", "dtype")
+
+    def __init__(self, gate_name : str, ctrl : list, dtype=np.complex128):
         self.gate_name = gate_name
-        self.gate = get_gate_by_name(gate_name) 
+        self.gate = get_shared_gate(gate_name, dtype)
         self.ctrl = ctrl
+        self.dtype = dtype
+
+    def get_dtype(self):
+        return self.dtype
 
     def get_ctrl(self):
         return self.ctrl
@@ -146,4 +265,11 @@ class Gate:
         return self.gate_name
     
     def get_gate(self):
-        return self.gate
\ No newline at end of file
+        return self.gate
+
+    def gate_to_json(self):
+        gate_json = {
+            "gate_name": self.gate_name,
+            "ctrl_qubits_indexes": list(self.ctrl)
+        }
+        return gate_json
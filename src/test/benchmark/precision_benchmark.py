@@ -0,0 +1,45 @@
+"""
+Compares complex64 and complex128 statevectors: run time, memory and error against complex128.
+
+Usage : python src/test/benchmark/precision_benchmark.py [qubit_amount] [layers]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from src.QLibrary.SimpleQ.circuit import Circuit
+
+def build_circuit(qubit_amount, layers, precision):
+    circ = Circuit(qubit_amount, "inplace", precision=precision)
+    for _ in range(layers):
+        for i in range(qubit_amount):
+            circ.set_gate("H", i)
+        for i in range(qubit_amount - 1):
+            circ.set_gate("Y", i + 1, ctrl=[i]).set_gate("H", i, ctrl=[i + 1]).set_gate("Z", i)
+    return circ
+
+def run(qubit_amount, layers):
+    results = {}
+    for precision in ["complex128", "complex64"]:
+        circ = build_circuit(qubit_amount, layers, precision)
+        start = time.perf_counter()
+        circ.launch_circuit()
+        elapsed = time.perf_counter() - start
+        results[precision] = (circ.get_system_matrix().copy(), elapsed)
+
+    reference, reference_time = results["complex128"]
+    print(f"{qubit_amount} qubits, {layers} layers")
+    print(f"{'precision':<12}{'time (s)':>10}{'state (MB)':>12}{'max error':>12}{'1 - fidelity':>14}")
+    for precision, (state, elapsed) in results.items():
+        error = np.max(np.abs(state - reference))
+        infidelity = 1 - np.abs(np.vdot(reference, state)) ** 2
+        print(f"{precision:<12}{elapsed:>10.3f}{state.nbytes / 2 ** 20:>12.1f}{error:>12.2e}{infidelity:>14.2e}")
+
+if __name__ == "__main__":
+    qubit_amount = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    layers = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    run(qubit_amount, layers)
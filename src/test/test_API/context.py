@@ -0,0 +1,13 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+# The API imports the emulator as the SimpleQ package, like in its container
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../QLibrary')))
+
+# Tests run against a local SQLite database instead of the postgres container
+os.environ.setdefault('DATABASE_URL', 'sqlite+aiosqlite://')
+# Tests do not write log files
+os.environ.setdefault('SIMPLEQ_LOG_LEVEL', 'OFF')
+
+from src.API.backend import metadata
@@ -0,0 +1,43 @@
+from context import metadata
+
+from SimpleQ import circuit as circuit_object
+
+def make_column(target, gate_name="X", ctrl=None, condition=None):
+    column = {"qubit_index": target, "qubit_information": {"gate_name": gate_name, "ctrl_qubits_indexes": ctrl or []}}
+    if condition is not None:
+        column["condition"] = condition
+    return column
+
+def test_metadata_fields():
+    circuit = {"nb_qubit": 3, "circuit": [make_column(0, "H"), make_column(1, ctrl=[0]), make_column(2, "H"), make_column(2, "M")]}
+    data = metadata.get_circuit_metadata(circuit)
+    assert data["nb_qubit"] == 3
+    assert data["column_count"] == 4
+    assert data["depth"] == 2
+    assert len(data["content_hash"]) == 64
+
+def test_condition_adds_depth():
+    circuit = {"nb_qubit": 2, "circuit": [make_column(0, "M"), make_column(1, condition=[0, 1])]}
+    assert metadata.get_circuit_metadata(circuit)["depth"] == 2
+
+def test_equivalent_encodings_share_hash():
+    circuit = {"nb_qubit": 3, "circuit": [make_column(2, ctrl=[0, 1])]}
+    stringified = {"nb_qubit": "3", "circuit": [make_column("2", ctrl=[1, "0"])]}
+    assert metadata.get_circuit_metadata(circuit)["content_hash"] == metadata.get_circuit_metadata(stringified)["content_hash"]
+
+def test_different_circuits_differ():
+    circuit = {"nb_qubit": 2, "circuit": [make_column(0)]}
+    other = {"nb_qubit": 2, "circuit": [make_column(1)]}
+    larger = {"nb_qubit": 3, "circuit": [make_column(0)]}
+    hashes = {metadata.get_circuit_metadata(c)["content_hash"] for c in [circuit, other, larger]}
+    assert len(hashes) == 3
+
+def test_depth_matches_scheduler():
+    circ = circuit_object.Circuit(4)
+    circ.set_gate("H", 0).set_gate("X", 1, [0]).set_gate("H", 3).set_measure(1).set_gate("X", 2, condition=(1, 1))
+    circ.set_gate("Z", 3, [2, 0])
+    circuit = {"nb_qubit": 4, "circuit": [
+        make_column(0, "H"), make_column(1, ctrl=[0]), make_column(3, "H"), make_column(1, "M"),
+        make_column(2, condition=[1, 1]), make_column(3, "Z", ctrl=[2, 0])
+    ]}
+    assert metadata.get_circuit_metadata(circuit)["depth"] == circ.get_depth() == 5
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("aiosqlite")
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+import context
+from src.API import main
+from src.API.backend import database
+
+@pytest.fixture
+def client(tmp_path):
+    engine = database.create_engine(f"sqlite+aiosqlite:///{tmp_path}/simpleq.db")
+    asyncio.run(database.init_models(engine))
+    session_factory = sessionmaker(engine, class_=database.AsyncSession, expire_on_commit=False)
+
+    async def get_test_session():
+        async with session_factory() as session:
+            yield session
+
+    main.app.dependency_overrides[database.get_session] = get_test_session
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+    asyncio.run(engine.dispose())
+
+def test_list_circuit_created_without_user(client):
+    created = client.post("/circuit/create/", json={"nb": 2})
+    assert created.status_code == 200
+    response = client.get("/circuit/")
+    assert response.status_code == 200
+    summary, = response.json()
+    assert summary["id"] == created.json()["id"]
+    assert summary["nb_qubit"] == 2
+    assert summary["user_id"] is None
+
+def test_create_circuit_wider_than_binary_format(client):
+    created = client.post("/circuit/create/", json={"nb": 80})
+    assert created.status_code == 200
+    response = client.get(f"/circuit/{created.json()['id']}")
+    assert response.status_code == 200
+    assert int(response.json()["nb_qubit"]) == 80
+
+def bell_circuit(circuit_id):
+    return {"id": circuit_id, "nb_qubit": 2, "circuit": [
+        {"qubit_index": 0, "qubit_information": {"gate_name": "H", "ctrl_qubits_indexes": []}},
+        {"qubit_index": 1, "qubit_information": {"gate_name": "X", "ctrl_qubits_indexes": [0]}}
+    ]}
+
+def test_preview(client):
+    circuit_id = client.post("/circuit/create/", json={"nb": 2}).json()["id"]
+    response = client.post("/circuit/preview/", json=bell_circuit(circuit_id))
+    assert response.status_code == 200
+    assert response.json()["probabilities"] == pytest.approx([0.5, 0, 0, 0.5])
+    assert response.json()["checkpoint"]["columns_applied"] == 2
+
+def test_expectation(client):
+    circuit_id = client.post("/circuit/create/", json={"nb": 2}).json()["id"]
+    response = client.post("/circuit/expectation/", json={"circuit": bell_circuit(circuit_id), "hamiltonian": {"ZZ": 1.0, "XX": 0.5, "ZI": 2.0}})
+    assert response.status_code == 200
+    assert response.json()["expectation"] == pytest.approx(1.5)
+    assert response.json()["terms"] == pytest.approx({"ZZ": 1.0, "XX": 1.0, "ZI": 0.0})
+    invalid = client.post("/circuit/expectation/", json={"circuit": bell_circuit(circuit_id), "hamiltonian": {"ZZZ": 1.0}})
+    assert invalid.status_code == 400
+
+def test_amplitudes(client):
+    circuit_id = client.post("/circuit/create/", json={"nb": 2}).json()["id"]
+    response = client.post("/circuit/amplitudes/", json={"circuit": bell_circuit(circuit_id), "bitstrings": ["00", "01", "11"]})
+    assert response.status_code == 200
+    amplitudes = response.json()["amplitudes"]
+    assert [amplitudes[bitstring][0] for bitstring in ["00", "01", "11"]] == pytest.approx([2 ** -0.5, 0, 2 ** -0.5])
+    assert response.json()["method"] in ("feynman", "mps")
+    invalid = client.post("/circuit/amplitudes/", json={"circuit": bell_circuit(circuit_id), "bitstrings": ["0"]})
+    assert invalid.status_code == 400
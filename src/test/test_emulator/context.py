@@ -3,6 +3,23 @@ import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
+# Tests do not write log files
+os.environ.setdefault('SIMPLEQ_LOG_LEVEL', 'OFF')
+
 from src.QLibrary.SimpleQ import circuit
 from src.QLibrary.SimpleQ import tools
-from src.QLibrary.SimpleQ import logger
\ No newline at end of file
+from src.QLibrary.SimpleQ import mps
+from src.QLibrary.SimpleQ import scheduler
+from src.QLibrary.SimpleQ import checkpoint
+from src.QLibrary.SimpleQ import stream
+from src.QLibrary.SimpleQ import binary
+from src.QLibrary.SimpleQ import ingest
+from src.QLibrary.SimpleQ import columntable
+from src.QLibrary.SimpleQ import metrics
+from src.QLibrary.SimpleQ import profiler
+from src.QLibrary.SimpleQ import estimator
+from src.Logger import logger
+from src.QLibrary.SimpleQ import sampler
+from src.QLibrary.SimpleQ import observables
+from src.QLibrary.SimpleQ import amplitudes
+from src.QLibrary.SimpleQ import snapshot
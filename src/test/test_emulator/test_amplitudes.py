@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from context import circuit, amplitudes
+
+def random_circuit(qubit_amount, column_count, seed=0):
+    generator = np.random.default_rng(seed)
+    circ = circuit.Circuit(qubit_amount, "inplace")
+    for _ in range(column_count):
+        qubits = generator.permutation(qubit_amount)
+        control_count = generator.integers(0, min(3, qubit_amount))
+        circ.set_gate(str(generator.choice(["X", "Y", "Z", "H"])), int(qubits[0]), [int(qubit) for qubit in qubits[1:1 + control_count]])
+    return circ
+
+def all_bitstrings(qubit_amount):
+    return [format(index, f"0{qubit_amount}b") for index in range(2 ** qubit_amount)]
+
+@pytest.mark.parametrize("method", ["feynman", "mps", "auto"])
+@pytest.mark.parametrize("seed", range(4))
+def test_amplitudes_match_statevector(method, seed):
+    circ = random_circuit(4, 20, seed)
+    bitstrings = all_bitstrings(4)
+    values = circ.get_amplitudes(bitstrings, method)
+    circ.launch_circuit()
+    assert np.allclose([values[bitstring] for bitstring in bitstrings], circ.get_system_matrix())
+
+def test_wide_circuit():
+    # GHZ state on 40 qubits: the statevector would need 16 TiB
+    circ = circuit.Circuit(40, "mps")
+    circ.set_gate("H", 0)
+    for qubit in range(1, 40):
+        circ.set_gate("X", qubit, [qubit - 1])
+    bitstrings = ["0" * 40, "1" * 40, "0" * 39 + "1"]
+    for method in ["feynman", "mps"]:
+        values = circ.get_amplitudes(bitstrings, method)
+        assert np.allclose([values[bitstring] for bitstring in bitstrings], [2 ** -0.5, 2 ** -0.5, 0])
+
+def test_plan_prefers_paths_for_few_branching_gates():
+    circ = circuit.Circuit(30, "mps")
+    for qubit in range(30):
+        circ.set_gate("X", qubit)
+    circ.set_gate("H", 0)
+    plan = amplitudes.plan_amplitudes(30, circ.circuit, 1)
+    assert plan["method"] == "feynman"
+    assert set(plan["operations"]) == {"feynman", "mps"}
+
+def test_invalid_queries():
+    circ = circuit.Circuit(2)
+    circ.set_gate("H", 0)
+    with pytest.raises(ValueError):
+        circ.get_amplitudes(["010"])
+    with pytest.raises(ValueError):
+        circ.get_amplitudes(["0a"])
+    with pytest.raises(NameError):
+        circ.get_amplitudes(["00"], "dense")
+    circ.set_measure(0)
+    with pytest.raises(ValueError):
+        circ.get_amplitudes(["00"])
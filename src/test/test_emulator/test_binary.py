@@ -0,0 +1,51 @@
+import pytest
+import numpy as np
+
+from context import circuit, binary
+
+def build_circuit():
+    circ = circuit.Circuit(5)
+    circ.set_gate("H", 0).set_gate("X", 4, ctrl=[0, 2]).set_gate("Y", 1, ctrl=[3])
+    circ.set_measure(4).set_gate("Z", 2, condition=(4, 1)).set_reset(0).set_gate("H", 3)
+    return circ
+
+def test_round_trip():
+    circ = build_circuit()
+    data = circ.circuit_to_binary()
+    assert len(data) == binary.binary_header.size + 7 * binary.record_dtype.itemsize
+    decoded = circuit.Circuit.binary_to_circuit(data)
+    assert len(decoded.get_quantum_register()) == 5
+    assert decoded.circuit_to_json() == circ.circuit_to_json()
+
+def test_round_trip_same_state():
+    circ = circuit.Circuit(3, "inplace")
+    circ.set_gate("H", 0).set_gate("X", 2, ctrl=[0]).set_gate("Y", 1, ctrl=[2, 0])
+    decoded = circuit.Circuit.binary_to_circuit(circ.circuit_to_binary(), "inplace", "complex64")
+    circ.launch_circuit()
+    decoded.launch_circuit()
+    assert decoded.get_system_matrix().dtype == np.complex64
+    assert np.allclose(decoded.get_system_matrix(), circ.get_system_matrix(), atol=1e-6)
+
+def test_large_circuit():
+    circ = circuit.Circuit(20)
+    for i in range(10000):
+        circ.set_gate(["X", "Y", "Z", "H"][i % 4], i % 20, ctrl=sorted([(i + 1) % 20, (i + 7) % 20]))
+    decoded = circuit.Circuit.binary_to_circuit(circ.circuit_to_binary())
+    assert decoded.circuit_to_json() == circ.circuit_to_json()
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: data[:-1],
+    lambda data: b"XXXX" + data[4:],
+    lambda data: data[:binary.binary_header.size] + bytes([9]) + data[binary.binary_header.size + 1:]
+])
+def test_invalid_data(corrupt):
+    with pytest.raises(ValueError):
+        circuit.Circuit.binary_to_circuit(corrupt(build_circuit().circuit_to_binary()))
+
+def test_control_out_of_register():
+    circ = circuit.Circuit(2)
+    circ.set_gate("X", 0, ctrl=[1])
+    data = bytearray(circ.circuit_to_binary())
+    data[binary.binary_header.size + 6] = 0b100 # control on qubit 2
+    with pytest.raises(ValueError):
+        circuit.Circuit.binary_to_circuit(bytes(data))
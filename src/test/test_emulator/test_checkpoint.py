@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import numpy as np
+
+from context import circuit, checkpoint
+
+def build_circuit(gates, qubit_amount=3, backend="statevector"):
+    circ = circuit.Circuit(qubit_amount, backend)
+    for gate_name, index, ctrl in gates:
+        circ.set_gate(gate_name, index, ctrl)
+    return circ
+
+def reference_state(gates, qubit_amount=3):
+    circ = build_circuit(gates, qubit_amount, "inplace")
+    circ.launch_circuit()
+    return circ.get_system_matrix()
+
+gates = [("H", 0, []), ("X", 1, [0]), ("Y", 2, []), ("H", 1, []), ("Z", 2, [1]), ("H", 2, []), ("X", 0, [2]), ("Y", 1, [])]
+
+def test_append_applies_one_column():
+    cache = checkpoint.CheckpointCache(interval=4)
+    circ = build_circuit(gates)
+    assert cache.simulate(1, circ) == {"resumed_from": 0, "columns_applied": 8}
+    circ = build_circuit(gates + [("H", 0, [])])
+    assert cache.simulate(1, circ) == {"resumed_from": 8, "columns_applied": 1}
+    assert np.allclose(circ.get_system_matrix(), reference_state(gates + [("H", 0, [])]))
+
+def test_edit_resumes_from_previous_checkpoint():
+    cache = checkpoint.CheckpointCache(interval=3)
+    cache.simulate(1, build_circuit(gates))
+    edited = list(gates)
+    edited[5] = ("X", 2, [])
+    circ = build_circuit(edited)
+    assert cache.simulate(1, circ) == {"resumed_from": 3, "columns_applied": 5}
+    assert np.allclose(circ.get_system_matrix(), reference_state(edited))
+    # Back to the original circuit: checkpoints after the edit were replaced
+    circ = build_circuit(gates)
+    assert cache.simulate(1, circ)["resumed_from"] == 3
+    assert np.allclose(circ.get_system_matrix(), reference_state(gates))
+
+def test_snapshots_are_not_modified():
+    cache = checkpoint.CheckpointCache(interval=2)
+    cache.simulate(1, build_circuit(gates))
+    for _ in range(2):
+        circ = build_circuit(gates + [("X", 0, [])])
+        cache.simulate(1, circ)
+        circ = build_circuit(gates)
+        cache.simulate(1, circ)
+        assert np.allclose(circ.get_system_matrix(), reference_state(gates))
+
+def test_no_checkpoint_after_measurement():
+    cache = checkpoint.CheckpointCache(interval=1)
+    circ = build_circuit(gates[:2])
+    circ.set_measure(0).set_gate("H", 2)
+    cache.simulate(1, circ)
+    circ = build_circuit(gates[:2])
+    circ.set_measure(0).set_gate("H", 2).set_gate("X", 1)
+    assert cache.simulate(1, circ)["resumed_from"] == 2
+
+def test_lru_eviction_and_register_change():
+    cache = checkpoint.CheckpointCache(interval=2, max_circuits=2)
+    for key in [1, 2, 3]:
+        cache.simulate(key, build_circuit(gates))
+    assert len(cache) == 2
+    assert cache.simulate(1, build_circuit(gates))["resumed_from"] == 0
+    assert cache.simulate(3, build_circuit(gates))["resumed_from"] == 8
+    # Same columns on a larger register
+    assert cache.simulate(3, build_circuit(gates, 4))["resumed_from"] == 0
+
+def test_concurrent_simulations():
+    """
+    Requests simulated in worker threads share the cache, alternating between two versions of the same circuits.
+    """
+    cache = checkpoint.CheckpointCache(interval=2, max_circuits=2)
+    versions = [gates, gates[:5] + [("X", 0, [])]]
+    jobs = [(key, version) for _ in range(20) for key in [1, 2, 3] for version in range(2)]
+
+    def simulate(job):
+        key, version = job
+        circ = build_circuit(versions[version])
+        cache.simulate(key, circ)
+        return np.allclose(circ.get_system_matrix(), reference_state(versions[version]))
+
+    with ThreadPoolExecutor(8) as executor:
+        assert all(executor.map(simulate, jobs))
+    assert len(cache) == 2
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        checkpoint.CheckpointCache(interval=0)
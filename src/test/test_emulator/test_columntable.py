@@ -0,0 +1,89 @@
+import pytest
+import numpy as np
+
+from context import circuit, columntable
+
+def build_circuit(qubit_amount=4):
+    circ = circuit.Circuit(qubit_amount)
+    circ.set_gate("H", 0).set_gate("X", 3, ctrl=[0, 1]).set_measure(1).set_gate("Z", 2, condition=(1, 1)).set_reset(3)
+    return circ
+
+def test_columns_are_views():
+    circ = build_circuit()
+    assert isinstance(circ.circuit, columntable.ColumnTable)
+    assert len(circ.circuit) == 5
+    column = circ.circuit[1]
+    assert (column.get_gate().get_name(), column.get_index(), column.get_gate().get_ctrl()) == ("X", 3, [0, 1])
+    assert isinstance(circ.circuit[2], circuit.MeasureColumn)
+    assert circ.circuit[3].get_condition() == (1, 1)
+    assert circ.circuit[-1].get_flip().get_gate().get_name() == "X"
+    assert [c.get_index() for c in circ.circuit[1:3]] == [3, 1]
+    assert not hasattr(column, "__dict__")
+
+def test_list_assignment_and_equality():
+    circ = build_circuit()
+    columns = list(circ.circuit)
+    other = circuit.Circuit(4)
+    other.circuit = columns
+    assert other.circuit == circ.circuit
+    assert other.circuit == columns
+    assert other.circuit != columns[:-1]
+    other.circuit = []
+    assert other.circuit == []
+
+def test_append_is_amortised():
+    table = columntable.ColumnTable()
+    for i in range(1000):
+        table.append_column("H", i % 7, [(i + 1) % 7])
+    assert len(table) == 1000
+    assert table.controls.shape[0] < 2 * 1000
+    assert table[999].get_gate().get_ctrl() == [(999 + 1) % 7]
+
+def test_memory_per_column():
+    table = columntable.ColumnTable.from_records(np.zeros(1000000, dtype=columntable.record_dtype))
+    assert len(table) == 1000000
+    assert table.get_nbytes() < 32 * 2 ** 20
+
+def test_wide_controls():
+    circ = circuit.Circuit(130, "mps")
+    circ.set_gate("X", 0).set_gate("X", 129, ctrl=[0, 64, 127]).set_gate("X", 64)
+    assert circ.circuit[1].get_gate().get_ctrl() == [0, 64, 127]
+
+def test_insert_qubit_remaps_columns():
+    circ = build_circuit()
+    circ.add_qubit(1)
+    expected = circuit.Circuit(5)
+    expected.set_gate("H", 0).set_gate("X", 4, ctrl=[0, 2]).set_measure(2).set_gate("Z", 3, condition=(2, 1)).set_reset(4)
+    assert circ.get_qubit_amount() == 5
+    assert circ.circuit == expected.circuit
+
+@pytest.mark.parametrize("index", [0, 5, 63, 64, 100])
+def test_insert_and_delete_qubit_across_words(index):
+    table = columntable.ColumnTable()
+    controls = [2, 62, 63, 64, 70, 126, 127]
+    table.append_column("X", 128, controls)
+    table.insert_qubit(index)
+    shifted = [control + (control >= index) for control in controls]
+    assert table[0].get_gate().get_ctrl() == shifted
+    assert table[0].get_index() == 129
+    table.delete_qubit(index)
+    assert table[0].get_gate().get_ctrl() == controls
+    assert table[0].get_index() == 128
+
+@pytest.mark.parametrize("index", [64, 66, 69])
+def test_insert_qubit_beyond_mask_words(index):
+    circ = circuit.Circuit(70, "mps")
+    circ.set_gate("X", 1, [0]).set_gate("H", 68).set_gate("Z", 67, condition=(68, 1))
+    assert circ.circuit.controls.shape[1] == 1
+    circ.add_qubit(index)
+    shifted = [(name, target + (target >= index), ctrl) for name, target, ctrl in [("X", 1, [0]), ("H", 68, []), ("Z", 67, [])]]
+    assert [(c.get_gate().get_name(), c.get_index(), c.get_gate().get_ctrl()) for c in circ.circuit] == shifted
+    assert circ.circuit[2].get_condition() == (69 if index <= 68 else 68, 1)
+
+def test_delete_used_qubit():
+    circ = build_circuit()
+    with pytest.raises(ValueError):
+        circ.circuit.delete_qubit(1)
+    circ = circuit.Circuit(3).set_gate("H", 0).set_gate("X", 2)
+    circ.delete_qubit(1)
+    assert [c.get_index() for c in circ.circuit] == [0, 1]
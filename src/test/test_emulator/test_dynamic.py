@@ -0,0 +1,93 @@
+import pytest
+import numpy as np
+
+from context import circuit
+
+BACKENDS = ["statevector", "inplace", "factorized", "mps"]
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_feed_forward(backend):
+    """
+    The measured outcome of qubit 0 conditions an X gate on qubit 1.
+    Prepared state : |10>
+    Desired output state : |11>
+    """
+    circ = circuit.Circuit(2, backend)
+    circ.set_gate("X", 0).set_measure(0).set_gate("X", 1, condition=(0, 1)).set_gate("Z", 1, condition=(0, 0))
+    circ.launch_circuit()
+    assert np.allclose(circ.get_system_matrix(), [0, 0, 0, 1])
+    assert circ.get_classical_register()[0]["simulation"]["measurement"] == 1
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_mid_circuit_measure_collapses(backend):
+    """
+    After measuring one qubit of a Bell pair, the state is a basis state.
+    """
+    circ = circuit.Circuit(2, backend)
+    circ.set_gate("H", 0).set_gate("X", 1, ctrl=[0]).set_measure(1)
+    circ.launch_circuit()
+    outcome = circ.get_classical_register()[1]["simulation"]["measurement"]
+    expected = np.zeros(4)
+    expected[3 * outcome] = 1
+    assert np.allclose(np.abs(circ.get_system_matrix()), expected)
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_reset(backend):
+    """
+    Resetting half of a Bell pair leaves it in |0>, the other qubit keeps the measured value.
+    """
+    circ = circuit.Circuit(2, backend)
+    circ.set_gate("H", 0).set_gate("X", 1, ctrl=[0]).set_reset(0)
+    circ.launch_circuit()
+    assert circ.get_marginal([0]) == pytest.approx([1, 0])
+    assert np.linalg.norm(circ.get_system_matrix()) == pytest.approx(1)
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_run_shots_groups_branches(backend):
+    """
+    Shots are split per outcome, the prefix before the measurement is only simulated once.
+    """
+    circ = circuit.Circuit(3, backend)
+    circ.set_gate("H", 0).set_measure(0).set_gate("X", 1, condition=(0, 1)).set_measure(1).set_measure(2)
+    results = circ.run_shots(1000)
+    assert set(results["distribution"].keys()) == {"000", "110"}
+    assert sum(results["distribution"].values()) == 1000
+    assert results["branches"] == 2
+
+def test_run_shots_single_branch():
+    """
+    Deterministic measurements never copy the state.
+    """
+    circ = circuit.Circuit(2)
+    circ.set_gate("X", 0).set_measure(0).set_reset(0).set_measure(0)
+    results = circ.run_shots(50)
+    assert results == {"distribution": {"10": 50}, "branches": 1}
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_run_shots_starts_from_initial_state(backend):
+    """
+    Running the circuit before, or running the shots twice, does not apply the circuit to an evolved state.
+    """
+    circ = circuit.Circuit(2, backend)
+    circ.set_gate("X", 0).set_measure(0).set_gate("X", 1, condition=(0, 1)).set_measure(1)
+    circ.launch_circuit()
+    for _ in range(2):
+        assert circ.run_shots(20)["distribution"] == {"11": 20}
+
+def test_run_shots_reset_branches():
+    """
+    A reset is not recorded but still splits the shots, the entangled qubit keeps the measured value.
+    """
+    circ = circuit.Circuit(2)
+    circ.set_gate("H", 0).set_gate("X", 1, ctrl=[0]).set_reset(0).set_measure(1).set_measure(0)
+    results = circ.run_shots(400)
+    assert set(results["distribution"].keys()) <= {"00", "10"}
+    assert sum(results["distribution"].values()) == 400
+
+def test_condition_serialization():
+    circ = circuit.Circuit(2)
+    circ.set_measure(0).set_gate("X", 1, condition=(0, 1))
+    columns = circ.circuit_to_json()["circuit"]
+    assert columns[0]["qubit_information"]["gate_name"] == "M"
+    assert columns[1]["condition"] == [0, 1]
+    assert "condition" not in columns[0]
@@ -65,6 +65,20 @@ def test_X_gate_with_one_control():
     cmp = system_matrix == np.array([0, 0, 0, 1])
     assert cmp.all()
 
+def test_Y_gate_with_one_control():
+    """
+    One control qubit test, the imaginary part of the controlled gate must be kept.
+    Prepared state : |10>
+    Desired output state : i|11>
+    """
+    circ = circuit.Circuit(2)
+    circ.set_gate("X", 0).set_gate("Y", 1, ctrl=[0])
+    circ.launch_circuit()
+
+    system_matrix = circ.get_system_matrix()
+    cmp = system_matrix == np.array([0, 0, 0, 1j])
+    assert cmp.all()
+
 def test_X_gate_with_control_index_after_target_index():
     """
     One control qubit test.
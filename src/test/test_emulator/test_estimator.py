@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from context import circuit, estimator
+
+def column_dict(target, gate_name="X", ctrl=None):
+    return {"qubit_index": target, "qubit_information": {"gate_name": gate_name, "ctrl_qubits_indexes": ctrl or []}}
+
+def test_statistics():
+    circ = circuit.Circuit(5)
+    circ.set_gate("H", 0).set_gate("X", 3, [0]).set_gate("X", 4).set_gate("Z", 2, [1]).set_measure(4)
+    statistics = estimator.get_circuit_statistics(5, circ.circuit)
+    assert statistics["column_count"] == 5
+    assert statistics["measurement_count"] == 1
+    assert statistics["largest_group"] == 2
+    assert sorted(statistics["group_sizes"]) == [1, 2, 2]
+    assert statistics["max_span"] == 4
+    assert statistics["bond_crossings"] == [1, 2, 1, 0]
+    assert statistics["max_swaps"] == len(circ.circuit[1].get_swaps())
+
+def test_bond_dimension_bound():
+    assert estimator.get_max_bond_dimension(6, [0, 0, 0, 0, 0]) == 1
+    assert estimator.get_max_bond_dimension(6, [1, 5, 9, 5, 1]) == 8
+    assert estimator.get_max_bond_dimension(6, [1, 5, 9, 5, 1], max_bond_dimension=4) == 4
+
+def test_memory_estimates_follow_precision():
+    circ = circuit.Circuit(10)
+    circ.set_gate("H", 0)
+    double, single = [{estimate["backend"]: estimate for estimate in estimator.estimate_resources(10, circ.circuit, precision=precision)}
+                      for precision in ["complex128", "complex64"]]
+    assert double["inplace"]["memory_bytes"] == 2 * 2 ** 10 * 16
+    assert single["inplace"]["memory_bytes"] == double["inplace"]["memory_bytes"] // 2
+    assert double["statevector"]["memory_bytes"] > 2 ** 20 * 16
+
+def test_statevector_estimate_bounds_actual_state():
+    circ = circuit.Circuit(6)
+    circ.set_gate("H", 0).set_gate("X", 5, [0])
+    estimate = estimator.estimate_resources(6, circ.circuit, backends=["statevector"])[0]
+    circ.launch_circuit()
+    assert estimate["memory_bytes"] >= circ.get_state_nbytes()
+
+def test_plan_picks_fastest_admissible_backend():
+    circ = circuit.Circuit(20)
+    for qubit in range(20):
+        circ.set_gate("H", qubit)
+    assert estimator.plan_backend(20, circ.circuit)["backend"] == "factorized"
+    assert estimator.plan_backend(20, circ.circuit, backends=["statevector", "inplace"])["backend"] == "inplace"
+
+def test_admission_rejects_before_allocating():
+    columns = [column_dict(0, "H")] + [column_dict(qubit, "X", [qubit - 1]) for qubit in range(1, 60)]
+    with pytest.raises(estimator.AdmissionError) as error:
+        estimator.admit_circuit({"nb_qubit": 60, "circuit": columns}, dense_output=True, memory_limit=2 ** 30)
+    assert "60 qubits" in str(error.value)
+    assert len(error.value.estimates) == 4
+
+def test_admitted_circuit_is_equivalent():
+    columns = [column_dict(0, "H"), column_dict(2, "X", [0]), column_dict(1, "Y")]
+    circ, estimate = estimator.admit_circuit({"nb_qubit": 3, "circuit": columns}, memory_limit=2 ** 20, time_limit=1)
+    assert circ.backend == estimate["backend"]
+    reference = circuit.Circuit.dict_to_circuit({"nb_qubit": 3, "circuit": columns})
+    circ.launch_circuit()
+    reference.launch_circuit()
+    assert np.allclose(np.abs(circ.get_system_matrix()), np.abs(reference.get_system_matrix()))
+
+def test_wide_empty_circuit_is_admitted():
+    circ, estimate = estimator.admit_circuit({"nb_qubit": 64, "circuit": []}, memory_limit=2 ** 20)
+    assert circ.get_qubit_amount() == 64
+    assert estimate["backend"] in ["factorized", "mps"]
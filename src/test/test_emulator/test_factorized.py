@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+
+from context import circuit
+
+def test_factorized_matches_single_statevector():
+    """
+    The factorized backend gives the same final state as a single statevector, whatever the qubit order of the components.
+    """
+    circuits = []
+    for backend in ["inplace", "factorized"]:
+        circ = circuit.Circuit(5, backend)
+        circ.set_gate("H", 4).set_gate("X", 1, ctrl=[4]).set_gate("H", 0).set_gate("Y", 3)
+        circ.set_gate("Z", 2, ctrl=[0]).set_gate("H", 2).set_gate("X", 4, ctrl=[2, 1])
+        circ.launch_circuit()
+        circuits.append(circ)
+    assert np.allclose(circuits[0].get_system_matrix(), circuits[1].get_system_matrix())
+
+def test_factorized_components():
+    """
+    Qubits stay in separate components until a controlled gate links them.
+    """
+    circ = circuit.Circuit(4, "factorized")
+    circ.set_gate("H", 0).set_gate("X", 1, ctrl=[0]).set_gate("H", 3)
+    circ.launch_circuit()
+    assert sorted(circ.factorized.get_component_sizes()) == [1, 1, 2]
+    circ.set_gate("X", 2, ctrl=[3, 1])
+    circ.launch_circuit()
+    assert circ.factorized.get_component_sizes() == [4]
+
+def test_factorized_independent_halves():
+    """
+    Two independent 15 qubit GHZ states are simulated as two 2^15 statevectors.
+    """
+    circ = circuit.Circuit(30, "factorized")
+    for start in [0, 15]:
+        circ.set_gate("H", start)
+        for i in range(start + 1, start + 15):
+            circ.set_gate("X", i, ctrl=[i - 1])
+    circ.launch_circuit()
+    assert circ.factorized.get_component_sizes() == [15, 15]
+    assert circ.get_marginal([14, 15]) == pytest.approx([0.25, 0.25, 0.25, 0.25])
+    assert circ.measure(29)["proba"]["p1"] == pytest.approx(0.5)
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+from context import logger
+
+repository = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+
+def run_import(tmp_path, statement):
+    environment = dict(os.environ, PYTHONPATH=repository)
+    environment.pop("SIMPLEQ_LOG_LEVEL", None)
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=tmp_path, env=environment,
+                          capture_output=True, text=True, check=True)
+
+def get_import_time(stderr, module):
+    """
+    Cumulative import time of `module` in microseconds, from the -X importtime report.
+    """
+    for line in stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise KeyError(module)
+
+def test_import_has_no_side_effects(tmp_path):
+    result = run_import(tmp_path, "import sys; import src.QLibrary.SimpleQ.circuit; print(sorted(set(sys.modules) & {'tkinter', 'watchdog', 'multiprocessing'}))")
+    assert result.stdout.strip() == "[]"
+    assert not (tmp_path / "bin").exists()
+
+def test_import_time(tmp_path):
+    result = run_import(tmp_path, "import src.QLibrary.SimpleQ.circuit")
+    # numpy is most of it, the emulator itself must stay far below a second
+    assert get_import_time(result.stderr, "src.QLibrary.SimpleQ.circuit") < 1_000_000
+
+def test_log_file_created_on_first_message(tmp_path, monkeypatch):
+    monkeypatch.setattr(logger, "log_directory", str(tmp_path / "bin") + "/")
+    log = logger.Logger(level="INFO")
+    assert not (tmp_path / "bin").exists()
+    log.log("dropped", logger.LogLevel.DEBUG)
+    assert log.filename is None
+    log.log("kept", logger.LogLevel.WARNING)
+    with open(log.filename) as log_file:
+        content = log_file.read()
+    assert "kept" in content and "dropped" not in content
+    log.file.close()
+
+def test_disabled_logger():
+    log = logger.Logger(level="OFF")
+    log.log("message", logger.LogLevel.CRITICAL)
+    assert log.filename is None
+    assert not log.is_enabled(logger.LogLevel.CRITICAL)
@@ -0,0 +1,66 @@
+import pytest
+import numpy as np
+
+from context import circuit, ingest
+
+def build_data():
+    return {
+        "nb_qubit": 3,
+        "circuit": [
+            {"qubit_index": 0, "qubit_information": {"gate_name": "H", "ctrl_qubits_indexes": []}},
+            {"qubit_index": "2", "qubit_information": {"gate_name": "X", "ctrl_qubits_indexes": [0, 1]}},
+            {"qubit_index": 2, "qubit_information": {"gate_name": "M", "ctrl_qubits_indexes": []}},
+            {"qubit_index": 1, "qubit_information": {"gate_name": "Z", "ctrl_qubits_indexes": []}, "condition": [2, 1]}
+        ]
+    }
+
+def test_ingest_columns():
+    qubit_amount, columns = ingest.ingest_columns(build_data())
+    assert qubit_amount == 3
+    assert columns.opcodes[:len(columns)].tolist() == [3, 0, 4, 2]
+    assert columns.targets[:len(columns)].tolist() == [0, 2, 2, 1]
+    assert columns.controls[:len(columns), 0].tolist() == [0, 0b11, 0, 0]
+    assert columns.condition_values[:len(columns)].tolist() == [-1, -1, -1, 1]
+
+def test_wide_circuit_round_trip():
+    circ = circuit.Circuit(80, "mps")
+    circ.set_gate("H", 0).set_gate("X", 79, ctrl=[0, 70]).set_measure(79).set_gate("Z", 65, condition=(79, 1))
+    restored = circuit.Circuit.dict_to_circuit(circ.circuit_to_json(), "mps")
+    assert restored.get_qubit_amount() == 80
+    assert restored.circuit_to_json() == circ.circuit_to_json()
+    with pytest.raises(ValueError, match="binary format"):
+        restored.circuit_to_binary()
+
+def test_errors_name_the_json_format():
+    data = build_data()
+    data["circuit"].append({"qubit_index": 0, "qubit_information": {"gate_name": "H", "ctrl_qubits_indexes": [0]}})
+    with pytest.raises(ValueError, match="^Invalid circuit: invalid control qubits"):
+        ingest.ingest_columns(data)
+
+def test_dict_to_circuit_matches_json_export():
+    circ = circuit.Circuit.dict_to_circuit(build_data())
+    expected = circuit.Circuit(3)
+    expected.set_gate("H", 0).set_gate("X", 2, ctrl=[0, 1]).set_measure(2).set_gate("Z", 1, condition=(2, 1))
+    assert circ.circuit_to_json() == expected.circuit_to_json()
+
+def test_gate_matrices_are_shared():
+    circ = circuit.Circuit.dict_to_circuit(build_data())
+    other = circuit.Circuit(1).set_gate("H", 0)
+    assert circ.circuit[0].get_gate().get_gate() is other.circuit[0].get_gate().get_gate()
+    with pytest.raises(ValueError):
+        circ.circuit[0].get_gate().get_gate()[0, 0] = 0
+
+@pytest.mark.parametrize("column", [
+    {"qubit_index": 3, "qubit_information": {"gate_name": "H", "ctrl_qubits_indexes": []}},
+    {"qubit_index": -1, "qubit_information": {"gate_name": "H", "ctrl_qubits_indexes": []}},
+    {"qubit_index": 0, "qubit_information": {"gate_name": "H", "ctrl_qubits_indexes": [5]}},
+    {"qubit_index": 0, "qubit_information": {"gate_name": "H", "ctrl_qubits_indexes": [0]}},
+    {"qubit_index": 0, "qubit_information": {"gate_name": "T", "ctrl_qubits_indexes": []}},
+    {"qubit_index": 0, "qubit_information": {"gate_name": "H", "ctrl_qubits_indexes": []}, "condition": [1, 2]},
+    {"qubit_index": 0}
+])
+def test_invalid_columns(column):
+    data = build_data()
+    data["circuit"].append(column)
+    with pytest.raises(ValueError):
+        ingest.ingest_columns(data)
@@ -0,0 +1,70 @@
+import tracemalloc
+
+import pytest
+import numpy as np
+
+from context import circuit
+
+def build_circuit(backend, qubit_amount=4):
+    """
+    Builds a circuit using every kernel (diagonal, antidiagonal, dense, with and without controls).
+    """
+    circ = circuit.Circuit(qubit_amount, backend)
+    circ.set_gate("H", 0).set_gate("X", 1).set_gate("X", 2, ctrl=[0]).set_gate("Z", 0)
+    circ.set_gate("H", 3, ctrl=[1]).set_gate("X", 0, ctrl=[1, 3]).set_gate("Y", 1).set_gate("H", 2)
+    return circ
+
+def test_inplace_matches_statevector():
+    """
+    The in-place backend gives the same final state as the dense backend.
+    """
+    dense = build_circuit("statevector")
+    inplace = build_circuit("inplace")
+    dense.launch_circuit()
+    inplace.launch_circuit()
+    assert np.allclose(dense.get_system_matrix(), inplace.get_system_matrix())
+
+def test_inplace_gate_on_every_qubit():
+    """
+    Fully controlled gates only leave size 1 axes in the updated views.
+    Prepared state : |11>
+    Desired output state : |10>
+    """
+    circ = circuit.Circuit(2, "inplace")
+    circ.set_gate("X", 0).set_gate("X", 1).set_gate("X", 1, ctrl=[0])
+    circ.launch_circuit()
+    cmp = circ.get_system_matrix() == [0, 0, 1, 0]
+    assert cmp.all()
+
+def test_inplace_allocation_count():
+    """
+    Running the circuit never allocates more than the two preallocated buffers.
+    The only temporaries left are numpy's fixed-size iteration buffers, which do not grow with the register.
+    """
+    peaks = []
+    for qubit_amount in [16, 18]:
+        circ = build_circuit("inplace", qubit_amount)
+        for i in range(qubit_amount):
+            circ.set_gate("H", i).set_gate("X", (i + 1) % qubit_amount, ctrl=[i])
+
+        tracemalloc.start()
+        circ.launch_circuit()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert circ.buffer.get_allocation_count() == 2
+        peaks.append(peak)
+    assert peaks[1] < circ.get_system_matrix().nbytes / 2
+    assert peaks[1] == pytest.approx(peaks[0], rel=0.1)
+
+def test_inplace_measure_updates_buffer():
+    """
+    Collapsing the state after a measurement keeps the buffer and the system matrix in sync.
+    """
+    circ = circuit.Circuit(2, "inplace")
+    circ.set_gate("H", 0).set_gate("X", 1, ctrl=[0])
+    circ.launch_circuit()
+    result = circ.measure(0, shots=10, simulation=True)
+    assert circ.get_system_matrix() is circ.buffer.get_state()
+    outcome = result["simulation"]["measurement"]
+    assert circ.measure(1)["proba"]["p" + str(outcome)] == pytest.approx(1)
@@ -0,0 +1,55 @@
+import pytest
+import numpy as np
+
+from context import circuit
+
+def build_circuit(backend="inplace"):
+    """
+    Qubits 0-1 form a Bell pair, qubit 2 controls qubit 3, qubit 4 is measured and conditions qubit 0.
+    """
+    circ = circuit.Circuit(6, backend)
+    circ.set_gate("H", 2).set_gate("X", 3, ctrl=[2]).set_gate("H", 5)
+    circ.set_gate("H", 0).set_gate("X", 1, ctrl=[0]).set_gate("Y", 3)
+    circ.set_gate("X", 4).set_measure(4).set_gate("Z", 0, condition=(4, 1)).set_gate("H", 0)
+    return circ
+
+def test_light_cone_statistics():
+    circ = build_circuit()
+    reduced, statistics = circ.light_cone([1])
+    # Only H(0), CX(0 -> 1) can influence qubit 1
+    assert statistics["columns_removed"] == 8
+    assert statistics["qubits_removed"] == 4
+    assert statistics["qubit_map"] == {0: 0, 1: 1}
+    assert len(reduced.get_quantum_register()) == 2
+
+def test_light_cone_condition_is_kept():
+    """
+    A classically conditioned gate brings the measured qubit into the light cone.
+    """
+    circ = build_circuit()
+    reduced, statistics = circ.light_cone([0])
+    assert statistics["qubit_map"] == {0: 0, 1: 1, 4: 2}
+    assert [column.get_gate().get_name() for column in reduced.circuit] == ["H", "X", "X", "M", "Z", "H"]
+    assert reduced.circuit[4].get_condition() == (2, 1)
+
+@pytest.mark.parametrize("qubits", [[1], [3], [0, 3], [5, 2]])
+def test_light_cone_same_marginals(qubits):
+    """
+    The pruned circuit gives the same outcome probabilities as the full one.
+    """
+    circ = build_circuit()
+    circ.launch_circuit()
+    expected = circ.get_marginal(qubits)
+
+    reduced, statistics = circ.light_cone(qubits)
+    reduced.launch_circuit()
+    assert reduced.get_marginal([statistics["qubit_map"][qubit] for qubit in qubits]) == pytest.approx(expected)
+
+def test_measure_light_cone():
+    circ = build_circuit("statevector")
+    results = circ.measure_light_cone([3], shots=20, simulation=True)
+    assert results["pruning"]["qubits_removed"] == 4
+    assert results["results"][3]["proba"]["p1"] == pytest.approx(0.5)
+    assert circ.get_classical_register()[3] is results["results"][3]
+    cmp = circ.get_system_matrix() == np.eye(1, 2 ** 6)[0]
+    assert cmp.all()
@@ -0,0 +1,72 @@
+import pytest
+import numpy as np
+
+from context import circuit
+
+def bell_circuit(backend="statevector"):
+    """
+    Prepared state : 1/sqrt(2) (|000> + |110>)
+    """
+    circ = circuit.Circuit(3, backend)
+    circ.set_gate("H", 0).set_gate("X", 1, ctrl=[0])
+    circ.launch_circuit()
+    return circ
+
+def test_marginal_single_qubit():
+    circ = bell_circuit()
+    marginal = circ.get_marginal([1])
+    assert marginal == pytest.approx([0.5, 0.5])
+    assert circ.get_marginal([2]) == pytest.approx([1, 0])
+
+def test_marginal_qubit_order():
+    """
+    Prepared state : |10>, the first requested qubit is the most significant bit.
+    """
+    circ = circuit.Circuit(2)
+    circ.set_gate("X", 0)
+    circ.launch_circuit()
+    assert circ.get_marginal([0, 1]) == pytest.approx([0, 0, 1, 0])
+    assert circ.get_marginal([1, 0]) == pytest.approx([0, 1, 0, 0])
+
+def test_joint_distribution():
+    """
+    Entangled qubits are only ever observed with the same value.
+    """
+    circ = bell_circuit()
+    histogram = circ.get_joint_distribution([0, 1], shots=500)
+    assert set(histogram.keys()) <= {"00", "11"}
+    assert sum(histogram.values()) == 500
+    assert set(circ.get_joint_distribution(shots=10).keys()) <= {"000", "110"}
+
+@pytest.mark.parametrize("backend", ["statevector", "inplace", "factorized", "mps"])
+def test_deferred_measure_all(backend):
+    """
+    Deferred measurements are only resolved once, jointly, and collapse the state once.
+    """
+    circ = bell_circuit(backend)
+    assert circ.measure_all(shots=200, simulation=True, deferred=True) is None
+    assert circ.get_classical_register() == [None, None, None]
+
+    results = circ.resolve_measurements()
+    assert results["qubits"] == [0, 1, 2]
+    assert results["proba"] == {"000": pytest.approx(0.5), "110": pytest.approx(0.5)}
+    assert sum(results["simulation"]["distribution"].values()) == 200
+
+    register = circ.get_classical_register()
+    assert register[0]["simulation"]["measurement"] == register[1]["simulation"]["measurement"]
+    assert register[0]["proba"]["p1"] == pytest.approx(0.5)
+    assert register[0]["simulation"]["distribution"] == register[1]["simulation"]["distribution"]
+    assert register[2]["simulation"]["distribution"] == {"0": 200, "1": 0}
+
+    # The state collapsed on the measured outcome
+    outcome = results["simulation"]["measurement"]
+    assert circ.get_marginal([0, 1, 2])[int(outcome, 2)] == pytest.approx(1)
+    assert circ.resolve_measurements() is None
+
+def test_deferred_measure_without_simulation():
+    circ = bell_circuit()
+    circ.measure(1, deferred=True)
+    results = circ.resolve_measurements()
+    assert results["simulation"] is None
+    assert circ.get_classical_register()[1]["proba"]["p0"] == pytest.approx(0.5)
+    assert np.linalg.norm(circ.get_system_matrix()) == pytest.approx(1)
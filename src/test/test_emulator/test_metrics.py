@@ -0,0 +1,67 @@
+import pytest
+
+from context import circuit, checkpoint, metrics
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.registry.reset()
+    yield
+    metrics.registry.reset()
+
+def test_histogram_buckets_are_cumulative():
+    registry = metrics.MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "test", ("route",), buckets=(0.1, 1))
+    for value in [0.05, 0.5, 0.5, 2]:
+        histogram.observe(value, ("/a",))
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/a"} 4' in text
+    assert "# TYPE latency_seconds histogram" in text
+
+def test_counter_and_gauge():
+    registry = metrics.MetricsRegistry()
+    counter = registry.counter("events_total", "test", ("kind",))
+    gauge = registry.gauge("peak", "test")
+    counter.inc(2, ('a"b',))
+    gauge.set_max(3)
+    gauge.set_max(1)
+    text = registry.render()
+    assert 'events_total{kind="a\\"b"} 2' in text
+    assert "peak 3" in text
+    with pytest.raises(ValueError):
+        registry.counter("events_total", "test")
+
+def test_launch_circuit_updates_metrics():
+    circ = circuit.Circuit(3)
+    circ.set_gate("H", 0).set_gate("X", 1, [0])
+    circ.launch_circuit()
+    circ.measure(0)
+    circ.measure(1, deferred=True)
+    assert metrics.columns_executed.get(("statevector",)) == 2
+    assert metrics.measurements.get(("statevector",)) == 1
+    assert metrics.circuit_qubits.get() == 1
+    assert metrics.state_peak_bytes.get(("statevector",)) == 8 * 16
+    assert metrics.phase_seconds.get(("gate_application",)) == 1
+    assert metrics.phase_seconds.get(("measurement",)) == 2
+
+def test_parse_and_serialization_phases():
+    circ = circuit.Circuit(2)
+    circ.set_gate("H", 0)
+    circuit.Circuit.binary_to_circuit(circ.circuit_to_binary())
+    assert metrics.phase_seconds.get(("serialization",)) == 1
+    assert metrics.phase_seconds.get(("parse",)) == 1
+
+def test_checkpoint_hits():
+    cache = checkpoint.CheckpointCache(interval=1)
+    for _ in range(2):
+        circ = circuit.Circuit(2)
+        circ.set_gate("H", 0)
+        cache.simulate(1, circ)
+    assert metrics.checkpoint_requests.get(("miss",)) == 1
+    assert metrics.checkpoint_requests.get(("hit",)) == 1
+
+def test_unknown_phase():
+    with pytest.raises(NameError):
+        metrics.timed_phase("compilation")
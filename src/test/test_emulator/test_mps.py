@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+
+from context import circuit
+
+def build_circuits(backend, **options):
+    """
+    Builds the same small circuits on the given backend.
+    """
+    bell = circuit.Circuit(2, backend, **options)
+    bell.set_gate("H", 0).set_gate("X", 1, ctrl=[0])
+
+    toffoli = circuit.Circuit(4, backend, **options)
+    toffoli.set_gate("X", 0).set_gate("H", 3).set_gate("X", 1, ctrl=[0, 3]).set_gate("Z", 2, ctrl=[3])
+
+    far_control = circuit.Circuit(4, backend, **options)
+    far_control.set_gate("H", 3).set_gate("X", 0, ctrl=[3]).set_gate("Z", 1).set_gate("H", 1, ctrl=[0])
+    return [bell, toffoli, far_control]
+
+def test_mps_matches_statevector():
+    """
+    The MPS backend gives the same final state as the dense backend.
+    """
+    for dense, mps in zip(build_circuits("statevector"), build_circuits("mps")):
+        dense.launch_circuit()
+        mps.launch_circuit()
+        assert np.allclose(dense.get_system_matrix(), mps.get_system_matrix())
+        assert mps.get_truncation_error() == pytest.approx(0)
+
+def test_mps_measure_structure():
+    """
+    Measuring on the MPS backend returns the same structure as the dense backend.
+    """
+    dense, mps = build_circuits("statevector")[0], build_circuits("mps")[0]
+    dense.launch_circuit()
+    mps.launch_circuit()
+    expected = dense.measure(0)
+    result = mps.measure(0)
+    assert result.keys() == expected.keys()
+    assert result["proba"]["p0"] == pytest.approx(expected["proba"]["p0"])
+    assert result["proba"]["p1"] == pytest.approx(expected["proba"]["p1"])
+
+def test_mps_measure_collapse():
+    """
+    Measuring one qubit of a Bell pair collapses the other one.
+    """
+    circ = build_circuits("mps")[0]
+    circ.launch_circuit()
+    result = circ.measure(0, shots=10, simulation=True)
+    assert sum(result["simulation"]["distribution"].values()) == 10
+    other = circ.measure(1)
+    outcome = result["simulation"]["measurement"]
+    assert other["proba"]["p" + str(outcome)] == pytest.approx(1)
+    assert circ.get_classical_register()[0] == result
+
+def test_mps_bond_dimension_cap():
+    """
+    Capping the bond dimension truncates entanglement and reports the discarded weight.
+    Prepared state : 1/sqrt(2) (|000> + |111>)
+    """
+    circ = circuit.Circuit(3, "mps", max_bond_dimension=1)
+    circ.set_gate("H", 0).set_gate("X", 1, ctrl=[0]).set_gate("X", 2, ctrl=[1])
+    circ.launch_circuit()
+    assert max(circ.mps.get_bond_dimensions()) == 1
+    assert circ.get_truncation_error() == pytest.approx(0.5)
+    assert np.linalg.norm(circ.get_system_matrix()) == pytest.approx(1)
+
+def test_mps_wide_linear_chain():
+    """
+    A 80 qubit GHZ chain stays at bond dimension 2.
+    """
+    circ = circuit.Circuit(80, "mps")
+    circ.set_gate("H", 0)
+    for i in range(1, 80):
+        circ.set_gate("X", i, ctrl=[i - 1])
+    circ.launch_circuit()
+    assert max(circ.mps.get_bond_dimensions()) == 2
+    assert circ.measure(79)["proba"]["p1"] == pytest.approx(0.5)
+
+def test_unknown_backend():
+    with pytest.raises(NameError):
+        circuit.Circuit(2, "unknown")
@@ -0,0 +1,60 @@
+from functools import reduce
+
+import numpy as np
+import pytest
+
+from context import circuit, observables
+
+paulis = {
+    "I": np.identity(2),
+    "X": np.array([[0, 1], [1, 0]]),
+    "Y": np.array([[0, -1j], [1j, 0]]),
+    "Z": np.array([[1, 0], [0, -1]])
+}
+
+def reference_expectation(state_vector, pauli_string):
+    operator = reduce(np.kron, [paulis[pauli] for pauli in pauli_string])
+    return np.real(np.conj(state_vector) @ operator @ state_vector)
+
+def random_state(qubit_amount, seed=0):
+    generator = np.random.default_rng(seed)
+    state_vector = generator.normal(size=2 ** qubit_amount) + 1j * generator.normal(size=2 ** qubit_amount)
+    return state_vector / np.linalg.norm(state_vector)
+
+def all_pauli_strings(qubit_amount):
+    strings = [""]
+    for _ in range(qubit_amount):
+        strings = [string + pauli for string in strings for pauli in "IXYZ"]
+    return strings
+
+def test_masks():
+    assert observables.get_pauli_masks("XYZI", 4) == (0b1100, 0b0110, 1)
+    with pytest.raises(ValueError):
+        observables.get_pauli_masks("XY", 3)
+    with pytest.raises(ValueError):
+        observables.get_pauli_masks("XA", 2)
+
+def test_every_pauli_string_matches_dense_operators():
+    state_vector = random_state(3)
+    strings = all_pauli_strings(3)
+    values = observables.get_pauli_expectations(state_vector, strings)
+    assert np.allclose(values, [reference_expectation(state_vector, string) for string in strings])
+
+def test_large_group_uses_walsh_hadamard():
+    state_vector = random_state(4, seed=1)
+    strings = ["X" + "".join(z) for z in all_pauli_strings(3) if set(z) <= {"I", "Z"}]
+    assert len(strings) > 4
+    values = observables.get_pauli_expectations(state_vector, strings)
+    assert np.allclose(values, [reference_expectation(state_vector, string) for string in strings])
+    assert np.allclose(observables.walsh_hadamard(np.arange(4.), 2), [6, -2, -4, 0])
+
+@pytest.mark.parametrize("backend", ["statevector", "inplace", "factorized", "mps"])
+def test_circuit_expectation(backend):
+    circ = circuit.Circuit(3, backend)
+    circ.set_gate("H", 0).set_gate("X", 1, [0]).set_gate("X", 2)
+    circ.launch_circuit()
+    hamiltonian = {"ZZI": 1.0, "XXI": 0.5, "YYI": -2.0, "IIZ": 0.25, "ZII": 3.0}
+    # Bell pair on qubits 0, 1 and |1> on qubit 2: <ZZ> = <XX> = 1, <YY> = -1, <Z2> = -1, <Z0> = 0
+    assert circ.get_expectation(hamiltonian) == pytest.approx(1.0 + 0.5 + 2.0 - 0.25)
+    assert circ.get_expectation([(1.0, "ZZI"), (1.0, "zzi")]) == pytest.approx(2.0)
+    assert np.allclose(circ.get_pauli_expectations(["ZII", "IZI", "XXI"]), [0, 0, 1])
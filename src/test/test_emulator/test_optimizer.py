@@ -0,0 +1,73 @@
+import pytest
+import numpy as np
+
+from context import circuit
+
+def gate_names(circ):
+    return [(column.get_gate().get_name(), column.get_index(), column.get_gate().get_ctrl()) for column in circ.circuit]
+
+def test_adjacent_pairs_cancel():
+    circ = circuit.Circuit(2)
+    circ.set_gate("H", 0).set_gate("H", 0).set_gate("X", 1).set_gate("X", 1).set_gate("Z", 0).set_gate("Z", 0)
+    statistics = circ.optimize()
+    assert circ.circuit == []
+    assert statistics["cancelled_pairs"] == 3
+    assert statistics["columns_before"] == 6
+    assert statistics["columns_after"] == 0
+
+def test_nested_pairs_cancel():
+    """
+    H X X H : once X X is removed, H H becomes adjacent.
+    """
+    circ = circuit.Circuit(1)
+    circ.set_gate("H", 0).set_gate("X", 0).set_gate("X", 0).set_gate("H", 0)
+    circ.optimize()
+    assert circ.circuit == []
+
+def test_controlled_pairs_cancel():
+    """
+    Controls are compared as sets, and disjoint gates in between are skipped.
+    """
+    circ = circuit.Circuit(4)
+    circ.set_gate("X", 2, ctrl=[0, 1]).set_gate("H", 3).set_gate("X", 2, ctrl=[1, 0])
+    circ.optimize()
+    assert gate_names(circ) == [("H", 3, [])]
+
+def test_diagonal_gate_commutes_past_control():
+    """
+    Z on a control wire commutes with the controlled gate, which exposes the Z Z pair.
+    """
+    circ = circuit.Circuit(2)
+    circ.set_gate("Z", 0).set_gate("X", 1, ctrl=[0]).set_gate("Z", 0)
+    statistics = circ.optimize()
+    assert gate_names(circ) == [("X", 1, [0])]
+    assert statistics["commutations"] == 1
+
+def test_no_illegal_cancellation():
+    """
+    X does not commute with a control, H does not commute with anything sharing its wire,
+    and measurements are barriers.
+    """
+    circ = circuit.Circuit(2)
+    circ.set_gate("X", 0).set_gate("X", 1, ctrl=[0]).set_gate("X", 0)
+    circ.set_gate("H", 1).set_gate("Z", 1).set_gate("H", 1)
+    circ.set_gate("Y", 0).set_measure(0).set_gate("Y", 0)
+    statistics = circ.optimize()
+    assert len(circ.circuit) == 9
+    assert statistics["cancelled_pairs"] == 0
+
+def test_optimized_circuit_same_state():
+    """
+    The optimized circuit prepares the same state.
+    """
+    circuits = []
+    for optimize in [False, True]:
+        circ = circuit.Circuit(3, "inplace")
+        circ.set_gate("H", 0).set_gate("Z", 1).set_gate("X", 2, ctrl=[0, 1]).set_gate("Z", 1).set_gate("Y", 2)
+        circ.set_gate("Z", 0, ctrl=[2]).set_gate("X", 2, ctrl=[1, 0]).set_gate("Z", 0).set_gate("Z", 0, ctrl=[2])
+        if optimize:
+            circ.optimize()
+        circ.launch_circuit()
+        circuits.append(circ)
+    assert len(circuits[1].circuit) < len(circuits[0].circuit)
+    assert np.allclose(circuits[0].get_system_matrix(), circuits[1].get_system_matrix())
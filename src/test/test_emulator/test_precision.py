@@ -0,0 +1,56 @@
+import pytest
+import numpy as np
+
+from context import circuit
+
+def build_circuit(backend, precision, qubit_amount=5):
+    """
+    Builds a circuit mixing every gate, with and without controls.
+    """
+    circ = circuit.Circuit(qubit_amount, backend, precision=precision)
+    for i in range(qubit_amount):
+        circ.set_gate("H", i)
+    for i in range(qubit_amount - 1):
+        circ.set_gate("Y", i + 1, ctrl=[i]).set_gate("Z", i).set_gate("H", i, ctrl=[i + 1]).set_gate("X", i)
+    return circ
+
+@pytest.mark.parametrize("backend", ["statevector", "inplace", "factorized", "mps"])
+def test_complex64_keeps_dtype(backend):
+    """
+    A complex64 circuit never upcasts its state, on every backend.
+    """
+    circ = build_circuit(backend, "complex64")
+    circ.launch_circuit()
+    assert circ.get_system_matrix().dtype == np.complex64
+    assert all(column.get_gate().get_gate().dtype == np.complex64 for column in circ.circuit)
+
+@pytest.mark.parametrize("backend", ["statevector", "inplace", "factorized", "mps"])
+def test_complex64_error_against_complex128(backend):
+    """
+    Single precision stays close to double precision.
+    """
+    single = build_circuit(backend, "complex64")
+    double = build_circuit(backend, "complex128")
+    single.launch_circuit()
+    double.launch_circuit()
+    assert double.get_system_matrix().dtype == np.complex128
+    assert np.max(np.abs(single.get_system_matrix() - double.get_system_matrix())) < 1e-5
+
+def test_complex64_measure():
+    """
+    Single precision probabilities can be sampled and collapse the state without upcasting it.
+    """
+    circ = build_circuit("statevector", "complex64")
+    circ.launch_circuit()
+    result = circ.measure(2, shots=100, simulation=True)
+    assert result["proba"]["p0"] + result["proba"]["p1"] == pytest.approx(1, abs=1e-6)
+    assert sum(result["simulation"]["distribution"].values()) == 100
+    assert circ.get_system_matrix().dtype == np.complex64
+
+def test_initial_state_is_complex():
+    circ = circuit.Circuit(3)
+    assert circ.get_system_matrix().dtype == np.complex128
+
+def test_unsupported_precision():
+    with pytest.raises(ValueError):
+        circuit.Circuit(2, precision="float32")
@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+
+from context import circuit, profiler
+
+def build_circuit(backend="statevector"):
+    circ = circuit.Circuit(3, backend)
+    circ.set_gate("H", 0).set_gate("X", 2, [0]).set_gate("X", 1, [0]).set_measure(1).set_gate("Z", 2, condition=(1, 1))
+    return circ
+
+def test_profile_records_every_column():
+    circ = build_circuit()
+    circ.launch_circuit(profile=True)
+    events = circ.profiler.events
+    assert [event["position"] for event in events] == [0, 1, 2, 3, 4]
+    assert [event["label"] for event in events] == ["H", "CX", "CX", "M", "Z"]
+    assert [event["kernel"] for event in events][:4] == ["dense", "swap", "controlled", "measurement"]
+    assert events[1]["swaps"] == len(circ.circuit[1].get_swaps()) > 0
+    assert events[2]["swaps"] == 0
+    assert all(event["duration"] >= 0 and event["allocated_bytes"] >= 0 for event in events)
+
+def test_profile_does_not_change_the_result():
+    reference, profiled = circuit.Circuit(3), circuit.Circuit(3)
+    for circ in [reference, profiled]:
+        circ.set_gate("H", 0).set_gate("X", 2, [0]).set_gate("Y", 1)
+    reference.launch_circuit()
+    profiled.launch_circuit(profile=True, trace_memory=False)
+    assert np.allclose(reference.get_system_matrix(), profiled.get_system_matrix())
+    assert all(event["allocated_bytes"] is None for event in profiled.profiler.events)
+
+def test_skipped_and_specialised_kernels():
+    circ = circuit.Circuit(2, "inplace")
+    circ.set_gate("X", 1, [0]).set_gate("H", 0, condition=(1, 1))
+    circ.launch_circuit(profile=True)
+    assert [event["kernel"] for event in circ.profiler.events] == ["specialised", "skipped"]
+
+def test_fused_moments_profile():
+    circ = circuit.Circuit(3)
+    circ.set_gate("H", 0).set_gate("H", 1).set_gate("X", 2, [0])
+    circ.launch_circuit(fuse_moments=True, profile=True)
+    assert [(event["position"], event["kernel"], event["label"]) for event in circ.profiler.events] == [(0, "fused", "H+H"), (1, "fused", "CX")]
+
+def test_chrome_trace_and_summary(tmp_path):
+    circ = build_circuit()
+    circ.launch_circuit(profile=True)
+    path = tmp_path / "trace.json"
+    circ.profiler.export_chrome_trace(str(path))
+    trace = json.loads(path.read_text())
+    assert len(trace["traceEvents"]) == 5
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in trace["traceEvents"])
+    summary = circ.profiler.get_summary()
+    assert sum(row["count"] for row in summary) == 5
+    assert {(row["label"], row["kernel"]) for row in summary} >= {("CX", "swap"), ("CX", "controlled")}
+    table = circ.profiler.format_summary(top=2)
+    assert len(table.splitlines()) == 3 and table.startswith("gate")
@@ -0,0 +1,90 @@
+import pytest
+import numpy as np
+
+from context import circuit
+
+backends = ["statevector", "inplace", "factorized", "mps"]
+
+def build_circuit(backend, qubit_amount, gates):
+    circ = circuit.Circuit(qubit_amount, backend)
+    for gate_name, index, ctrl in gates:
+        circ.set_gate(gate_name, index, ctrl)
+    return circ
+
+gates = [("H", 0, []), ("X", 2, [0]), ("Y", 1, []), ("H", 2, []), ("Z", 0, [2])]
+
+@pytest.mark.parametrize("backend", backends)
+@pytest.mark.parametrize("index", [0, 1, 3])
+def test_add_qubit_keeps_state(backend, index):
+    circ = build_circuit(backend, 3, gates)
+    circ.launch_circuit()
+    circ.add_qubit(index)
+    shifted = [(name, target + (target >= index), [control + (control >= index) for control in ctrl]) for name, target, ctrl in gates]
+    reference = build_circuit("inplace", 4, shifted)
+    reference.launch_circuit()
+    assert circ.get_qubit_amount() == 4
+    assert len(circ.get_classical_register()) == 4
+    assert np.allclose(circ.get_system_matrix(), reference.get_system_matrix())
+    assert circ.circuit == reference.circuit
+
+@pytest.mark.parametrize("backend", backends)
+def test_add_qubit_then_run_new_gate(backend):
+    circ = build_circuit(backend, 2, [("H", 0, [])])
+    circ.launch_circuit()
+    circ.add_qubit()
+    circ.execute_column(circuit.Column(2, "X", [0]))
+    assert np.allclose(circ.get_system_matrix(), [1 / np.sqrt(2), 0, 0, 0, 0, 1 / np.sqrt(2), 0, 0])
+
+@pytest.mark.parametrize("backend", backends)
+def test_delete_product_qubit(backend):
+    """
+    Qubit 1 is in |1> and never interacts: removing it leaves the state of the other qubits unchanged.
+    """
+    circ = build_circuit(backend, 3, [("H", 0, []), ("X", 1, []), ("X", 2, [0])])
+    circ.launch_circuit()
+    assert circ.delete_qubit(1) == 1
+    reference = build_circuit("inplace", 2, [("H", 0, []), ("X", 1, [0])])
+    reference.launch_circuit()
+    assert np.allclose(circ.get_system_matrix(), reference.get_system_matrix())
+    assert circ.circuit == reference.circuit
+
+@pytest.mark.parametrize("backend", backends)
+@pytest.mark.parametrize("index", [0, 1])
+def test_delete_entangled_qubit_projects(backend, index):
+    circ = build_circuit(backend, 3, [("H", 0, []), ("X", 1, [0]), ("H", 2, [])])
+    circ.launch_circuit()
+    circ.delete_qubit(index, outcome=1)
+    assert np.allclose(circ.get_system_matrix(), [0, 0, 1 / np.sqrt(2), 1 / np.sqrt(2)])
+    # The CX targeting qubit 1 is removed with it, the CX controlled by qubit 0 in |1> becomes an X
+    expected = [("H", 0, []), ("H", 1, [])] if index == 1 else [("X", 0, []), ("H", 1, [])]
+    assert [(column.get_gate().get_name(), column.get_index(), column.get_gate().get_ctrl()) for column in circ.circuit] == expected
+    if index == 0:
+        # Qubit 0 was only a control: the remaining columns reproduce the state
+        rerun = build_circuit("inplace", 2, expected)
+        rerun.launch_circuit()
+        assert np.allclose(circ.get_system_matrix(), rerun.get_system_matrix())
+
+@pytest.mark.parametrize("backend", backends)
+def test_delete_control_projected_on_zero(backend):
+    circ = build_circuit(backend, 3, [("H", 0, []), ("X", 1, [0]), ("X", 2, [0, 1]), ("H", 2, [])])
+    circ.launch_circuit()
+    circ.delete_qubit(0, outcome=0)
+    assert [(column.get_gate().get_name(), column.get_index(), column.get_gate().get_ctrl()) for column in circ.circuit] == [("H", 1, [])]
+
+@pytest.mark.parametrize("backend", backends)
+@pytest.mark.parametrize("outcome", [1, 2, -1])
+def test_delete_qubit_invalid_outcome(backend, outcome):
+    circ = build_circuit(backend, 2, [("X", 1, [0])])
+    circ.launch_circuit()
+    with pytest.raises(ValueError):
+        circ.delete_qubit(0, outcome=outcome)
+    # Nothing was changed
+    assert circ.get_qubit_amount() == 2
+    assert len(circ.circuit) == 1
+    assert np.allclose(circ.get_system_matrix(), [1, 0, 0, 0])
+
+def test_delete_last_qubit():
+    with pytest.raises(ValueError):
+        circuit.Circuit(1).delete_qubit(0)
+    with pytest.raises(ValueError):
+        circuit.Circuit(2).add_qubit(3)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from context import circuit, sampler
+
+def bell_circuit(backend="statevector"):
+    circ = circuit.Circuit(3, backend)
+    circ.set_gate("H", 0).set_gate("X", 1, [0])
+    circ.launch_circuit()
+    return circ
+
+def test_samples_follow_probabilities():
+    np.random.seed(3)
+    probabilities = np.array([0.1, 0, 0.6, 0.3])
+    draws = sampler.Sampler(probabilities).sample(200000)
+    frequencies = np.bincount(draws, minlength=4) / len(draws)
+    assert frequencies[1] == 0
+    assert np.allclose(frequencies, probabilities, atol=0.01)
+
+def test_histogram_and_stream():
+    outcome_sampler = sampler.Sampler(np.array([0.5, 0, 0, 0.5]))
+    histogram = outcome_sampler.get_histogram(10 ** 9)
+    assert set(histogram) <= {"00", "11"}
+    assert sum(histogram.values()) == 10 ** 9
+    batches = list(outcome_sampler.stream(10, batch_size=4))
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert all(set(batch.tolist()) <= {0, 3} for batch in batches)
+
+def test_null_vector():
+    with pytest.raises(ValueError):
+        sampler.Sampler(np.zeros(4))
+
+@pytest.mark.parametrize("backend", ["statevector", "inplace", "factorized", "mps"])
+def test_sampler_is_cached_until_the_state_changes(backend):
+    circ = bell_circuit(backend)
+    outcome_sampler = circ.get_sampler()
+    circ.measure_all(shots=100)
+    circ.get_joint_distribution(shots=100)
+    assert circ.get_sampler() is outcome_sampler
+    assert set(circ.get_joint_distribution(shots=1000)) <= {"000", "110"}
+    circ.set_gate("X", 2)
+    circ.execute_column(circ.circuit[-1])
+    assert circ.get_sampler() is not outcome_sampler
+    assert set(circ.get_joint_distribution(shots=1000)) <= {"001", "111"}
+
+def test_collapse_invalidates_the_sampler():
+    circ = bell_circuit()
+    circ.get_sampler()
+    result = circ.measure(0, shots=10, simulation=True)
+    bit = str(result["simulation"]["measurement"])
+    assert circ.get_joint_distribution(shots=100) == {bit + bit + "0": 100}
+
+def test_subset_sampler():
+    circ = bell_circuit()
+    assert np.allclose(circ.get_sampler([1, 2]).probabilities, [0.5, 0, 0.5, 0])
+    outcomes = np.concatenate(list(circ.stream_samples(1000, batch_size=300, qubits=[2, 0])))
+    assert len(outcomes) == 1000
+    assert set(outcomes.tolist()) <= {0, 1}
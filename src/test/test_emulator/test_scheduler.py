@@ -0,0 +1,57 @@
+import pytest
+import numpy as np
+
+from context import circuit, scheduler
+
+def build_circuit(backend="statevector"):
+    circ = circuit.Circuit(4, backend)
+    circ.set_gate("H", 0).set_gate("H", 1).set_gate("X", 2).set_gate("Y", 3)
+    circ.set_gate("X", 1, ctrl=[0]).set_gate("Z", 3, ctrl=[2])
+    circ.set_gate("H", 2).set_gate("X", 3, ctrl=[0, 1]).set_gate("Y", 1)
+    return circ
+
+def test_moments():
+    circ = build_circuit()
+    moments = circ.get_moments()
+    assert [len(moment) for moment in moments] == [4, 2, 2, 1]
+    assert circ.get_depth() == 4
+    for moment in moments:
+        qubits = []
+        for column in moment:
+            qubits += [column.get_index()] + column.get_gate().get_ctrl()
+        assert len(qubits) == len(set(qubits))
+
+def test_moments_keep_order_on_shared_qubits():
+    circ = circuit.Circuit(2)
+    circ.set_gate("H", 0).set_gate("X", 0).set_gate("Z", 1).set_gate("X", 1, ctrl=[0])
+    moments = circ.get_moments()
+    assert [[column.get_gate().get_name() for column in moment] for moment in moments] == [["H", "Z"], ["X"], ["X"]]
+
+def test_condition_qubit_is_scheduled():
+    circ = circuit.Circuit(2)
+    circ.set_gate("H", 0).set_measure(0).set_gate("X", 1, condition=(0, 1))
+    assert circ.get_depth() == 3
+
+@pytest.mark.parametrize("max_fused_qubits", [1, 2, 4])
+def test_fused_moments_same_state(max_fused_qubits):
+    reference = build_circuit("inplace")
+    reference.launch_circuit()
+    circ = build_circuit()
+    state = circ.get_system_matrix()
+    for moment in circ.get_moments():
+        state = scheduler.apply_moment(state, moment, 4, max_fused_qubits)
+    assert np.allclose(state, reference.get_system_matrix())
+
+def test_launch_fused_moments():
+    reference = build_circuit("inplace")
+    reference.launch_circuit()
+    circ = build_circuit()
+    circ.launch_circuit(fuse_moments=True)
+    assert np.allclose(circ.get_system_matrix(), reference.get_system_matrix())
+
+def test_launch_fused_moments_with_measurement():
+    circ = circuit.Circuit(3)
+    circ.set_gate("X", 0).set_gate("H", 2).set_measure(0).set_gate("X", 1, condition=(0, 1)).set_gate("H", 2)
+    circ.launch_circuit(fuse_moments=True)
+    assert circ.get_classical_register()[0]["simulation"]["measurement"] == 1
+    assert np.allclose(circ.get_system_matrix(), [0, 0, 0, 0, 0, 0, 1, 0])
@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+import pytest
+
+from context import circuit, snapshot
+
+def build_circuit(backend="statevector", qubit_amount=4):
+    circ = circuit.Circuit(qubit_amount, backend)
+    for layer in range(3):
+        for qubit in range(qubit_amount):
+            circ.set_gate("H" if (qubit + layer) % 2 == 0 else "Y", qubit)
+        for qubit in range(1, qubit_amount):
+            circ.set_gate("X", qubit, [qubit - 1])
+    return circ
+
+def reference_state(backend="statevector"):
+    circ = build_circuit(backend)
+    circ.launch_circuit()
+    return circ.get_system_matrix()
+
+@pytest.mark.parametrize("backend", ["statevector", "inplace"])
+@pytest.mark.parametrize("compressed", [False, True])
+def test_resume_from_interrupted_run(tmp_path, backend, compressed):
+    path = str(tmp_path / "run")
+    circ = build_circuit(backend)
+    writer = snapshot.SnapshotWriter(path, every_columns=5, compressed=compressed)
+    writer.start()
+    # Interrupted run: only the first 12 columns are executed
+    for position, column in circ.iterate_columns(0, writer):
+        if position == 12:
+            break
+        circ.execute_column(column)
+    writer.flush()
+    state, metadata = snapshot.load_snapshot(path)
+    # A snapshot falling due while the previous one is written is postponed to the next column
+    assert 5 <= metadata["position"] <= 12
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".npz" if compressed else ".npy")]) == 1
+
+    resumed = build_circuit(backend)
+    resumed.launch_circuit(snapshots=snapshot.SnapshotWriter(path, every_columns=5, compressed=compressed), resume=True)
+    assert np.allclose(resumed.get_system_matrix(), reference_state(backend))
+    _, metadata = snapshot.load_snapshot(path)
+    assert metadata["position"] == len(resumed.circuit)
+
+def test_memory_mapped_state(tmp_path):
+    path = str(tmp_path / "run")
+    circ = build_circuit()
+    circ.launch_circuit(snapshots=snapshot.SnapshotWriter(path, every_seconds=3600))
+    state, metadata = snapshot.load_snapshot(path)
+    assert isinstance(state, np.memmap)
+    assert np.allclose(state, reference_state())
+    # A finished run resumes without executing any column
+    resumed = build_circuit()
+    resumed.launch_circuit(snapshots=snapshot.SnapshotWriter(path, every_seconds=3600), resume=True)
+    assert np.allclose(resumed.get_system_matrix(), state)
+
+def test_resume_without_snapshot(tmp_path):
+    circ = build_circuit()
+    circ.launch_circuit(snapshots=snapshot.SnapshotWriter(str(tmp_path / "run"), every_columns=100), resume=True)
+    assert np.allclose(circ.get_system_matrix(), reference_state())
+
+def test_classical_register_is_restored(tmp_path):
+    path = str(tmp_path / "run")
+    circ = circuit.Circuit(2)
+    circ.set_gate("X", 0).set_measure(0).set_gate("X", 1, condition=(0, 1))
+    circ.launch_circuit(snapshots=snapshot.SnapshotWriter(path, every_columns=1))
+    resumed = circuit.Circuit(2)
+    resumed.set_gate("X", 0).set_measure(0).set_gate("X", 1, condition=(0, 1))
+    resumed.load_disk_snapshot(path)
+    assert resumed.classical_register[0]["simulation"]["measurement"] == 1
+    assert np.allclose(np.abs(resumed.get_system_matrix()), [0, 0, 0, 1])
+
+def test_resume_with_feed_forward(tmp_path):
+    path = str(tmp_path / "run")
+
+    def build_feed_forward():
+        circ = circuit.Circuit(3, "inplace")
+        circ.set_gate("X", 0).set_measure(0).set_gate("X", 1, condition=(0, 1)).set_gate("X", 0).set_measure(0)
+        circ.set_gate("X", 2, condition=(0, 1))
+        return circ
+
+    circ = build_feed_forward()
+    for position, column in circ.iterate_columns():
+        circ.execute_column(column)
+        if position == 1:
+            state, metadata = circ.get_disk_snapshot(2)
+    # The snapshot is written after the run went on, like a slow background write
+    snapshot.write_snapshot(path, state, metadata)
+    resumed = build_feed_forward()
+    resumed.launch_circuit(snapshots=snapshot.SnapshotWriter(path, every_columns=2), resume=True)
+    assert np.allclose(np.abs(resumed.get_system_matrix()), np.abs(circ.get_system_matrix()))
+    assert np.allclose(np.abs(resumed.get_system_matrix()), np.eye(8)[0b010])
+
+def test_invalid_snapshots(tmp_path):
+    path = str(tmp_path / "run")
+    build_circuit().launch_circuit(snapshots=snapshot.SnapshotWriter(path, every_columns=10))
+    other = build_circuit()
+    other.set_gate("H", 0)
+    with pytest.raises(ValueError):
+        other.load_disk_snapshot(path)
+    with pytest.raises(ValueError):
+        build_circuit("statevector", 3).load_disk_snapshot(path)
+    with pytest.raises(ValueError):
+        build_circuit("mps").launch_circuit(snapshots=snapshot.SnapshotWriter(str(tmp_path / "mps"), every_columns=1))
+    with pytest.raises(ValueError):
+        snapshot.SnapshotWriter(path)
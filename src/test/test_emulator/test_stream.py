@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+
+from context import circuit, stream
+
+def build_circuit():
+    circ = circuit.Circuit(2, "inplace")
+    circ.set_gate("H", 0).set_gate("X", 1, ctrl=[0]).set_gate("Y", 1)
+    return circ
+
+def test_one_update_per_column():
+    updates = list(stream.stream_updates(build_circuit()))
+    assert [update["column"] for update in updates] == [0, 1, 2]
+    assert np.allclose(updates[0]["probabilities"], [0.5, 0, 0.5, 0])
+    assert np.allclose(updates[1]["probabilities"], [0.5, 0, 0, 0.5])
+
+def test_top_amplitudes():
+    updates = list(stream.stream_updates(build_circuit(), mode="amplitudes", top_k=1))
+    assert list(updates[0]["amplitudes"]) in [["00"], ["10"]]
+    amplitudes = stream.get_top_amplitudes(np.array([0.6, 0, 0, 0.8j]), 2)
+    assert list(amplitudes) == ["11", "00"]
+    assert np.allclose(amplitudes["11"], [0, 0.8])
+
+def test_throttled_updates():
+    updates = list(stream.stream_updates(build_circuit(), max_rate=1e-6))
+    assert [update is None for update in updates] == [False, True, False]
+
+def test_measurement_update():
+    circ = circuit.Circuit(1)
+    circ.set_gate("X", 0).set_measure(0)
+    updates = list(stream.stream_updates(circ, max_rate=1e-6))
+    assert updates[1]["measurement"] == 1
+
+def test_stop_mid_run():
+    circ = build_circuit()
+    updates = stream.stream_updates(circ)
+    next(updates)
+    updates.close()
+    assert np.allclose(circ.get_system_matrix(), [1 / np.sqrt(2), 0, 1 / np.sqrt(2), 0])
+
+def test_unknown_mode():
+    with pytest.raises(NameError):
+        next(stream.stream_updates(build_circuit(), mode="density"))